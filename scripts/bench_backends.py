@@ -0,0 +1,125 @@
+"""Compare detector backends: PyTorch (ultralytics) vs ONNX Runtime FP32 / INT8.
+
+Exports the model to ONNX, quantizes it statically on a few calibration
+images, then reports per-image latency and how well each ONNX variant agrees
+with the PyTorch boxes (same class, IoU >= 0.5) on the same inputs. Without
+--model the YOLOv8n config is built with random weights (no download) and
+every class is treated as tactical so there are boxes to compare; use real
+weights and --images-dir for meaningful accuracy numbers.
+
+Usage: python scripts/bench_backends.py [--images 16] [--batch-size 1] [--model yolov8n.pt]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ghost_sentry.core.detector import ObjectDetector
+from ghost_sentry.core.onnx_backend import export_onnx, load_image, quantize_int8
+from ghost_sentry.core.workers import iter_image_paths
+
+
+def _all_classes_tactical(detector: ObjectDetector) -> None:
+    names = detector.model.names
+    detector.TACTICAL_CLASSES = set(names.values())
+    detector._tactical_ids = np.arange(len(names))
+
+
+def _iou(a, b) -> float:
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union else 0.0
+
+
+def agreement(reference, candidate, threshold: float = 0.5) -> tuple[float, float]:
+    """(recall, precision) of candidate boxes against reference boxes, greedy one-to-one."""
+    matched = total_ref = total_cand = 0
+    for ref, cand in zip(reference, candidate):
+        total_ref += len(ref)
+        total_cand += len(cand)
+        used = set()
+        for r in ref:
+            for j, c in enumerate(cand):
+                if j not in used and c.label == r.label and _iou(r.bbox, c.bbox) >= threshold:
+                    used.add(j)
+                    matched += 1
+                    break
+    return matched / max(total_ref, 1), matched / max(total_cand, 1)
+
+
+def timed(detector: ObjectDetector, images, batch_size: int):
+    detector.detect_batch(images[:batch_size], batch_size=batch_size)  # warm-up
+    start = time.perf_counter()
+    results = detector.detect_batch(images, batch_size=batch_size)
+    return results, (time.perf_counter() - start) / len(images)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="yolov8n.yaml")
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--images-dir", help="Real scenes to run on (and calibrate with)")
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--calibration", type=int, default=8, help="Calibration images for INT8")
+    parser.add_argument("--conf", type=float, help="Default 0.25, or 1e-4 for random weights")
+    args = parser.parse_args()
+    if args.conf is None:
+        # Freshly initialised YOLO heads score every class around 1e-4
+        args.conf = 1e-4 if args.model.endswith(".yaml") else 0.25
+
+    if args.images_dir:
+        images = [load_image(p) for p in list(iter_image_paths([args.images_dir]))[:args.images]]
+    else:
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 255, (args.size, args.size, 3), dtype=np.uint8) for _ in range(args.images)]
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench_backends_"))
+    try:
+        source = workdir / (Path(args.model).stem + ".pt")
+        if args.model.endswith(".yaml"):
+            # Freeze one set of random weights so every backend runs the same model
+            from ghost_sentry.core.detector import _yolo_class
+            _yolo_class()(args.model).save(str(source))
+        else:
+            shutil.copy(args.model, source)
+        # ultralytics writes the .onnx next to the weights (or cwd for a .yaml)
+        onnx_path = Path(export_onnx(str(source), imgsz=args.size))
+        if onnx_path.parent != workdir:
+            onnx_path = Path(shutil.move(str(onnx_path), workdir / onnx_path.name))
+        int8_path = quantize_int8(str(onnx_path), images[:args.calibration], imgsz=args.size)
+
+        variants = {
+            "pytorch": ObjectDetector(str(source), conf=args.conf),
+            "onnx-fp32": ObjectDetector(str(onnx_path), conf=args.conf, backend="onnx"),
+            "onnx-int8": ObjectDetector(int8_path, conf=args.conf, backend="onnx"),
+        }
+        if args.model.endswith(".yaml"):
+            for detector in variants.values():
+                _all_classes_tactical(detector)
+
+        print(f"images={len(images)} size={args.size} batch_size={args.batch_size} conf={args.conf}")
+        print(f"model sizes: fp32 {onnx_path.stat().st_size / 2**20:.1f} MiB, "
+              f"int8 {Path(int8_path).stat().st_size / 2**20:.1f} MiB")
+        reference = None
+        for name, detector in variants.items():
+            results, per_image_s = timed(detector, images, args.batch_size)
+            line = f"{name:10s} {1000 * per_image_s:8.1f} ms/image  boxes={sum(map(len, results)):5d}"
+            if reference is None:
+                reference, reference_s = results, per_image_s
+            else:
+                recall, precision = agreement(reference, results)
+                line += (f"  vs pytorch: recall={recall:.3f} precision={precision:.3f}"
+                         f"  speedup={reference_s / per_image_s:.2f}x")
+            print(line)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
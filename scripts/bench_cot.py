@@ -0,0 +1,66 @@
+"""Per-track cost of rendering the track picture as CoT, as /v1/tracks/cot does.
+
+Before: a dummy Detection per stored track dict, then to_cursor_on_target
+(new uuid4 and two strftime calls per event). After: CotEncoder.encode_many,
+cold (first render of every track) and warm (a refresh where no track has
+changed since the last one; the timestamps are formatted once per batch).
+
+Usage: python scripts/bench_cot.py [--tracks 5000] [--refreshes 20]
+"""
+import argparse
+import time
+
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.output.cot import CotEncoder, to_cursor_on_target
+
+
+def before(tracks):
+    out = []
+    for track in tracks:
+        position = track["location"]["position"]
+        detection = Detection(
+            label=track["ontology"]["platform_type"].lower(),
+            confidence=track.get("confidence", 0.9),
+            bbox=(0, 0, 0, 0),
+            geo_location=(position["latitudeDegrees"], position["longitudeDegrees"]),
+        )
+        out.append(to_cursor_on_target(detection))
+    return out
+
+
+def _cost(fn, tracks, refreshes):
+    start = time.process_time()
+    for _ in range(refreshes):
+        fn(tracks)
+    return (time.process_time() - start) / (len(tracks) * refreshes) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--refreshes", type=int, default=20)
+    args = parser.parse_args()
+
+    tracks = [
+        TrackBuilder.from_detection(
+            Detection(label=("tank", "airplane", "boat")[i % 3], confidence=0.8, bbox=(0, 0, 1, 1),
+                      geo_location=(33.0 + i * 1e-4, -118.0)),
+            entity_id=f"entity-{i}",
+        ).model_dump()
+        for i in range(args.tracks)
+    ]
+
+    old = _cost(before, tracks, args.refreshes)
+    cold = _cost(lambda batch: CotEncoder().encode_many(batch), tracks, args.refreshes)
+    encoder = CotEncoder()
+    encoder.encode_many(tracks)
+    warm = _cost(encoder.encode_many, tracks, args.refreshes)
+    print(f"tracks={args.tracks} refreshes={args.refreshes}")
+    print(f"  Detection + to_cursor_on_target  {old:6.1f} us/track")
+    print(f"  CotEncoder, cold                 {cold:6.1f} us/track  ({old / cold:.1f}x)")
+    print(f"  CotEncoder, warm                 {warm:6.1f} us/track  ({old / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
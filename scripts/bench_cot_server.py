@@ -0,0 +1,119 @@
+"""Load test for the TAK CoT server: hundreds of local TCP clients, some of them stalled.
+
+Starts a CotServer on localhost, connects --clients streaming clients that
+read everything, plus --slow clients with a tiny receive buffer that never
+read, then publishes --rate track updates/sec across --entities entities
+for --duration seconds. Reports the fan-out rate, how many updates the
+per-entity rate limit coalesced, that every reading client received every
+event the server sent, and that the stalled clients were dropped.
+
+Usage: python scripts/bench_cot_server.py [--clients 300] [--slow 10] [--entities 200]
+                                          [--rate 2000] [--duration 10] [--min-interval-ms 1000]
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.output.cot_server import CotServer
+
+
+class Client:
+    def __init__(self):
+        self.events = 0
+
+    async def run(self, port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        tail = b""
+        try:
+            while data := await reader.read(1 << 16):
+                data = tail + data
+                self.events += data.count(b"</event>")
+                tail = data[-7:]  # a terminator split across reads
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def _updates(entities, count):
+    updates = []
+    for i in range(count):
+        n = i % entities
+        detection = Detection(label=("boat", "airplane", "truck")[n % 3], confidence=0.8, bbox=(0, 0, 1, 1),
+                              geo_location=(33.0 + n * 1e-3 + i * 1e-6, -118.0))
+        updates.append(TrackBuilder.from_detection(detection, entity_id=f"entity-{n}").model_dump())
+    return updates
+
+
+async def _run(args):
+    updates = _updates(args.entities, int(args.rate * args.duration))
+    server = CotServer(host="127.0.0.1", port=0, max_buffer=args.max_buffer_kb * 1024,
+                       min_interval_s=args.min_interval_ms / 1000, refresh_s=0)
+    async with server:
+        clients = [Client() for _ in range(args.clients)]
+        readers = [asyncio.create_task(c.run(server.port)) for c in clients]
+        stalled = []
+        loop = asyncio.get_running_loop()
+        for _ in range(args.slow):
+            sock = socket.socket()
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+            sock.setblocking(False)
+            await loop.sock_connect(sock, ("127.0.0.1", server.port))
+            stalled.append(sock)
+        while server.stats()["clients"] < args.clients + args.slow:
+            await asyncio.sleep(0.01)
+
+        start = time.perf_counter()
+        cpu = time.process_time()
+        for i, track in enumerate(updates):
+            server.publish(track)
+            if i % 20 == 0:
+                # Paced like network input; the readers run in between
+                await asyncio.sleep(max(0.0, start + i / args.rate - time.perf_counter()))
+        published = time.perf_counter() - start
+        # Wait for coalesced updates to go out and for every reader to catch up
+        await asyncio.sleep(args.min_interval_ms / 1000)
+        deadline = time.perf_counter() + 60
+        while min(c.events for c in clients) < server.events_sent and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+
+        stats = server.stats()
+        received = [c.events for c in clients]
+        for sock in stalled:
+            sock.close()
+    for task in readers:
+        task.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+
+    print(f"clients={args.clients} slow={args.slow} entities={args.entities} rate={args.rate}/s "
+          f"min_interval_ms={args.min_interval_ms}")
+    print(f"  published {len(updates)} updates in {published:.2f}s; all clients caught up after {elapsed:.2f}s "
+          f"(cpu {cpu:.2f}s, server and clients share one loop)")
+    print(f"  events sent {stats['events_sent']}: {stats['rate_limited']} updates held back by the rate limit, "
+          f"{len(updates) - stats['events_sent']} coalesced away")
+    print(f"  per reading client: min {min(received)} max {max(received)} events; "
+          f"fan-out {stats['events_sent'] * args.clients / elapsed:,.0f} events/s, "
+          f"{stats['bytes_sent'] / elapsed / 1e6:.1f} MB/s")
+    print(f"  stalled clients dropped: {stats['slow_drops']} of {args.slow}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--slow", type=int, default=10)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=2000, help="Track updates published per second")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--min-interval-ms", type=float, default=1000)
+    parser.add_argument("--max-buffer-kb", type=int, default=256)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Bytes on the wire and client parse cost of /ws/tracks, full documents vs deltas.
+
+Replays a stream of track updates (each a small position/confidence change
+to one of --entities tracks) through the DeltaEncoder, and reports the
+average frame size and the client cost of json.loads on every frame,
+plus DeltaDecoder.apply for the delta stream.
+
+Usage: python scripts/bench_delta.py [--entities 200] [--updates 20000] [--keyframe-every 20]
+"""
+import argparse
+import json
+import time
+
+from ghost_sentry.core import serialization
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.output.delta import DeltaDecoder, DeltaEncoder
+
+
+def _updates(entities, count):
+    for i in range(count):
+        n = i % entities
+        detection = Detection(label="tank", confidence=0.5 + (i % 40) / 100, bbox=(0, 0, 1, 1),
+                              geo_location=(33.0 + n * 1e-3 + i * 1e-6, -118.0 - i * 1e-6))
+        yield f"entity-{n}", TrackBuilder.from_detection(detection, entity_id=f"entity-{n}").model_dump()
+
+
+def _client(frames, decode=None):
+    start = time.process_time()
+    for frame in frames:
+        message = json.loads(frame)
+        if decode is not None:
+            decode(message)
+    return (time.process_time() - start) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--keyframe-every", type=int, default=20)
+    args = parser.parse_args()
+
+    updates = list(_updates(args.entities, args.updates))
+    encoder = DeltaEncoder(keyframe_every=args.keyframe_every)
+    full_frames = [serialization.dumps(data).decode() for _, data in updates]
+    start = time.process_time()
+    delta_frames = [
+        serialization.dumps(message).decode()
+        for message in (encoder.encode(entity_id, data) for entity_id, data in updates)
+        if message is not None
+    ]
+    encode_us = (time.process_time() - start) / len(updates) * 1e6
+
+    full_bytes = sum(map(len, full_frames)) / len(full_frames)
+    delta_bytes = sum(map(len, delta_frames)) / len(updates)
+    print(f"entities={args.entities} updates={args.updates} keyframe_every={args.keyframe_every}")
+    print(f"  {encoder.stats()}")
+    print(f"  full    {full_bytes:7.0f} B/update  parse {_client(full_frames):5.1f} us/update")
+    print(f"  delta   {delta_bytes:7.0f} B/update  parse {_client(delta_frames):5.1f} us/update"
+          f"  parse+apply {_client(delta_frames, DeltaDecoder().apply):5.1f} us/update")
+    print(f"  {full_bytes / delta_bytes:.1f}x fewer bytes; server diff+encode {encode_us:.1f} us/update")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Time a replayed batch of scenes with and without the detection cache.
+
+Writes --images random JPEGs, runs them once through a cold cache (full
+inference plus a write per scene) and again as a replay (hashing plus a
+read per scene). Without --model the YOLOv8n config is built with random
+weights, so no download is needed.
+
+Usage: python scripts/bench_detection_cache.py [--images 16] [--size 1280]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ghost_sentry.core.detection_cache import CachedDetector, DetectionCache
+from ghost_sentry.core.detector import ObjectDetector
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--size", type=int, default=1280)
+    parser.add_argument("--model", default="yolov8n.yaml")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        rng = np.random.default_rng(0)
+        scenes = []
+        for i in range(args.images):
+            path = Path(workdir) / f"scene_{i}.jpg"
+            cv2.imwrite(str(path), rng.integers(0, 255, (args.size, args.size, 3), dtype=np.uint8))
+            scenes.append(str(path))
+
+        detector = ObjectDetector(args.model)
+        if args.model.endswith(".yaml"):
+            # Random-weight class names are "0".."79"; run inference for all of them
+            detector._tactical_ids = np.arange(len(detector.model.names))
+        detector.detect(scenes[0])  # warm-up
+        cache = DetectionCache(str(Path(workdir) / "cache"))
+        cached = CachedDetector(detector, cache)
+
+        start = time.perf_counter()
+        for scene in scenes:
+            cached.detect(scene)
+        cold_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for scene in scenes:
+            cached.detect(scene)
+        warm_s = time.perf_counter() - start
+
+    print(f"images={args.images} size={args.size}")
+    print(f"cold    {1000 * cold_s / args.images:8.2f} ms/scene")
+    print(f"replay  {1000 * warm_s / args.images:8.2f} ms/scene  speedup={cold_s / warm_s:.0f}x")
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Compare per-image detection with ObjectDetector.detect_batch.
+
+"before" replays the original loop: one model call per image, then one
+Python iteration and .tolist() per box. "after" is detect_batch. Without
+--model the YOLOv8n config is built with random weights (no download) and
+every class is treated as tactical so post-processing still has boxes.
+
+Usage: python scripts/bench_detector.py [--images 32] [--batch-size 8]
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from ultralytics.engine.results import Boxes
+
+from ghost_sentry.core.detector import Detection, ObjectDetector
+
+
+def legacy_detect(detector: ObjectDetector, source) -> list[Detection]:
+    results = detector.model(source, verbose=False)
+    detections = []
+    for result in results:
+        for box in result.boxes:
+            label = result.names[int(box.cls)]
+            if label in detector.TACTICAL_CLASSES:
+                detections.append(Detection(
+                    label=label,
+                    confidence=float(box.conf),
+                    bbox=tuple(map(int, box.xyxy[0].tolist())),
+                ))
+    return detections
+
+
+class _Result:
+    """Minimal stand-in for an ultralytics Results object."""
+
+    def __init__(self, boxes: Boxes, names: dict):
+        self.boxes = boxes
+        self.names = names
+
+
+def bench_postprocess(detector: ObjectDetector, boxes_per_image: int = 300, repeats: int = 200) -> None:
+    """Box extraction cost alone, with real torch-backed Boxes."""
+    names = {0: "person", 1: "car", 2: "airplane", 3: "bus", 4: "truck", 5: "boat"}
+    detector._labels = np.array(list(names.values()), dtype=object)
+    detector._tactical_ids = np.array([1, 2, 3, 4, 5])
+    detector.TACTICAL_CLASSES = ObjectDetector.TACTICAL_CLASSES
+    g = torch.Generator().manual_seed(0)
+    data = torch.cat([
+        torch.rand(boxes_per_image, 4, generator=g) * 640,
+        torch.rand(boxes_per_image, 1, generator=g),
+        torch.randint(0, 6, (boxes_per_image, 1), generator=g).float(),
+    ], dim=1)
+    result = _Result(Boxes(data, (640, 640)), names)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out_before = []
+        for box in result.boxes:
+            label = result.names[int(box.cls)]
+            if label in detector.TACTICAL_CLASSES:
+                out_before.append(Detection(label=label, confidence=float(box.conf),
+                                            bbox=tuple(map(int, box.xyxy[0].tolist()))))
+    before_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        out_after = detector._extract(result)
+    after_s = time.perf_counter() - start
+
+    assert [d.bbox for d in out_before] == [d.bbox for d in out_after]
+    print(f"post-processing {boxes_per_image} boxes: before {1000 * before_s / repeats:.2f} ms/image, "
+          f"after {1000 * after_s / repeats:.2f} ms/image ({before_s / after_s:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--model", default="yolov8n.yaml")
+    args = parser.parse_args()
+
+    detector = ObjectDetector(args.model, conf=0.01)
+    if args.model.endswith(".yaml"):
+        names = detector.model.names
+        detector.TACTICAL_CLASSES = set(names.values())
+        detector._tactical_ids = np.arange(len(names))
+
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (args.size, args.size, 3), dtype=np.uint8) for _ in range(args.images)]
+    detector.detect_batch(images[:2], batch_size=2)  # warm-up
+
+    start = time.perf_counter()
+    before = [legacy_detect(detector, image) for image in images]
+    before_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    after = detector.detect_batch(images, batch_size=args.batch_size)
+    after_s = time.perf_counter() - start
+
+    print(f"images={args.images} size={args.size} batch_size={args.batch_size}")
+    print(f"before  {args.images / before_s:6.2f} img/s  boxes={sum(map(len, before))}")
+    print(f"after   {args.images / after_s:6.2f} img/s  boxes={sum(map(len, after))}  speedup={before_s / after_s:.2f}x")
+    bench_postprocess(detector)
+
+
+if __name__ == "__main__":
+    main()
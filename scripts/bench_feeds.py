@@ -0,0 +1,97 @@
+"""Messages/sec for AIS and ADS-B ingestion: columnar batches vs one Detection per message.
+
+Generates --messages position reports from --transmitters vessels/aircraft
+and times (a) the vectorised decoders alone, (b) decode plus
+EntityMatcher.correlate_batch per 1 MiB chunk, and (c) the per-message
+path: a pydantic Detection and EntityMatcher.correlate for every report
+(run on --baseline-messages only, as it is much slower).
+
+Usage: python scripts/bench_feeds.py [--messages 200000] [--transmitters 2000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.core.models import Detection
+from ghost_sentry.feeds.adsb import SbsDecoder
+from ghost_sentry.feeds.ais import AisDecoder, encode_position_report
+from ghost_sentry.feeds.sources import FeedIngestor, LineChunker
+
+CHUNK = 1 << 20
+
+
+def _ais_feed(n, transmitters, rng):
+    lats = 33.5 + rng.random(transmitters)
+    lons = -118.5 + rng.random(transmitters)
+    sentences = [
+        (encode_position_report(200_000_000 + i, lats[i], lons[i], sog=10, cog=90) + "\r\n").encode()
+        for i in range(transmitters)
+    ]
+    return b"".join(sentences[i % transmitters] for i in range(n))
+
+
+def _sbs_feed(n, transmitters, rng):
+    lats = 33.5 + rng.random(transmitters)
+    lons = -118.5 + rng.random(transmitters)
+    lines = [
+        (f"MSG,3,1,1,{0xA00000 + i:06X},1,2026/10/18,12:00:00.000,2026/10/18,12:00:00.000,,"
+         f"35000,,,{lats[i]:.5f},{lons[i]:.5f},,,0,0,0,0\n").encode()
+        for i in range(transmitters)
+    ]
+    return b"".join(lines[i % transmitters] for i in range(n))
+
+
+def _chunks(feed):
+    chunker = LineChunker()
+    return [c for c in (chunker.feed(feed[i:i + CHUNK]) for i in range(0, len(feed), CHUNK)) if c] + [chunker.flush()]
+
+
+def _rate(n, seconds):
+    return f"{n / seconds:>12,.0f} msg/s"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--transmitters", type=int, default=2000)
+    parser.add_argument("--baseline-messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for name, feed, decoder_class in (
+        ("ais", _ais_feed(args.messages, args.transmitters, rng), AisDecoder),
+        ("adsb", _sbs_feed(args.messages, args.transmitters, rng), SbsDecoder),
+    ):
+        chunks = _chunks(feed)
+
+        decoder = decoder_class()
+        start = time.perf_counter()
+        batches = [decoder.decode(c) for c in chunks]
+        decode_s = time.perf_counter() - start
+        assert sum(len(b) for b in batches) == args.messages
+
+        ingestor = FeedIngestor(decoder_class(), EntityMatcher())
+        start = time.perf_counter()
+        ingestor.ingest_all(chunks)
+        ingest_s = time.perf_counter() - start
+
+        matcher = EntityMatcher()
+        rows = min(args.baseline_messages, len(batches[0]))
+        batch = batches[0]
+        start = time.perf_counter()
+        for i in range(rows):
+            d = Detection(label=batch.entity_type, confidence=1.0, bbox=(0, 0, 0, 0),
+                          geo_location=(float(batch.lat[i]), float(batch.lon[i])))
+            matcher.correlate(d.label, d.geo_location, d.confidence, name)
+        baseline_s = time.perf_counter() - start
+
+        print(f"{name}: messages={args.messages} transmitters={args.transmitters}")
+        print(f"  decode only            {_rate(args.messages, decode_s)}")
+        print(f"  decode + correlate     {_rate(args.messages, ingest_s)}")
+        print(f"  per-message Detection  {_rate(rows, baseline_s)}  (first {rows} messages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Time georeferencing a scene's detections: per-pixel file opens vs GeoReferencer.
+
+"before" replays the original ``pixel_to_latlon`` loop, which opened the
+raster and read its CRS once per detection. "after" is
+``GeoReferencer.georeference`` on a cold cache (one open) and a warm cache
+(no opens) for the same scene.
+
+Usage: python scripts/bench_geo.py [--detections 500] [--crs EPSG:32611]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin, xy
+
+from ghost_sentry.core.geo import GeoReferencer
+from ghost_sentry.core.models import Detection
+
+
+def legacy_pixel_to_latlon(image_path, pixel_x, pixel_y):
+    with rasterio.open(image_path) as src:
+        if src.crs is None:
+            return None
+        lon, lat = xy(src.transform, pixel_y, pixel_x)
+        return (lat, lon)
+
+
+def _detections(n, size, rng):
+    corners = rng.integers(0, size - 20, (n, 2))
+    return [
+        Detection.model_construct(label="truck", confidence=0.9, bbox=(int(x), int(y), int(x) + 20, int(y) + 20),
+                                  geo_location=None)
+        for x, y in corners
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--detections", type=int, default=500)
+    parser.add_argument("--size", type=int, default=10980)
+    parser.add_argument("--crs", default="EPSG:32611", help="Scene CRS (UTM by default, like Sentinel-2 L2A)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        path = str(Path(workdir) / "scene.tif")
+        origin = from_origin(368000, 3757000, 10, 10) if args.crs != "EPSG:4326" else from_origin(-118.5, 34.0, 1e-4, 1e-4)
+        with rasterio.open(path, "w", driver="GTiff", width=args.size, height=args.size, count=1,
+                           dtype="uint8", crs=args.crs, transform=origin, tiled=True, sparse_ok=True):
+            pass
+
+        detections = _detections(args.detections, args.size, rng)
+        start = time.perf_counter()
+        for d in detections:
+            x1, y1, x2, y2 = d.bbox
+            d.geo_location = legacy_pixel_to_latlon(path, (x1 + x2) // 2, (y1 + y2) // 2)
+        before_s = time.perf_counter() - start
+
+        referencer = GeoReferencer()
+        timings = []
+        for _ in range(2):
+            batch = _detections(args.detections, args.size, np.random.default_rng(0))
+            start = time.perf_counter()
+            referencer.georeference(path, batch, use_mock=False)
+            timings.append(time.perf_counter() - start)
+
+    print(f"detections={args.detections} crs={args.crs}")
+    print(f"before      {1000 * before_s:8.2f} ms  ({args.detections} opens)")
+    print(f"after cold  {1000 * timings[0]:8.2f} ms  (1 open)  speedup={before_s / timings[0]:.0f}x")
+    print(f"after warm  {1000 * timings[1]:8.2f} ms  (0 opens) speedup={before_s / timings[1]:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measure cold import time and memory of the Ghost Sentry entry points.
+
+Each module is imported in a fresh interpreter; the script reports the
+median wall time, the child's peak RSS and which heavy dependencies were
+pulled in. tests/test_imports.py guards the dependency list in CI.
+
+Usage: python scripts/bench_imports.py [--runs 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = ["ghost_sentry.api", "ghost_sentry.cli", "ghost_sentry.console.app"]
+HEAVY_MODULES = ["ultralytics", "torch", "rasterio", "httpx", "dotenv", "scipy"]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def probe(module: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for module in ENTRY_POINTS:
+        samples = [probe(module) for _ in range(args.runs)]
+        seconds = statistics.median(s["seconds"] for s in samples)
+        rss = statistics.median(s["rss_mb"] for s in samples)
+        print(f"{module:<28} {seconds * 1000:7.0f} ms  {rss:6.0f} MiB  heavy={samples[-1]['heavy']}")
+
+
+if __name__ == "__main__":
+    main()
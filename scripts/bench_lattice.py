@@ -0,0 +1,76 @@
+"""Prod-mode publish throughput against the local Lattice stand-in.
+
+Starts a LatticeStandIn, points a prod LatticeConnector at it and publishes
+--updates track updates over --entities entities: (a) one request per
+update, (b) through a BatchPublisher (latest per entity, one NDJSON request
+per flush). Then stops the stand-in for --outage-s while updates keep
+coming, restarts it, and reports how long the buffered backlog took to
+deliver.
+
+Usage: python scripts/bench_lattice.py [--updates 5000] [--entities 200]
+"""
+import argparse
+import os
+import time
+
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.adapter import LatticeConnector
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.lattice.publisher import BatchPublisher
+from ghost_sentry.lattice.standin import LatticeStandIn
+
+
+def _tracks(updates, entities):
+    detection = Detection(label="tank", confidence=0.8, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+    return [TrackBuilder.from_detection(detection, entity_id=f"entity-{i % entities}") for i in range(updates)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--interval-ms", type=float, default=100)
+    parser.add_argument("--outage-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    tracks = _tracks(args.updates, args.entities)
+    with LatticeStandIn() as standin:
+        os.environ["LATTICE_ENDPOINT"] = standin.url
+        connector = LatticeConnector(mode="prod")
+
+        start = time.perf_counter()
+        for track in tracks:
+            connector.publish_track(track)
+        direct_s = time.perf_counter() - start
+        direct_requests = standin.stats()["requests"]
+
+        publisher = BatchPublisher(connector, flush_interval_s=args.interval_ms / 1000)
+        start = time.perf_counter()
+        with publisher:
+            for track in tracks:
+                publisher.publish_track(track)
+        batched_s = time.perf_counter() - start
+        batched_requests = standin.stats()["requests"] - direct_requests
+
+        standin.stop()
+        connector._client.max_backoff_s = 0.1
+        for track in tracks[:args.entities]:
+            connector.publish_track(track)
+        time.sleep(args.outage_s)
+        buffered = connector.stats()["buffered"]
+        standin.start()
+        start = time.perf_counter()
+        delivered = connector._client.drain()
+        recover_s = time.perf_counter() - start
+        connector.close()
+
+    print(f"updates={args.updates} entities={args.entities}")
+    print(f"  per-update   {args.updates / direct_s:>10,.0f} updates/s  requests={direct_requests}")
+    print(f"  batched      {args.updates / batched_s:>10,.0f} updates/s  requests={batched_requests} "
+          f"flush latency avg={publisher.stats()['avg_flush_latency_ms']}ms")
+    print(f"  outage       buffered={buffered} delivered={delivered} in {recover_s * 1000:.1f}ms after restart")
+    print(f"  client       {connector.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Track publishing throughput: one write per update vs the coalescing BatchPublisher.
+
+Publishes --updates track updates spread over --entities entities against a
+dev-mode LatticeConnector backed by a scratch SQLite DB, with one event bus
+subscriber, first directly (one transaction and event per update) and then
+through a BatchPublisher, and reports updates/s plus flush latency.
+
+Usage: python scripts/bench_publisher.py [--updates 20000] [--entities 200] [--interval-ms 250]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from ghost_sentry.core import db, events
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.adapter import LatticeConnector
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.lattice.publisher import BatchPublisher
+
+
+def _tracks(updates, entities):
+    detection = Detection(label="tank", confidence=0.8, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+    return [TrackBuilder.from_detection(detection, entity_id=f"entity-{i % entities}") for i in range(updates)]
+
+
+def _rate(n, seconds):
+    return f"{n / seconds:>10,.0f} updates/s"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--interval-ms", type=float, default=250)
+    parser.add_argument("--max-batch", type=int, default=500)
+    parser.add_argument("--direct-updates", type=int, default=2000, help="Updates for the (slow) direct path")
+    args = parser.parse_args()
+
+    tracks = _tracks(args.updates, args.entities)
+    received = []
+    events.subscribe(lambda event: received.append(event.entity_id))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = Path(tmp) / "bench.db"
+        connector = LatticeConnector(mode="dev")
+
+        direct = tracks[:args.direct_updates]
+        start = time.perf_counter()
+        for track in direct:
+            connector.publish_track(track)
+        direct_s = time.perf_counter() - start
+
+        publisher = BatchPublisher(connector, flush_interval_s=args.interval_ms / 1000, max_batch=args.max_batch)
+        start = time.perf_counter()
+        with publisher:
+            for track in tracks:
+                publisher.publish_track(track)
+        batched_s = time.perf_counter() - start
+
+    stats = publisher.stats()
+    print(f"updates={args.updates} entities={args.entities} interval={args.interval_ms}ms max_batch={args.max_batch}")
+    print(f"  direct     {_rate(len(direct), direct_s)}  (first {len(direct)} updates)")
+    print(f"  batched    {_rate(args.updates, batched_s)}  "
+          f"flushes={stats['flushes']} published={stats['published']} coalesced={stats['coalesced']}")
+    print(f"  flush latency avg={stats['avg_flush_latency_ms']}ms max={stats['max_flush_latency_ms']}ms")
+
+
+if __name__ == "__main__":
+    main()
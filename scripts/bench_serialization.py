@@ -0,0 +1,58 @@
+"""Per-track CPU cost of rendering a LatticeTrack for the DB, event bus and WebSocket clients.
+
+Before: model_dump() for the DB and again for the event bus, json.dumps for
+the DB row, and json.dumps again per WebSocket client (what send_json
+does). After: one model_dump(), one serialization.dumps() (orjson when
+installed) and one decode, shared by the DB row and every client. DB I/O
+is left out so only serialization is measured.
+
+Usage: python scripts/bench_serialization.py [--tracks 20000] [--clients 4]
+"""
+import argparse
+import json
+import time
+
+from ghost_sentry.core import serialization
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+
+
+def before(track, clients):
+    db_text = json.dumps(track.model_dump())
+    data = track.model_dump()
+    frames = [json.dumps(data, separators=(",", ":"), ensure_ascii=False) for _ in range(clients)]
+    return db_text, frames
+
+
+def after(track, clients):
+    raw = serialization.dumps(track.model_dump())
+    text = raw.decode()
+    return text, [text] * clients
+
+
+def _cost(fn, tracks, clients):
+    start = time.process_time()
+    for track in tracks:
+        fn(track, clients)
+    return (time.process_time() - start) / len(tracks) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=4)
+    args = parser.parse_args()
+
+    detection = Detection(label="tank", confidence=0.8, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+    tracks = [TrackBuilder.from_detection(detection, entity_id=f"entity-{i}") for i in range(args.tracks)]
+    _cost(after, tracks[:1000], args.clients)  # warm up
+
+    old = _cost(before, tracks, args.clients)
+    new = _cost(after, tracks, args.clients)
+    print(f"tracks={args.tracks} clients={args.clients} encoder={serialization.BACKEND}")
+    print(f"  before  {old:8.1f} us/track")
+    print(f"  after   {new:8.1f} us/track  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
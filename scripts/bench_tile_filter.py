@@ -0,0 +1,84 @@
+"""Time a repeat pass over an AOI with and without the cloud / no-change tile filter.
+
+Writes two acquisitions of the same footprint: the second has --clouded of
+its tiles under cloud and --changed tiles with a new bright object, the
+rest unchanged. Both are run through TiledDetector without a filter and
+with a TileFilter primed by the first pass. Without --model the YOLOv8n
+config is built with random weights, so no download is needed.
+
+Usage: python scripts/bench_tile_filter.py [--size 2560] [--clouded 4] [--changed 2]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from ghost_sentry.core.detector import ObjectDetector
+from ghost_sentry.core.tile_filter import TileFilter, TileStore
+from ghost_sentry.core.tiling import DEFAULT_OVERLAP, DEFAULT_TILE_SIZE, TiledDetector, tile_grid
+
+
+def _write(path, ground, tiles, clouded, changed):
+    data = ground.copy()
+    for tile in tiles[:clouded]:
+        data[:, tile.row_off:tile.row_off + tile.height, tile.col_off:tile.col_off + tile.width] = 3000
+    for tile in tiles[clouded:clouded + changed]:
+        y, x = tile.row_off + tile.height // 2, tile.col_off + tile.width // 2
+        data[:, y:y + 24, x:x + 24] = 2800
+    with rasterio.open(
+        path, "w", driver="GTiff", width=data.shape[2], height=data.shape[1], count=3, dtype=np.uint16,
+        crs="EPSG:32611", transform=from_origin(368000, 3757000, 10, 10),
+    ) as dst:
+        dst.write(data)
+    return str(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=2560)
+    parser.add_argument("--clouded", type=int, default=4)
+    parser.add_argument("--changed", type=int, default=2)
+    parser.add_argument("--model", default="yolov8n.yaml")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ground = np.repeat(rng.integers(300, 1500, (1, args.size, args.size)), 3, axis=0).astype(np.uint16)
+    tiles = tile_grid(args.size, args.size, DEFAULT_TILE_SIZE, DEFAULT_OVERLAP)
+    # Edit every other tile; neighbours still see the edit in their overlap strips and are re-run
+    spaced = tiles[::2]
+
+    detector = ObjectDetector(args.model)
+    if args.model.endswith(".yaml"):
+        # Random-weight class names are "0".."79"; run inference for all of them
+        detector._tactical_ids = np.arange(len(detector.model.names))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        first = _write(Path(workdir) / "t0.tif", ground, spaced, 0, 0)
+        second = _write(Path(workdir) / "t1.tif", ground, spaced, args.clouded, args.changed)
+
+        plain = TiledDetector(detector)
+        plain.detect(first)  # warm-up
+        start = time.perf_counter()
+        plain.detect(second)
+        before_s = time.perf_counter() - start
+
+        tile_filter = TileFilter(TileStore(str(Path(workdir) / "tiles.db")))
+        filtered = TiledDetector(detector, tile_filter=tile_filter)
+        filtered.detect(first)
+        start = time.perf_counter()
+        filtered.detect(second)
+        after_s = time.perf_counter() - start
+
+    print(f"size={args.size} tiles={len(tiles)} clouded={args.clouded} changed={args.changed}")
+    print(f"no filter  {1000 * before_s:8.1f} ms  ({len(tiles)} tiles inferred)")
+    print(f"filtered   {1000 * after_s:8.1f} ms  ({filtered.tiles_processed - len(tiles)} tiles inferred)"
+          f"  speedup={before_s / after_s:.1f}x")
+    print(tile_filter.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Show that TiledDetector's peak memory does not grow with scene size.
+
+Writes synthetic uint16 GeoTIFFs of increasing size and tiles them through
+a no-op detector, reporting the peak traced allocation (numpy buffers are
+tracked by tracemalloc) next to the size of the full raster.
+
+Usage: python scripts/bench_tiling.py [--sizes 2048 4096 8192]
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from ghost_sentry.core.tiling import TiledDetector
+
+
+class NullDetector:
+
+    def detect_batch(self, sources, batch_size=8):
+        return [[] for _ in sources]
+
+
+def write_scene(path: Path, size: int) -> None:
+    with rasterio.open(
+        path, "w", driver="GTiff", width=size, height=size, count=3, dtype="uint16",
+        crs="EPSG:32611", transform=from_origin(300000, 3760000, 10, 10),
+        tiled=True, blockxsize=512, blockysize=512,
+    ) as dst:
+        block = np.full((3, 512, 512), 1200, dtype=np.uint16)
+        for _, window in dst.block_windows(1):
+            dst.write(block[:, :window.height, :window.width], window=window)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2048, 4096, 8192])
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"scene_{size}.tif"
+            write_scene(path, size)
+            tiled = TiledDetector(NullDetector(), tile_size=args.tile_size, batch_size=args.batch_size)
+            tracemalloc.start()
+            start = time.perf_counter()
+            tiled.detect(str(path))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"scene={size}x{size} raster={3 * 2 * size * size / 2**20:7.1f} MiB "
+                f"tiles={tiled.tiles_processed:<4} peak={peak / 2**20:6.1f} MiB time={elapsed:.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Measure ingestion throughput of IngestWorkerPool versus worker count.
+
+Generates synthetic scenes and pushes them through the pool with a fresh
+SQLite DB per run. Pass --model to use real weights; the default builds
+YOLOv8n from its config (random weights), which costs the same compute and
+needs no download.
+
+Usage: python scripts/bench_workers.py [--images 48] [--workers 1 2 4]
+"""
+import argparse
+import functools
+import os
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ghost_sentry.core import db
+from ghost_sentry.core.detector import ObjectDetector
+from ghost_sentry.core.workers import IngestWorkerPool
+from ghost_sentry.lattice.adapter import LatticeConnector
+
+
+def make_scenes(directory: Path, count: int, size: int) -> list[str]:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = directory / f"scene_{i:04d}.jpg"
+        cv2.imwrite(str(path), rng.integers(0, 255, (size, size, 3), dtype=np.uint8))
+        paths.append(str(path))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=48)
+    parser.add_argument("--size", type=int, default=640)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--model", default="yolov8n.yaml")
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} images={args.images} size={args.size} model={args.model}")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_scenes(Path(tmp), args.images, args.size)
+        baseline = None
+        for workers in args.workers:
+            db.DB_PATH = Path(tmp) / f"bench_{workers}.db"
+            pool = IngestWorkerPool(
+                workers,
+                detector_factory=functools.partial(ObjectDetector, args.model),
+            )
+            stats = pool.run(paths, LatticeConnector())
+            baseline = baseline or stats.images_per_s
+            print(
+                f"workers={workers:<3} images/s={stats.images_per_s:7.2f} "
+                f"speedup={stats.images_per_s / baseline:5.2f}x elapsed={stats.elapsed_s:.1f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
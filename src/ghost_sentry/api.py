@@ -3,15 +3,19 @@ import logging
 import asyncio
 from typing import List, Optional, Literal
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, APIRouter
-from fastapi.responses import Response
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, APIRouter, Query
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from ghost_sentry.core.detector import Detection
-from ghost_sentry.core import db, events
+from ghost_sentry.core import db, detection_cache, events, geo, sentry, serialization, tile_filter
+from ghost_sentry.core.pipeline import Pipeline, build_ingestion_pipeline
 from ghost_sentry.lattice.adapter import LatticeConnector
-from ghost_sentry.output.cot import to_cursor_on_target
+from ghost_sentry.lattice.publisher import BatchPublisher
+from ghost_sentry.lattice.subscriber import LatticeSubscriber
+from ghost_sentry.output.cot import CotEncoder
+from ghost_sentry.output.cot_server import CotServer
+from ghost_sentry.output.delta import DeltaEncoder
 
 logger = logging.getLogger(__name__)
 
@@ -32,12 +36,69 @@ class CreateMission(BaseModel):
 
 
 _track_subscribers: List[asyncio.Queue] = []
+# /ws/tracks?encoding=delta clients; one encoder (touched only on the event loop) serves all
+_delta_subscribers: List[asyncio.Queue] = []
+_delta_encoder = DeltaEncoder(
+    keyframe_every=int(os.environ.get("GHOST_SENTRY_DELTA_KEYFRAME_EVERY", "20")),
+    keyframe_s=float(os.environ.get("GHOST_SENTRY_DELTA_KEYFRAME_S", "30")),
+)
 _cot_subscribers: List[asyncio.Queue] = []
+_cot_encoder = CotEncoder()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# Hosted ingestion pipeline (opt-in; loads the detector on first image)
+PIPELINE_ENABLED = os.environ.get("GHOST_SENTRY_PIPELINE", "0") == "1"
+PIPELINE_WORKERS = int(os.environ.get("GHOST_SENTRY_PIPELINE_WORKERS", "1"))
+PIPELINE_MODEL = os.environ.get("GHOST_SENTRY_MODEL", "yolov8n.pt")
+PIPELINE_BACKEND = os.environ.get("GHOST_SENTRY_DETECTOR_BACKEND", "ultralytics")
+PIPELINE_CACHE_DIR = os.environ.get("GHOST_SENTRY_DETECTION_CACHE") or None
+PIPELINE_TILE_SIZE = int(os.environ.get("GHOST_SENTRY_TILE_SIZE", "0"))
+PIPELINE_TILE_STORE = os.environ.get("GHOST_SENTRY_TILE_STORE") or None
+# Coalesce pipeline track updates and publish them in batches (0 = per update)
+PUBLISH_INTERVAL_MS = float(os.environ.get("GHOST_SENTRY_PUBLISH_INTERVAL_MS", "0"))
+# Receive tracks from the mesh (streams from LATTICE_ENDPOINT)
+SUBSCRIBE_ENABLED = os.environ.get("GHOST_SENTRY_SUBSCRIBE", "0") == "1"
+# Raw CoT to TAK clients: TCP stream port (0 = off) and UDP host:port (e.g. 239.2.3.1:6969)
+COT_PORT = int(os.environ.get("GHOST_SENTRY_COT_PORT", "0"))
+COT_UDP = os.environ.get("GHOST_SENTRY_COT_UDP") or None
+COT_MIN_INTERVAL_MS = float(os.environ.get("GHOST_SENTRY_COT_MIN_INTERVAL_MS", "1000"))
+_pipeline: Optional[Pipeline] = None
+_publisher: Optional[BatchPublisher] = None
+_mesh_subscriber: Optional[LatticeSubscriber] = None
+_mesh_stop: Optional[asyncio.Event] = None
+_mesh_task: Optional[asyncio.Task] = None
+_cot_server: Optional[CotServer] = None
 
 
 async def broadcast_track(event: events.TrackEvent):
+    # One JSON text frame per event, shared by every client
+    text = event.json_bytes().decode()
     for queue in _track_subscribers:
-        await queue.put(event.data)
+        await queue.put(text)
+    if _cot_subscribers and "entityId" in event.data:
+        cot_xml = _cot_encoder.encode(event.data)
+        if cot_xml is not None:
+            await broadcast_cot(cot_xml)
+    if _delta_subscribers:
+        if "entityId" in event.data:
+            message = _delta_encoder.encode(event.entity_id, event.data)
+            if message is None:
+                return
+            text = serialization.dumps(message).decode()
+        for queue in _delta_subscribers:
+            await queue.put(text)
+
+
+def _delta_keyframes() -> List[str]:
+    """Full messages for a joining delta client; the first one seeds the encoder from the DB."""
+    if not _delta_subscribers:
+        # Updates are not diffed while nobody listens, so the encoder state may be stale
+        _delta_encoder.clear()
+        for text in reversed(db.get_track_texts()):
+            data = serialization.loads(text)
+            if "entityId" in data:
+                _delta_encoder.encode(data["entityId"], data)
+    return [serialization.dumps(message).decode() for message in _delta_encoder.keyframes()]
 
 
 async def broadcast_cot(cot_xml: str):
@@ -50,13 +111,54 @@ def _schedule_broadcast(event: events.TrackEvent):
         loop = asyncio.get_running_loop()
         loop.create_task(broadcast_track(event))
     except RuntimeError:
-        pass
+        # Published from a worker thread (e.g. the ingestion pipeline)
+        if _loop is not None and not _loop.is_closed():
+            asyncio.run_coroutine_threadsafe(broadcast_track(event), _loop)
 
 
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
+    global _loop, _pipeline, _publisher, _mesh_subscriber, _mesh_stop, _mesh_task, _cot_server
+    _loop = asyncio.get_running_loop()
     db.init_db()
     events.subscribe(_schedule_broadcast)
+    if COT_PORT or COT_UDP:
+        _cot_server = CotServer(
+            port=COT_PORT or None, udp=COT_UDP, encoder=_cot_encoder, min_interval_s=COT_MIN_INTERVAL_MS / 1000
+        )
+        _cot_server.seed(db.get_tracks())
+        await _cot_server.start()
+        events.subscribe(_cot_server.on_event)
+    if SUBSCRIBE_ENABLED:
+        _mesh_subscriber = LatticeSubscriber(os.environ["LATTICE_ENDPOINT"], token=os.environ.get("LATTICE_API_KEY"))
+        _mesh_stop = asyncio.Event()
+        _mesh_task = asyncio.create_task(_mesh_subscriber.run(_mesh_stop))
+    if PIPELINE_ENABLED:
+        if PUBLISH_INTERVAL_MS > 0:
+            _publisher = BatchPublisher(connector, flush_interval_s=PUBLISH_INTERVAL_MS / 1000).start()
+        _pipeline = build_ingestion_pipeline(
+            _publisher or connector,
+            detect_workers=PIPELINE_WORKERS,
+            model_path=PIPELINE_MODEL,
+            backend=PIPELINE_BACKEND,
+            cache_dir=PIPELINE_CACHE_DIR,
+            tile_size=PIPELINE_TILE_SIZE,
+            tile_store=PIPELINE_TILE_STORE,
+        )
+        await _pipeline.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if _pipeline is not None:
+        await _pipeline.stop(drain=False)
+    if _publisher is not None:
+        _publisher.close()
+    if _mesh_task is not None:
+        _mesh_stop.set()
+        await _mesh_task
+    if _cot_server is not None:
+        await _cot_server.stop()
 
 
 CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "http://localhost:5173,http://localhost:5174").split(",")
@@ -86,6 +188,8 @@ def root():
             "assets": "/v1/assets",
             "timeline": "/v1/timeline",
             "cot": "/v1/tracks/cot",
+            "ingest": "/v1/pipeline/ingest",
+            "metrics": "/v1/metrics",
             "websocket_tracks": "/ws/tracks",
             "websocket_cot": "/ws/cot"
         }
@@ -98,28 +202,36 @@ def health():
 
 
 @app.websocket("/ws/tracks")
-async def websocket_tracks(websocket: WebSocket):
+async def websocket_tracks(websocket: WebSocket, encoding: Literal["full", "delta"] = Query("full")):
     await websocket.accept()
     queue: asyncio.Queue = asyncio.Queue()
-    _track_subscribers.append(queue)
+    if encoding == "delta":
+        # Keyframes are taken before the queue is registered, with no await in between,
+        # so the first delta the client sees builds on them
+        snapshot = _delta_keyframes()
+        subscribers = _delta_subscribers
+    else:
+        # Stored JSON goes out as-is, without a parse/serialize round trip
+        snapshot = db.get_track_texts()
+        subscribers = _track_subscribers
+    subscribers.append(queue)
     try:
-        tracks = db.get_tracks()
-        for track in tracks:
-            await websocket.send_json(track)
+        for text in snapshot:
+            await websocket.send_text(text)
         
         from ghost_sentry.core import assets
         for asset in assets.MOCK_ASSETS:
             await websocket.send_json({"type": "asset_telemetry", **asset.to_dict()})
             
         while True:
-            data = await queue.get()
-            await websocket.send_json(data)
+            text = await queue.get()
+            await websocket.send_text(text)
     except WebSocketDisconnect:
         logger.debug("WebSocket client disconnected from /ws/tracks")
     except Exception as e:
         logger.warning(f"WebSocket error on /ws/tracks: {e}")
     finally:
-        _track_subscribers.remove(queue)
+        subscribers.remove(queue)
 
 
 @app.websocket("/ws/cot")
@@ -128,12 +240,9 @@ async def websocket_cot(websocket: WebSocket):
     queue: asyncio.Queue = asyncio.Queue()
     _cot_subscribers.append(queue)
     try:
-        tracks = db.get_tracks()
-        for track in tracks:
-            cot_xml = _track_to_cot(track)
-            if cot_xml:
-                await websocket.send_text(cot_xml)
-        
+        for cot_xml in _cot_encoder.encode_many(db.get_tracks()):
+            await websocket.send_text(cot_xml)
+
         while True:
             cot_xml = await queue.get()
             await websocket.send_text(cot_xml)
@@ -145,22 +254,6 @@ async def websocket_cot(websocket: WebSocket):
         _cot_subscribers.remove(queue)
 
 
-def _track_to_cot(track: dict) -> Optional[str]:
-    try:
-        d = Detection(
-            label=track["ontology"]["platform_type"].lower(),
-            confidence=track.get("confidence", 0.9),
-            bbox=(0, 0, 0, 0),
-            geo_location=(
-                track["location"]["position"]["latitudeDegrees"],
-                track["location"]["position"]["longitudeDegrees"]
-            )
-        )
-        return to_cursor_on_target(d)
-    except (KeyError, TypeError):
-        return None
-
-
 @v1_router.get("/tracks")
 def get_tracks():
     return db.get_tracks()
@@ -173,8 +266,7 @@ def get_track_history(entity_id: str, limit: int = 10):
 
 @v1_router.get("/tracks/cot", response_class=Response)
 def get_tracks_cot():
-    tracks = db.get_tracks()
-    cot_events = [cot for t in tracks if (cot := _track_to_cot(t)) is not None]
+    cot_events = _cot_encoder.encode_many(db.get_tracks())
     return Response(content="\n".join(cot_events), media_type="application/xml")
 
 
@@ -248,6 +340,36 @@ async def update_asset_telemetry(asset_id: str, lat: float, lon: float, battery:
     return {"status": "ok"}
 
 
+@v1_router.post("/pipeline/ingest", status_code=202)
+async def ingest_image(image_path: str):
+    # Runs on the event loop: the pipeline's asyncio queues are not thread-safe
+    if _pipeline is None or not _pipeline.running:
+        return JSONResponse(status_code=503, content={"status": "error", "message": "Pipeline not running"})
+    if not _pipeline.try_submit(image_path):
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error", "message": "Pipeline overloaded"},
+            headers={"Retry-After": "1"},
+        )
+    return {"status": "queued", "image_path": image_path}
+
+
+@v1_router.get("/metrics")
+def get_metrics():
+    return {
+        "pipeline": _pipeline.stats() if _pipeline is not None else {"running": False},
+        "debounce": sentry._debounce.stats(),
+        "detection_cache": detection_cache.cache_stats(),
+        "geo": geo._referencer.stats(),
+        "tile_filter": tile_filter.filter_stats(),
+        "publisher": _publisher.stats() if _publisher is not None else {"running": False},
+        "subscription": _mesh_subscriber.stats() if _mesh_subscriber is not None else {"running": False},
+        "delta": {"clients": len(_delta_subscribers), **_delta_encoder.stats()},
+        "cot": _cot_encoder.stats(),
+        "cot_server": _cot_server.stats() if _cot_server is not None else {"running": False},
+    }
+
+
 @v1_router.get("/missions")
 def get_missions():
     return db.get_missions()
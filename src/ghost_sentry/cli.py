@@ -1,24 +1,48 @@
 """Ghost Sentry CLI."""
+import asyncio
 import json
+import logging
+import sys
 import typer
 from pathlib import Path
-from ghost_sentry.core.detector import ObjectDetector, Detection
-from ghost_sentry.core.geo import mock_geo_location
+from ghost_sentry.core.detector import Detection, build_detector
+from ghost_sentry.core.geo import georeference_detections
 from ghost_sentry.lattice.adapter import LatticeConnector
+from ghost_sentry.lattice.publisher import BatchPublisher
 from ghost_sentry.core.sentry import process_detections
+from ghost_sentry.core.pipeline import DEFAULT_QUEUE_SIZE, build_ingestion_pipeline
+from ghost_sentry.core.workers import IngestWorkerPool, iter_image_paths
+from ghost_sentry.core.satellite import DEFAULT_MAX_TILE_DEG, FetchScheduler, SentinelClient
+from ghost_sentry.core.tile_filter import filter_stats
+from ghost_sentry.core.watch import (
+    CHECKPOINT_NAME,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SETTLE_S,
+    Checkpoint,
+    FolderWatcher,
+)
 
+app = typer.Typer(help="Ghost Sentry: autonomous ISR detection and cueing.")
+
+
+@app.command()
 def detect(
     image_path: str = typer.Argument(..., help="Path to image"),
-    mock: bool = typer.Option(False, help="Use mock detections for testing")
+    mock: bool = typer.Option(False, help="Use mock detections for testing"),
+    tile_size: int = typer.Option(0, help="Tile large rasters into windows of this size (0 = whole image)"),
+    model: str = typer.Option("yolov8n.pt", help="YOLO model weights (.onnx for the onnx backend)"),
+    backend: str = typer.Option("ultralytics", help="Detector backend: ultralytics or onnx"),
+    cache_dir: str = typer.Option(None, help="Reuse detections for scenes seen before (on-disk cache)"),
+    tile_store: str = typer.Option(None, help="SQLite tile store; skip clouded/unchanged tiles (needs --tile-size)"),
 ):
     """Detect objects in an image and publish to Lattice."""
     connector = LatticeConnector(mode="dev")
-    
+
     if mock:
         # Load pre-made mock data
         root = Path(__file__).resolve().parent.parent.parent
         mock_file = root / "data/samples/mock_detections.json"
-        
+
         if mock_file.exists():
             data = json.loads(mock_file.read_text())
             detections = [Detection(**d) for d in data]
@@ -28,17 +52,369 @@ def detect(
         else:
             typer.echo(f"Error: Mock file not found at {mock_file}")
             raise typer.Exit(code=1)
-    
-    detector = ObjectDetector()
+
+    detector = build_detector(model, backend=backend, tile_size=tile_size, cache_dir=cache_dir, tile_store=tile_store)
     detections = detector.detect(image_path)
-    
-    # Add mock geo if not available
-    for d in detections:
-        if d.geo_location is None:
-            d.geo_location = mock_geo_location()
-    
+    if tile_store:
+        typer.echo(f"Tile filter: {json.dumps(filter_stats())}")
+
+    # Georeference from raster metadata, falling back to mock geo
+    georeference_detections(image_path, detections)
+
     stats = process_detections(detections, connector)
     typer.echo(f"Successfully processed {stats['tracks']} tracks and {stats['tasks']} tasks from {image_path}")
 
+
+@app.command()
+def ingest(
+    paths: list[str] = typer.Argument(..., help="Image files or directories"),
+    workers: int = typer.Option(2, help="Detector processes"),
+    chunksize: int = typer.Option(1, help="Images handed to a worker per queue pull"),
+    model: str = typer.Option("yolov8n.pt", help="YOLO model weights (.onnx for the onnx backend)"),
+    backend: str = typer.Option("ultralytics", help="Detector backend: ultralytics or onnx"),
+    cache_dir: str = typer.Option(None, help="Reuse detections for scenes seen before (on-disk cache)"),
+):
+    """Push a backlog of scenes through a pool of detector processes."""
+    logging.basicConfig(level=logging.INFO)
+    connector = LatticeConnector(mode="dev")
+    pool = IngestWorkerPool(
+        workers, model_path=model, chunksize=chunksize, backend=backend, cache_dir=cache_dir
+    )
+    stats = pool.run(iter_image_paths(paths), connector)
+    typer.echo(json.dumps(stats.to_dict(), indent=2))
+    if stats.failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def export(
+    model: str = typer.Option("yolov8n.pt", help="YOLO weights to export"),
+    imgsz: int = typer.Option(640, help="Model input size"),
+    int8: bool = typer.Option(False, help="Also write an INT8 statically quantized model"),
+    calibration: list[str] = typer.Option([], help="Calibration images or directories (for --int8)"),
+):
+    """Export a YOLO model to ONNX for the onnx backend, optionally INT8-quantized."""
+    from ghost_sentry.core.onnx_backend import export_onnx, quantize_int8
+
+    onnx_path = export_onnx(model, imgsz=imgsz)
+    typer.echo(f"Exported {onnx_path}")
+    if int8:
+        images = list(iter_image_paths(calibration))
+        if not images:
+            typer.echo("Error: --int8 needs --calibration images")
+            raise typer.Exit(code=1)
+        typer.echo(f"Quantized {quantize_int8(onnx_path, images, imgsz=imgsz)}")
+
+
+def _publisher(publish_interval_ms: float):
+    """The dev connector, behind a started BatchPublisher when batching is on."""
+    connector = LatticeConnector(mode="dev")
+    if publish_interval_ms <= 0:
+        return connector
+    return BatchPublisher(connector, flush_interval_s=publish_interval_ms / 1000).start()
+
+
+def _close(connector) -> None:
+    if isinstance(connector, BatchPublisher):
+        connector.close()
+        logging.info(f"[publisher] {connector.stats()}")
+
+
+@app.command()
+def serve(
+    detect_workers: int = typer.Option(1, help="Parallel detection workers"),
+    executor: str = typer.Option("thread", help="Detection executor: thread or process"),
+    queue_size: int = typer.Option(DEFAULT_QUEUE_SIZE, help="Bounded queue size between stages"),
+    stats_interval: float = typer.Option(10.0, help="Seconds between pipeline stats reports (0 disables)"),
+    model: str = typer.Option("yolov8n.pt", help="YOLO model weights (.onnx for the onnx backend)"),
+    tile_size: int = typer.Option(0, help="Tile large rasters into windows of this size (0 = whole image)"),
+    backend: str = typer.Option("ultralytics", help="Detector backend: ultralytics or onnx"),
+    cache_dir: str = typer.Option(None, help="Reuse detections for scenes seen before (on-disk cache)"),
+    tile_store: str = typer.Option(None, help="SQLite tile store; skip clouded/unchanged tiles (needs --tile-size)"),
+    publish_interval_ms: float = typer.Option(0, help="Coalesce track updates and publish them in batches this often (0 = per update)"),
+):
+    """Run the ingestion pipeline as a service, reading image paths from stdin."""
+    logging.basicConfig(level=logging.INFO)
+    connector = _publisher(publish_interval_ms)
+    pipeline = build_ingestion_pipeline(
+        connector,
+        detect_workers=detect_workers,
+        detect_executor=executor,
+        queue_size=queue_size,
+        model_path=model,
+        tile_size=tile_size,
+        backend=backend,
+        cache_dir=cache_dir,
+        tile_store=tile_store,
+    )
+    try:
+        asyncio.run(_serve(pipeline, stats_interval))
+    finally:
+        _close(connector)
+
+
+@app.command()
+def watch(
+    directory: str = typer.Argument(..., help="Directory to tail for new imagery"),
+    detect_workers: int = typer.Option(1, help="Parallel detection workers"),
+    executor: str = typer.Option("thread", help="Detection executor: thread or process"),
+    queue_size: int = typer.Option(DEFAULT_QUEUE_SIZE, help="Bounded queue size between stages"),
+    model: str = typer.Option("yolov8n.pt", help="YOLO model weights (.onnx for the onnx backend)"),
+    tile_size: int = typer.Option(0, help="Tile large rasters into windows of this size (0 = whole image)"),
+    backend: str = typer.Option("ultralytics", help="Detector backend: ultralytics or onnx"),
+    cache_dir: str = typer.Option(None, help="Reuse detections for scenes seen before (on-disk cache)"),
+    tile_store: str = typer.Option(None, help="SQLite tile store; skip clouded/unchanged tiles (needs --tile-size)"),
+    publish_interval_ms: float = typer.Option(0, help="Coalesce track updates and publish them in batches this often (0 = per update)"),
+    checkpoint: str = typer.Option(None, help=f"Processed-files record (default: <directory>/{CHECKPOINT_NAME})"),
+    poll_interval: float = typer.Option(DEFAULT_POLL_INTERVAL, help="Seconds between scans when polling"),
+    settle: float = typer.Option(DEFAULT_SETTLE_S, help="Seconds a file must stay unchanged before it is read"),
+    polling: bool = typer.Option(False, help="Poll even if inotify (watchfiles) is available"),
+    stats_interval: float = typer.Option(10.0, help="Seconds between pipeline stats reports (0 disables)"),
+):
+    """Keep the detector warm and ingest imagery as it lands in a directory."""
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("watchfiles").setLevel(logging.WARNING)
+    done = Checkpoint(checkpoint or str(Path(directory) / CHECKPOINT_NAME))
+    connector = _publisher(publish_interval_ms)
+    pipeline = build_ingestion_pipeline(
+        connector,
+        detect_workers=detect_workers,
+        detect_executor=executor,
+        queue_size=queue_size,
+        model_path=model,
+        tile_size=tile_size,
+        backend=backend,
+        cache_dir=cache_dir,
+        tile_store=tile_store,
+        sink=done.record,
+    )
+    watcher = FolderWatcher(
+        directory, done, poll_interval=poll_interval, settle_s=settle, use_inotify=False if polling else None
+    )
+    try:
+        asyncio.run(_watch(pipeline, watcher, stats_interval))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _close(connector)
+    typer.echo(json.dumps({"checkpointed": len(done), **pipeline.stats()}, indent=2))
+
+
+@app.command()
+def fetch(
+    aois: str = typer.Argument(..., help='JSON file mapping AOI name -> [min_lon, min_lat, max_lon, max_lat]'),
+    concurrency: int = typer.Option(4, help="Scene downloads in flight at once"),
+    retries: int = typer.Option(3, help="Retries per tile on throttling, 5xx or network errors"),
+    max_tile_deg: float = typer.Option(DEFAULT_MAX_TILE_DEG, help="Split AOIs into tiles no wider than this (degrees)"),
+    time_to: str = typer.Option(None, help="Latest acquisition date to search (YYYY-MM-DD, default today)"),
+    detect_workers: int = typer.Option(1, help="Parallel detection workers"),
+    executor: str = typer.Option("thread", help="Detection executor: thread or process"),
+    queue_size: int = typer.Option(DEFAULT_QUEUE_SIZE, help="Bounded queue size between stages"),
+    model: str = typer.Option("yolov8n.pt", help="YOLO model weights (.onnx for the onnx backend)"),
+    tile_size: int = typer.Option(0, help="Tile large rasters into windows of this size (0 = whole image)"),
+    backend: str = typer.Option("ultralytics", help="Detector backend: ultralytics or onnx"),
+    cache_dir: str = typer.Option(None, help="Reuse detections for scenes seen before (on-disk cache)"),
+    tile_store: str = typer.Option(None, help="SQLite tile store; skip clouded/unchanged tiles (needs --tile-size)"),
+    publish_interval_ms: float = typer.Option(0, help="Coalesce track updates and publish them in batches this often (0 = per update)"),
+):
+    """Fetch the latest Sentinel-2 scenes for many AOIs and ingest each as it arrives."""
+    logging.basicConfig(level=logging.INFO)
+    with open(aois) as f:
+        areas = json.load(f)
+    connector = _publisher(publish_interval_ms)
+    pipeline = build_ingestion_pipeline(
+        connector,
+        detect_workers=detect_workers,
+        detect_executor=executor,
+        queue_size=queue_size,
+        model_path=model,
+        tile_size=tile_size,
+        backend=backend,
+        cache_dir=cache_dir,
+        tile_store=tile_store,
+    )
+    try:
+        counts = asyncio.run(_fetch(pipeline, areas, concurrency, retries, max_tile_deg, time_to))
+    finally:
+        _close(connector)
+    typer.echo(json.dumps({"fetch": counts, **pipeline.stats()}, indent=2))
+
+
+async def _fetch(pipeline, areas, concurrency: int, retries: int, max_tile_deg: float, time_to) -> dict:
+    async with SentinelClient(max_connections=concurrency) as client, pipeline:
+        scheduler = FetchScheduler(client, concurrency=concurrency, retries=retries, max_tile_deg=max_tile_deg)
+        return await scheduler.feed(areas, pipeline.submit, time_to=time_to)
+
+
+@app.command()
+def feed(
+    kind: str = typer.Argument(..., help="Feed format: ais (NMEA AIVDM) or adsb (SBS-1/BaseStation)"),
+    file: str = typer.Option(None, help="Read a recorded feed from this file"),
+    tcp: str = typer.Option(None, help="Connect to host:port (e.g. localhost:30003 for dump1090)"),
+    udp: str = typer.Option(None, help="Listen for datagrams on host:port"),
+    stats_interval: float = typer.Option(10.0, help="Seconds between feed stats reports (0 disables)"),
+):
+    """Ingest an AIS or ADS-B feed into the correlation engine."""
+    from ghost_sentry.feeds.sources import DECODERS, FeedIngestor, iter_file_chunks, iter_tcp_chunks, iter_udp_chunks
+
+    logging.basicConfig(level=logging.INFO)
+    if kind not in DECODERS:
+        raise typer.BadParameter(f"kind must be one of {sorted(DECODERS)}")
+    if sum(bool(x) for x in (file, tcp, udp)) != 1:
+        raise typer.BadParameter("give exactly one of --file, --tcp or --udp")
+    ingestor = FeedIngestor(DECODERS[kind]())
+    if file:
+        stats = ingestor.ingest_all(iter_file_chunks(file))
+    else:
+        host, port = (tcp or udp).rsplit(":", 1)
+        chunks = iter_tcp_chunks(host, int(port)) if tcp else iter_udp_chunks(host, int(port))
+        try:
+            stats = asyncio.run(ingestor.run(chunks, stats_interval))
+        except KeyboardInterrupt:
+            stats = ingestor.stats()
+    typer.echo(json.dumps({**stats, "entities": ingestor.matcher.entity_count()}, indent=2))
+
+
+@app.command()
+def subscribe(
+    endpoint: str = typer.Option(None, help="Lattice endpoint to stream entities from (default: $LATTICE_ENDPOINT)"),
+    stats_interval: float = typer.Option(10.0, help="Seconds between subscription stats reports (0 disables)"),
+):
+    """Receive tracks from the mesh: stream entity updates into the local picture."""
+    import os
+    from ghost_sentry.core import db
+    from ghost_sentry.lattice.subscriber import LatticeSubscriber
+
+    logging.basicConfig(level=logging.INFO)
+    endpoint = endpoint or os.environ.get("LATTICE_ENDPOINT")
+    if not endpoint:
+        raise typer.BadParameter("give --endpoint or set LATTICE_ENDPOINT")
+    db.init_db()
+    subscriber = LatticeSubscriber(endpoint, token=os.environ.get("LATTICE_API_KEY"))
+    try:
+        asyncio.run(_subscribe(subscriber, stats_interval))
+    except KeyboardInterrupt:
+        pass
+    typer.echo(json.dumps({**subscriber.stats(), "lifecycle": subscriber.matcher.entity_count()}, indent=2))
+
+
+@app.command()
+def tak(
+    port: int = typer.Option(8087, help="TCP port for streaming CoT clients (0 disables)"),
+    udp: str = typer.Option(None, help="Also send each event as a datagram to host:port (SA multicast: 239.2.3.1:6969)"),
+    host: str = typer.Option("0.0.0.0", help="Interface for the TCP port"),
+    min_interval_ms: float = typer.Option(1000, help="Send each entity at most this often; updates in between are coalesced"),
+    max_buffer_kb: int = typer.Option(1024, help="Drop a client with this much unsent output beyond one full picture"),
+    refresh_s: float = typer.Option(60, help="Re-send the whole picture this often so markers stay fresh (0 disables)"),
+    endpoint: str = typer.Option(None, help="Lattice endpoint to stream live updates from (default: $LATTICE_ENDPOINT)"),
+    stats_interval: float = typer.Option(10.0, help="Seconds between server stats reports (0 disables)"),
+):
+    """Stream the track picture to TAK clients as raw CoT over TCP and UDP."""
+    import os
+    from ghost_sentry.core import db
+    from ghost_sentry.output.cot_server import CotServer
+
+    logging.basicConfig(level=logging.INFO)
+    if not port and not udp:
+        raise typer.BadParameter("give a --port, --udp or both")
+    db.init_db()
+    server = CotServer(
+        host=host,
+        port=port or None,
+        udp=udp,
+        max_buffer=max_buffer_kb * 1024,
+        min_interval_s=min_interval_ms / 1000,
+        refresh_s=refresh_s,
+    )
+    server.seed(db.get_tracks())
+    endpoint = endpoint or os.environ.get("LATTICE_ENDPOINT")
+    try:
+        asyncio.run(_tak(server, endpoint, stats_interval))
+    except KeyboardInterrupt:
+        pass
+    typer.echo(json.dumps(server.stats(), indent=2))
+
+
+async def _tak(server, endpoint: str, stats_interval: float) -> None:
+    import os
+    from ghost_sentry.core import events
+
+    reporter = None
+    async with server:
+        events.subscribe(server.on_event)
+        if stats_interval > 0:
+            async def report():
+                while True:
+                    await asyncio.sleep(stats_interval)
+                    logging.info(f"[tak] {server.stats()}")
+            reporter = asyncio.create_task(report())
+        try:
+            if endpoint:
+                from ghost_sentry.lattice.subscriber import LatticeSubscriber
+                # Mesh updates land in the local picture and reach the server through the event bus
+                await LatticeSubscriber(endpoint, token=os.environ.get("LATTICE_API_KEY")).run()
+            else:
+                await asyncio.Event().wait()
+        finally:
+            if reporter:
+                reporter.cancel()
+
+
+async def _subscribe(subscriber, stats_interval: float) -> None:
+    reporter = None
+    if stats_interval > 0:
+        async def report():
+            while True:
+                await asyncio.sleep(stats_interval)
+                logging.info(f"[subscribe] {subscriber.stats()}")
+        reporter = asyncio.create_task(report())
+    try:
+        await subscriber.run()
+    finally:
+        if reporter:
+            reporter.cancel()
+
+
+async def _watch(pipeline, watcher, stats_interval: float) -> None:
+    reporter = None
+    async with pipeline:
+        if stats_interval > 0:
+            reporter = asyncio.create_task(_report_stats(pipeline, stats_interval))
+        try:
+            await watcher.run(pipeline.submit)
+        finally:
+            if reporter:
+                reporter.cancel()
+
+
+async def _serve(pipeline, stats_interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    reporter = None
+    async with pipeline:
+        if stats_interval > 0:
+            reporter = asyncio.create_task(_report_stats(pipeline, stats_interval))
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            path = line.strip()
+            if path:
+                # Blocks while the pipeline is saturated, throttling the reader
+                await pipeline.submit(path)
+    if reporter:
+        reporter.cancel()
+    typer.echo(json.dumps(pipeline.stats(), indent=2))
+
+
+async def _report_stats(pipeline, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        for stage in pipeline.stats()["stages"]:
+            logging.info(
+                f"[pipeline] {stage['name']}: depth={stage['queue_depth']}/{stage['queue_size']} "
+                f"processed={stage['processed']} avg={stage['avg_latency_ms']}ms errors={stage['errors']}"
+            )
+
+
 if __name__ == "__main__":
-    typer.run(detect)
+    app()
@@ -0,0 +1,59 @@
+"""Vectorized bounding-box utilities (xyxy pixel boxes)."""
+import numpy as np
+
+
+def box_area(boxes: np.ndarray) -> np.ndarray:
+    return (boxes[:, 2] - boxes[:, 0]).clip(0) * (boxes[:, 3] - boxes[:, 1]).clip(0)
+
+
+def _overlap(box: np.ndarray, boxes: np.ndarray, areas: np.ndarray, area: float, metric: str) -> np.ndarray:
+    xx1 = np.maximum(box[0], boxes[:, 0])
+    yy1 = np.maximum(box[1], boxes[:, 1])
+    xx2 = np.minimum(box[2], boxes[:, 2])
+    yy2 = np.minimum(box[3], boxes[:, 3])
+    inter = (xx2 - xx1).clip(0) * (yy2 - yy1).clip(0)
+    if metric == "ios":
+        # Intersection over the smaller box: catches partial boxes cut by a tile seam
+        denom = np.minimum(area, areas)
+    else:
+        denom = area + areas - inter
+    return inter / np.maximum(denom, 1e-9)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, threshold: float = 0.5, metric: str = "iou") -> np.ndarray:
+    """
+    Greedy non-maximum suppression.
+
+    Returns the indices of kept boxes, highest score first. ``metric`` is
+    "iou" (intersection over union) or "ios" (intersection over smaller).
+    """
+    if metric not in {"iou", "ios"}:
+        raise ValueError(f"Unknown overlap metric '{metric}'")
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float64)
+    areas = box_area(boxes)
+    order = np.argsort(-scores, kind="stable")  # ties keep input order
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        overlap = _overlap(boxes[i], boxes[rest], areas[rest], areas[i], metric)
+        order = rest[overlap <= threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def batched_nms(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    threshold: float = 0.5,
+    metric: str = "iou",
+) -> np.ndarray:
+    """Class-aware NMS: boxes of different classes never suppress each other."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    if boxes.size == 0:
+        return np.empty(0, dtype=np.int64)
+    # Shift each class into its own coordinate range so one NMS pass suffices
+    offsets = np.asarray(class_ids, dtype=np.float64)[:, None] * (boxes.max() + 1)
+    return nms(boxes + offsets, scores, threshold, metric)
@@ -1,11 +1,15 @@
 """Entity correlation and deduplication for multi-sensor fusion."""
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, UTC
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from enum import Enum
-from shapely.geometry import Point
+import math
+import threading
+import time
 import uuid
 
+import numpy as np
+
 
 class LifecycleState(Enum):
     TENTATIVE = "TENTATIVE"
@@ -23,6 +27,8 @@ LIFECYCLE_TTL = {
 CORRELATION_RADIUS_M = 100
 CORRELATION_TIME_WINDOW = timedelta(seconds=60)
 FIRM_OBSERVATION_THRESHOLD = 2
+# How often correlate() ages entities (STALE/DROPPED) and evicts dropped ones
+STALENESS_SWEEP_S = 1.0
 
 
 @dataclass
@@ -36,11 +42,12 @@ class CorrelatedEntity:
     first_seen: datetime = field(default_factory=lambda: datetime.now(UTC))
     last_seen: datetime = field(default_factory=lambda: datetime.now(UTC))
     sources: List[str] = field(default_factory=list)
+    external_id: Optional[str] = None  # transmitter identity for cooperative feeds, e.g. "ais:366123456"
 
-    def update(self, location: Tuple[float, float], confidence: float, source: str) -> None:
+    def update(self, location: Tuple[float, float], confidence: float, source: str, count: int = 1) -> None:
         self.location = location
         self.confidence = max(self.confidence, confidence)
-        self.observation_count += 1
+        self.observation_count += count
         self.last_seen = datetime.now(UTC)
         if source not in self.sources:
             self.sources.append(source)
@@ -77,7 +84,8 @@ class CorrelatedEntity:
             "observation_count": self.observation_count,
             "first_seen": self.first_seen.isoformat(),
             "last_seen": self.last_seen.isoformat(),
-            "sources": self.sources
+            "sources": self.sources,
+            "external_id": self.external_id,
         }
 
 
@@ -89,12 +97,29 @@ class EntityMatcher:
     - Spatial/temporal correlation
     - Lifecycle state management
     - Deduplication across observation sources
+
+    Entities are indexed in a grid of ``radius``-sized cells per entity type,
+    so a lookup only visits the 3x3 cells around the observation. Staleness
+    is swept at most every ``sweep_interval_s`` from the correlate calls, so
+    a long-running process evicts entities it no longer sees.
+
+    One matcher is shared by the pipeline's sentry stage and the mesh
+    subscriber, which call it from different threads, so every method holds
+    ``_lock`` while it reads or changes the entity table.
     """
     
-    def __init__(self, radius_m: float = CORRELATION_RADIUS_M):
+    def __init__(self, radius_m: float = CORRELATION_RADIUS_M, sweep_interval_s: float = STALENESS_SWEEP_S):
         self._entities: Dict[str, CorrelatedEntity] = {}
+        self._by_external: Dict[str, CorrelatedEntity] = {}
         self._radius_deg = radius_m / 111000.0
         self._time_window = CORRELATION_TIME_WINDOW
+        self._cell_deg = max(self._radius_deg, 1e-9)
+        # (entity_type, lat cell, lon cell) -> entity ids, and each entity's cell
+        self._grid: Dict[Tuple[str, int, int], set] = {}
+        self._cell_of: Dict[str, Tuple[str, int, int]] = {}
+        self._sweep_interval_s = sweep_interval_s
+        self._next_sweep = 0.0
+        self._lock = threading.RLock()
 
     def correlate(
         self, 
@@ -107,27 +132,29 @@ class EntityMatcher:
         Attempt to correlate an observation with existing entities.
         Creates new entity if no match found.
         """
-        self._prune_dropped()
+        with self._lock:
+            return self._correlate(entity_type, location, confidence, source)
+
+    def _correlate(
+        self, entity_type: str, location: Tuple[float, float], confidence: float, source: str
+    ) -> CorrelatedEntity:
+        self._age_out()
         
-        observation_point = Point(location)
+        lat, lon = location
         now = datetime.now(UTC)
         
         best_match: Optional[CorrelatedEntity] = None
         best_distance = float('inf')
         
-        for entity in self._entities.values():
+        for entity in self._near(entity_type, lat, lon):
             if entity.state == LifecycleState.DROPPED:
                 continue
                 
-            if entity.entity_type != entity_type:
-                continue
-                
             age = now - entity.last_seen
             if age > self._time_window:
                 continue
             
-            entity_point = Point(entity.location)
-            distance = observation_point.distance(entity_point)
+            distance = math.hypot(entity.location[0] - lat, entity.location[1] - lon)
             
             if distance <= self._radius_deg and distance < best_distance:
                 best_match = entity
@@ -135,6 +162,7 @@ class EntityMatcher:
         
         if best_match:
             best_match.update(location, confidence, source)
+            self._index(best_match)
             return best_match
         
         new_entity = CorrelatedEntity(
@@ -146,14 +174,126 @@ class EntityMatcher:
             sources=[source]
         )
         self._entities[new_entity.entity_id] = new_entity
+        self._index(new_entity)
         return new_entity
 
+    def correlate_batch(
+        self,
+        entity_type: str,
+        ids: np.ndarray,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        source: str,
+        confidence: Union[float, np.ndarray] = 1.0,
+    ) -> List[CorrelatedEntity]:
+        """
+        Correlate a columnar batch of self-identified reports (AIS, ADS-B).
+
+        Reports are keyed by ``source`` and transmitter id, so an entity is
+        touched once per transmitter per batch (latest position wins). Work
+        and Python objects scale with transmitters, not messages. A
+        transmitter seen for the first time is first offered to nearby
+        unidentified entities of the same type (e.g. a boat found in
+        imagery) before a new entity is created. ``confidence`` is a scalar
+        or one value per report.
+        """
+        with self._lock:
+            return self._correlate_batch(entity_type, ids, latitudes, longitudes, source, confidence)
+
+    def _correlate_batch(
+        self,
+        entity_type: str,
+        ids: np.ndarray,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        source: str,
+        confidence: Union[float, np.ndarray],
+    ) -> List[CorrelatedEntity]:
+        self._age_out()
+        ids = np.asarray(ids)
+        if len(ids) == 0:
+            return []
+        # Last report per transmitter, and how many reports it sent
+        unique, first_from_end, counts = np.unique(ids[::-1], return_index=True, return_counts=True)
+        last = len(ids) - 1 - first_from_end
+        lats = np.asarray(latitudes, dtype=np.float64)[last]
+        lons = np.asarray(longitudes, dtype=np.float64)[last]
+        confidences = np.broadcast_to(np.asarray(confidence, dtype=np.float64), ids.shape)[last]
+        keys = [f"{source}:{i.decode() if isinstance(i, bytes) else i}" for i in unique.tolist()]
+
+        touched: List[CorrelatedEntity] = []
+        new = []
+        for k, key in enumerate(keys):
+            entity = self._by_external.get(key)
+            if entity is None or entity.state == LifecycleState.DROPPED:
+                new.append(k)
+                continue
+            entity.update((float(lats[k]), float(lons[k])), float(confidences[k]), source, count=int(counts[k]))
+            self._index(entity)
+            touched.append(entity)
+
+        claimed = self._claim_unidentified(entity_type, lats[new], lons[new]) if new else {}
+        for n, k in enumerate(new):
+            location = (float(lats[k]), float(lons[k]))
+            entity = claimed.get(n)
+            if entity is not None:
+                entity.update(location, float(confidences[k]), source, count=int(counts[k]))
+            else:
+                entity = CorrelatedEntity(
+                    entity_id=str(uuid.uuid4()),
+                    entity_type=entity_type,
+                    location=location,
+                    confidence=float(confidences[k]),
+                    state=LifecycleState.TENTATIVE,
+                    observation_count=int(counts[k]),
+                    sources=[source],
+                )
+                entity._update_lifecycle()
+                self._entities[entity.entity_id] = entity
+            self._index(entity)
+            entity.external_id = keys[k]
+            self._by_external[keys[k]] = entity
+            touched.append(entity)
+        return touched
+
+    def _claim_unidentified(
+        self, entity_type: str, lats: np.ndarray, lons: np.ndarray
+    ) -> Dict[int, CorrelatedEntity]:
+        """Match new transmitters to live entities without an identity, closest pairs first."""
+        now = datetime.now(UTC)
+        nearby: Dict[str, CorrelatedEntity] = {}
+        for lat, lon in zip(lats.tolist(), lons.tolist()):
+            for e in self._near(entity_type, lat, lon):
+                nearby.setdefault(e.entity_id, e)
+        candidates = [
+            e for e in nearby.values()
+            if e.external_id is None
+            and e.state != LifecycleState.DROPPED
+            and now - e.last_seen <= self._time_window
+        ]
+        if not candidates:
+            return {}
+        from scipy.spatial import cKDTree
+
+        tree = cKDTree(np.array([e.location for e in candidates]))
+        distances, nearest = tree.query(np.column_stack([lats, lons]), distance_upper_bound=self._radius_deg)
+        claimed: Dict[int, CorrelatedEntity] = {}
+        taken = set()
+        for n in np.argsort(distances, kind="stable"):
+            if not np.isfinite(distances[n]) or nearest[n] in taken:
+                continue
+            taken.add(nearest[n])
+            claimed[int(n)] = candidates[nearest[n]]
+        return claimed
+
     def get_entity(self, entity_id: str) -> Optional[CorrelatedEntity]:
-        return self._entities.get(entity_id)
+        with self._lock:
+            return self._entities.get(entity_id)
 
     def get_active_entities(self) -> List[CorrelatedEntity]:
-        self._update_all_staleness()
-        return [e for e in self._entities.values() if e.state != LifecycleState.DROPPED]
+        with self._lock:
+            self._update_all_staleness()
+            return [e for e in self._entities.values() if e.state != LifecycleState.DROPPED]
 
     def get_firm_entities(self) -> List[CorrelatedEntity]:
         return [e for e in self.get_active_entities() if e.state == LifecycleState.FIRM]
@@ -162,17 +302,64 @@ class EntityMatcher:
         for entity in self._entities.values():
             entity.check_staleness()
 
+    def _age_out(self) -> None:
+        """Advance lifecycles and evict dropped entities, at most every ``sweep_interval_s``."""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self._sweep_interval_s
+        self._update_all_staleness()
+        self._prune_dropped()
+
+    def _cell(self, entity_type: str, lat: float, lon: float) -> Tuple[str, int, int]:
+        return entity_type, math.floor(lat / self._cell_deg), math.floor(lon / self._cell_deg)
+
+    def _index(self, entity: CorrelatedEntity) -> None:
+        """File the entity under the grid cell of its current location."""
+        cell = self._cell(entity.entity_type, *entity.location)
+        old = self._cell_of.get(entity.entity_id)
+        if old == cell:
+            return
+        if old is not None:
+            self._unindex(entity.entity_id, old)
+        self._grid.setdefault(cell, set()).add(entity.entity_id)
+        self._cell_of[entity.entity_id] = cell
+
+    def _unindex(self, entity_id: str, cell: Tuple[str, int, int]) -> None:
+        ids = self._grid.get(cell)
+        if ids is not None:
+            ids.discard(entity_id)
+            if not ids:
+                del self._grid[cell]
+
+    def _near(self, entity_type: str, lat: float, lon: float) -> List[CorrelatedEntity]:
+        """Entities of ``entity_type`` in the 3x3 cells around (lat, lon): all that can be within radius."""
+        _, row, col = self._cell(entity_type, lat, lon)
+        found = []
+        for d_row in (-1, 0, 1):
+            for d_col in (-1, 0, 1):
+                ids = self._grid.get((entity_type, row + d_row, col + d_col))
+                if ids:
+                    found.extend(self._entities[eid] for eid in ids)
+        return found
+
     def _prune_dropped(self) -> None:
         dropped_ids = [
             eid for eid, entity in self._entities.items() 
             if entity.state == LifecycleState.DROPPED
         ]
         for eid in dropped_ids:
-            del self._entities[eid]
+            entity = self._entities.pop(eid)
+            cell = self._cell_of.pop(eid, None)
+            if cell is not None:
+                self._unindex(eid, cell)
+            if entity.external_id and self._by_external.get(entity.external_id) is entity:
+                del self._by_external[entity.external_id]
 
     def entity_count(self) -> dict:
-        self._update_all_staleness()
-        counts = {state.value: 0 for state in LifecycleState}
-        for entity in self._entities.values():
-            counts[entity.state.value] += 1
-        return counts
+        with self._lock:
+            self._update_all_staleness()
+            counts = {state.value: 0 for state in LifecycleState}
+            for entity in self._entities.values():
+                counts[entity.state.value] += 1
+            return counts
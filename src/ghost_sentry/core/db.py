@@ -1,9 +1,10 @@
 """SQLite database module for Ghost Sentry."""
 import sqlite3
 import json
+import time
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
 DB_PATH = Path("ghost_sentry.db")
 
@@ -43,31 +44,61 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
         """)
+        # Debounce Table (shared cueing debounce across workers)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS debounce (
+            key TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL  -- unix epoch seconds
+        );
+        """)
         # Indexes for fast queries
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_type ON events(type);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_entity ON events(type, entity_id);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_entity ON tasks(entity_id);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_missions_created ON missions(created_at);")
         conn.commit()
 
-def add_event(event_type: str, data: dict, entity_id: Optional[str] = None):
-    """Add an event to the database."""
+def _json_text(data: Union[dict, bytes]) -> str:
+    # Callers that already rendered the payload (e.g. publish_track) pass the bytes
+    return data.decode() if isinstance(data, bytes) else json.dumps(data)
+
+def add_event(event_type: str, data: Union[dict, bytes], entity_id: Optional[str] = None):
+    """Add an event to the database. ``data`` is a dict or its JSON as bytes."""
     with sqlite3.connect(DB_PATH) as conn:
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO events (type, entity_id, data) VALUES (?, ?, ?)",
-            (event_type, entity_id, json.dumps(data))
+            (event_type, entity_id, _json_text(data))
+        )
+        conn.commit()
+
+def add_events(rows: list[tuple[str, Union[dict, bytes], Optional[str]]]):
+    """Add many ``(type, data, entity_id)`` events in one transaction."""
+    if not rows:
+        return
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany(
+            "INSERT INTO events (type, entity_id, data) VALUES (?, ?, ?)",
+            [(event_type, entity_id, _json_text(data)) for event_type, data, entity_id in rows]
         )
         conn.commit()
 
 def get_tracks():
-    """Retrieve all tracks from the database."""
+    """Retrieve the current state of every track (latest event per entity)."""
+    return [json.loads(text) for text in get_track_texts()]
+
+def get_track_texts() -> list[str]:
+    """Like ``get_tracks``, but the stored JSON text as-is (nothing parsed)."""
     with sqlite3.connect(DB_PATH) as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT data FROM events WHERE type = 'track' ORDER BY created_at DESC")
-        rows = cursor.fetchall()
-        return [json.loads(row[0]) for row in rows]
+        cursor.execute("""
+            SELECT data FROM events WHERE id IN (
+                SELECT MAX(id) FROM events WHERE type = 'track' GROUP BY COALESCE(entity_id, id)
+            ) ORDER BY created_at DESC, id DESC
+        """)
+        return [row[0] for row in cursor.fetchall()]
 
 def add_task(task_id: str, entity_id: str, task_type: str, data: Optional[dict] = None, assigned_to: Optional[str] = None):
     """Add a task to the database."""
@@ -159,6 +190,32 @@ def get_latest_events(limit: int = 50):
             for row in rows
         ]
 
+def claim_debounce(key: str, window_s: float, now: Optional[float] = None) -> bool:
+    """Atomically claim a debounce key. Returns False if it is still held by anyone."""
+    now = time.time() if now is None else now
+    with sqlite3.connect(DB_PATH, timeout=10) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO debounce (key, expires_at) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET expires_at = excluded.expires_at
+            WHERE debounce.expires_at <= ?
+            """,
+            (key, now + window_s, now)
+        )
+        claimed = cursor.rowcount == 1
+        conn.commit()
+        return claimed
+
+def purge_debounce(now: Optional[float] = None) -> int:
+    """Delete expired debounce claims. Returns the number of rows removed."""
+    now = time.time() if now is None else now
+    with sqlite3.connect(DB_PATH, timeout=10) as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM debounce WHERE expires_at <= ?", (now,))
+        conn.commit()
+        return cursor.rowcount
+
 if __name__ == "__main__":
     init_db()
     print("Database initialized.")
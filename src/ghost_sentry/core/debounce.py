@@ -0,0 +1,103 @@
+"""Bounded TTL cache for cueing debounce state."""
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Callable
+
+from ghost_sentry.core import db
+
+# Purge expired rows from the shared table every N claims
+SHARED_PURGE_INTERVAL = 500
+
+
+class DebounceCache:
+    """
+    Remembers which keys fired within the last ``window``.
+
+    Entries live in an OrderedDict in expiry order: the window is fixed, so
+    the order keys fire in is the order they expire in, and expired entries
+    are evicted cheaply from the front. ``max_size`` is a hard cap; when it is
+    reached the entry closest to expiry is dropped.
+
+    With ``shared=True`` a key is claimed atomically in the SQLite DB, so
+    several ingestion workers (threads or processes) honour the same window.
+    The local dict still answers repeat hits without touching the DB.
+    """
+
+    def __init__(
+        self,
+        window: timedelta,
+        max_size: int = 10_000,
+        shared: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self._window_s = window.total_seconds()
+        self._max_size = max_size
+        self._shared = shared
+        self._clock = clock
+        self._expiry: OrderedDict[str, float] = OrderedDict()
+        self._claims = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def should_fire(self, key: str) -> bool:
+        """Return True (and start the window) unless ``key`` fired recently."""
+        now = self._clock()
+        self._expire(now)
+
+        if key in self._expiry:
+            self.hits += 1
+            return False
+
+        if self._shared and not self._claim_shared(key, now):
+            self.hits += 1
+            return False
+
+        self.misses += 1
+        self._expiry[key] = now + self._window_s
+        if len(self._expiry) > self._max_size:
+            self._expiry.popitem(last=False)
+            self.evictions += 1
+        return True
+
+    def clear(self) -> None:
+        self._expiry.clear()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def __contains__(self, key: str) -> bool:
+        expires_at = self._expiry.get(key)
+        return expires_at is not None and expires_at > self._clock()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._expiry),
+            "max_size": self._max_size,
+            "window_s": self._window_s,
+            "shared": self._shared,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _expire(self, now: float) -> None:
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._expiry.popitem(last=False)
+            self.expirations += 1
+
+    def _claim_shared(self, key: str, now: float) -> bool:
+        self._claims += 1
+        if self._claims % SHARED_PURGE_INTERVAL == 0:
+            db.purge_debounce(now)
+        return db.claim_debounce(key, self._window_s, now)
@@ -0,0 +1,223 @@
+"""Content-addressed on-disk cache of detector output."""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ghost_sentry.core.models import Detection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 2**20
+HASH_CHUNK_BYTES = 2**20
+ENTRY_SUFFIX = ".json"
+
+ImageSource = Union[str, np.ndarray]
+
+
+def content_hash(source: ImageSource) -> str:
+    """sha256 of an image file's bytes, or of an array's pixels, shape and dtype."""
+    digest = hashlib.sha256()
+    if isinstance(source, np.ndarray):
+        digest.update(f"{source.shape}{source.dtype}".encode())
+        digest.update(np.ascontiguousarray(source).data)
+    else:
+        with open(source, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode(detections: List[Detection]) -> bytes:
+    """Column-wise compact JSON: one list per field instead of one object per box."""
+    return json.dumps(
+        {
+            "label": [d.label for d in detections],
+            "confidence": [d.confidence for d in detections],
+            "bbox": [c for d in detections for c in d.bbox],
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+def decode(payload: bytes) -> List[Detection]:
+    data = json.loads(payload)
+    flat = data["bbox"]
+    return [
+        Detection.model_construct(label=label, confidence=confidence, bbox=tuple(flat[4 * i:4 * i + 4]))
+        for i, (label, confidence) in enumerate(zip(data["label"], data["confidence"]))
+    ]
+
+
+class DetectionCache:
+    """
+    Detection lists on disk, keyed by image content + detector identity.
+
+    One small file per entry under ``directory``. Recency is the file mtime
+    (touched on every hit), so several processes can share a directory and
+    the LRU order survives restarts. When the total size passes
+    ``max_bytes`` the least recently used entries are deleted. Writes go to a
+    temporary file and are renamed into place, so readers never see a
+    partial entry.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    @staticmethod
+    def key(image_hash: str, identity: dict) -> str:
+        """Entry key for an image hash and a detector's identity (model + parameters)."""
+        blob = json.dumps(identity, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(f"{image_hash}:{blob}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Detection]]:
+        path = self._path(key)
+        try:
+            payload = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+                self._forget(key)
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+            else:  # written by another process sharing the directory
+                self._remember(key, len(payload))
+        return decode(payload)
+
+    def put(self, key: str, detections: List[Detection]) -> None:
+        payload = encode(detections)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+        with self._lock:
+            self._forget(key)
+            self._remember(key, len(payload))
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._sizes):
+                self._path(key).unlink(missing_ok=True)
+                self._forget(key)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._sizes),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def _scan(self) -> None:
+        entries = []
+        for path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._remember(key, size)
+        self._evict()
+
+    def _remember(self, key: str, size: int) -> None:
+        self._sizes[key] = size
+        self._bytes += size
+
+    def _forget(self, key: str) -> None:
+        self._bytes -= self._sizes.pop(key, 0)
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._sizes) > 1:
+            key, size = self._sizes.popitem(last=False)
+            self._bytes -= size
+            self._path(key).unlink(missing_ok=True)
+            self.evictions += 1
+
+
+# One cache object per directory per process, shared by all detector threads
+_caches: dict[str, DetectionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def open_cache(directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> DetectionCache:
+    resolved = str(Path(directory).resolve())
+    with _caches_lock:
+        if resolved not in _caches:
+            _caches[resolved] = DetectionCache(resolved, max_bytes=max_bytes)
+        return _caches[resolved]
+
+
+def cache_stats() -> dict:
+    """Stats for every cache opened in this process, by directory."""
+    return {directory: cache.stats() for directory, cache in _caches.items()}
+
+
+class CachedDetector:
+    """
+    Wraps a detector so repeated scenes skip inference entirely.
+
+    The wrapped detector supplies ``identity()`` (model + inference
+    parameters), which is folded into every key so a model swap or a
+    threshold change never serves stale results.
+    """
+
+    def __init__(self, detector: Any, cache: DetectionCache):
+        self.detector = detector
+        self.cache = cache
+        self._identity = detector.identity()
+
+    def detect(self, source: ImageSource) -> List[Detection]:
+        key = self.cache.key(content_hash(source), self._identity)
+        detections = self.cache.get(key)
+        if detections is None:
+            detections = self.detector.detect(source)
+            self.cache.put(key, detections)
+        return detections
+
+    def detect_batch(self, sources: Sequence[ImageSource], batch_size: int = 8) -> List[List[Detection]]:
+        """Only the cache misses are sent to the wrapped detector, still batched."""
+        keys = [self.cache.key(content_hash(source), self._identity) for source in sources]
+        results: List[Optional[List[Detection]]] = [self.cache.get(key) for key in keys]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if missing:
+            fresh = self.detector.detect_batch([sources[i] for i in missing], batch_size=batch_size)
+            for i, detections in zip(missing, fresh):
+                self.cache.put(keys[i], detections)
+                results[i] = detections
+        return results
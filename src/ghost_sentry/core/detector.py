@@ -1,35 +1,139 @@
-"""Object detection using YOLOv8."""
-from typing import Optional
-from pydantic import BaseModel
-from ultralytics import YOLO
-
-class Detection(BaseModel):
-    """A single detected object."""
-    label: str
-    confidence: float
-    bbox: tuple[int, int, int, int]  # x1, y1, x2, y2
-    geo_location: Optional[tuple[float, float]] = None  # lat, lon
+"""Object detection using YOLOv8.
+
+The model runs on a pluggable backend: "ultralytics" (PyTorch) or "onnx"
+(ONNX Runtime, see ``onnx_backend``). Backends are imported when the first
+ObjectDetector is built, not when this module is imported.
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional, Sequence, Union
+import numpy as np
+from ghost_sentry.core.models import Detection
+
+# A path on disk, or an HxWx3 BGR uint8 array (the ultralytics/OpenCV convention)
+ImageSource = Union[str, np.ndarray]
+
+BACKENDS = ("ultralytics", "onnx")
+
+def _yolo_class():
+    from ultralytics import YOLO
+    return YOLO
+
+def _onnx_class():
+    from ghost_sentry.core.onnx_backend import OnnxYOLO
+    return OnnxYOLO
+
+def _model_class(backend: str):
+    """Model class for a backend; each exposes ``names`` and ``predict``."""
+    if backend == "ultralytics":
+        return _yolo_class()
+    if backend == "onnx":
+        return _onnx_class()
+    raise ValueError(f"Unknown detector backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+def _to_numpy(values) -> np.ndarray:
+    """Accept torch tensors or array-likes."""
+    if hasattr(values, "cpu"):
+        values = values.cpu()
+    if hasattr(values, "numpy"):
+        return values.numpy()
+    return np.asarray(values)
 
 class ObjectDetector:
     """YOLOv8-based object detector."""
-    
+
     TACTICAL_CLASSES = {"airplane", "truck", "car", "boat", "bus"}
-    
-    def __init__(self, model_path: str = "yolov8n.pt"):
-        self.model = YOLO(model_path)
-    
-    def detect(self, image_path: str) -> list[Detection]:
+    DEFAULT_BATCH_SIZE = 8
+
+    def __init__(self, model_path: str = "yolov8n.pt", conf: float = 0.25, backend: str = "ultralytics"):
+        self.model = _model_class(backend)(model_path)
+        self.model_path = model_path
+        self.backend = backend
+        self.conf = conf
+        names = self.model.names
+        # Precomputed class-id lookups so filtering never touches label strings
+        self._labels = np.array([names[i] for i in range(len(names))], dtype=object)
+        self._tactical_ids = np.array(
+            sorted(i for i, name in names.items() if name in self.TACTICAL_CLASSES), dtype=np.int64
+        )
+
+    def identity(self) -> dict:
+        """Everything that changes this detector's output, for result caching."""
+        path = Path(self.model_path)
+        # Hash the weights when they are on disk so a retrained file never aliases the old one
+        model = hashlib.sha256(path.read_bytes()).hexdigest() if path.is_file() else self.model_path
+        return {
+            "model": model,
+            "backend": self.backend,
+            "conf": self.conf,
+            "classes": self._tactical_ids.tolist(),
+        }
+
+    def detect(self, image_path: ImageSource) -> list[Detection]:
         """Run detection on an image."""
-        results = self.model(image_path)
-        detections = []
-        for result in results:
-            for box in result.boxes:
-                label = result.names[int(box.cls)]
-                if label in self.TACTICAL_CLASSES:
-                    detections.append(Detection(
-                        label=label,
-                        confidence=float(box.conf),
-                        bbox=tuple(map(int, box.xyxy[0].tolist())),
-                        geo_location=None  # Populated by geo module if available
-                    ))
+        return self.detect_batch([image_path], batch_size=1)[0]
+
+    def detect_batch(
+        self,
+        sources: Sequence[ImageSource],
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ) -> list[list[Detection]]:
+        """Run detection on many images, ``batch_size`` at a time. One list per source."""
+        if len(self._tactical_ids) == 0:
+            return [[] for _ in sources]
+
+        detections: list[list[Detection]] = []
+        classes = self._tactical_ids.tolist()
+        for start in range(0, len(sources), batch_size):
+            chunk = list(sources[start:start + batch_size])
+            # Passing classes lets YOLO drop non-tactical boxes inside NMS
+            results = self.model.predict(
+                chunk, classes=classes, conf=self.conf, batch=len(chunk), verbose=False
+            )
+            detections.extend(self._extract(result) for result in results)
         return detections
+
+    def _extract(self, result) -> list[Detection]:
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return []
+        cls = _to_numpy(boxes.cls).astype(np.int64)
+        conf = _to_numpy(boxes.conf).astype(float)
+        xyxy = _to_numpy(boxes.xyxy).astype(np.int64)
+
+        keep = np.isin(cls, self._tactical_ids)
+        labels = self._labels[cls[keep]].tolist()
+        return [
+            # Values come straight from the model with known types; skip validation
+            Detection.model_construct(label=label, confidence=score, bbox=tuple(box))
+            for label, score, box in zip(labels, conf[keep].tolist(), xyxy[keep].tolist())
+        ]
+
+
+def build_detector(
+    model_path: str = "yolov8n.pt",
+    backend: str = "ultralytics",
+    tile_size: int = 0,
+    cache_dir: Optional[str] = None,
+    tile_store: Optional[str] = None,
+):
+    """
+    ObjectDetector, tiled if ``tile_size``, behind a result cache if ``cache_dir``.
+
+    ``tile_store`` (an SQLite path, tiled mode only) enables the pre-inference
+    filter that skips clouded and unchanged tiles.
+    """
+    if tile_store and not tile_size:
+        raise ValueError("tile_store requires tile_size")
+    detector = ObjectDetector(model_path, backend=backend)
+    if tile_size:
+        from ghost_sentry.core.tiling import TiledDetector
+        tile_filter = None
+        if tile_store:
+            from ghost_sentry.core.tile_filter import open_filter
+            tile_filter = open_filter(tile_store)
+        detector = TiledDetector(detector, tile_size=tile_size, tile_filter=tile_filter)
+    if cache_dir:
+        from ghost_sentry.core.detection_cache import CachedDetector, open_cache
+        detector = CachedDetector(detector, open_cache(cache_dir))
+    return detector
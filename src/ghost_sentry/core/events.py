@@ -1,12 +1,21 @@
 """Core event bus for Ghost Sentry."""
 from dataclasses import dataclass
-from typing import Callable, List
+from typing import Callable, List, Optional
 import logging
 
+from ghost_sentry.core import serialization
+
 @dataclass
 class TrackEvent:
     entity_id: str
     data: dict
+    raw: Optional[bytes] = None  # ``data`` rendered as JSON, shared by every consumer
+
+    def json_bytes(self) -> bytes:
+        """``data`` as JSON, rendered at most once per event."""
+        if self.raw is None:
+            self.raw = serialization.dumps(self.data)
+        return self.raw
 
 _listeners: List[Callable[[TrackEvent], None]] = []
 
@@ -22,3 +31,8 @@ def publish(event: TrackEvent):
             listener(event)
         except Exception as e:
             logging.error(f"Error in event listener: {e}")
+
+def publish_many(batch: List[TrackEvent]):
+    """Publish a batch of events, in order, to all subscribers."""
+    for event in batch:
+        publish(event)
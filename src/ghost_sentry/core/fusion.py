@@ -1,32 +1,168 @@
 """Multi-modal detection fusion engine."""
-from typing import List
-from ghost_sentry.core.detector import Detection
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ghost_sentry.core.models import Detection
+
+# Cross-sensor detections closer than this are treated as the same object
+FUSION_GATE_M = 50.0
+METERS_PER_DEG_LAT = 110_540.0
+METERS_PER_DEG_LON = 111_320.0
+
+
+def noisy_or(confidences: Sequence[float]) -> float:
+    """Confidence that at least one independent sensor is right: 1 - prod(1 - c)."""
+    miss = 1.0
+    for c in confidences:
+        miss *= 1.0 - min(max(c, 0.0), 1.0)
+    return 1.0 - miss
+
+
+def to_local_meters(latlon: np.ndarray) -> np.ndarray:
+    """(n, 2) lat/lon -> (n, 2) equirectangular metres around the batch centre; fine at AOI scale."""
+    lat0 = math.radians(float(latlon[:, 0].mean()))
+    return np.column_stack([
+        latlon[:, 0] * METERS_PER_DEG_LAT,
+        latlon[:, 1] * METERS_PER_DEG_LON * math.cos(lat0),
+    ])
+
 
 class FusionEngine:
-    """Fuses detections from multiple sensors (e.g., Optical, SAR)."""
-    
-    def __init__(self, optical_threshold: float = 0.5):
+    """
+    Fuses detections from multiple sensors (e.g., Optical, SAR).
+
+    Detections from different sensors that fall within ``gate_m`` of each
+    other (and share a label, unless ``match_labels`` is off) are merged
+    into one detection:
+
+    - confidence is the noisy-OR of the members, so agreement raises it;
+    - position is the confidence-weighted mean of the members;
+    - label and bbox come from the most confident member;
+    - ``sources`` lists every sensor that contributed (sorted).
+
+    Each fused detection holds at most one detection per sensor; pairs are
+    merged closest first. Inputs are never modified.
+    """
+
+    def __init__(
+        self,
+        optical_threshold: float = 0.5,
+        gate_m: float = FUSION_GATE_M,
+        match_labels: bool = True,
+    ):
         self.optical_threshold = optical_threshold
-    
+        self.gate_m = gate_m
+        self.match_labels = match_labels
+
     def fuse(self, optical_detections: List[Detection], sar_detections: List[Detection]) -> List[Detection]:
         """
-        Fuse detections. 
-        Current Logic: 
-        - If Optical detections reflect high confidence (>= threshold), prioritize them.
-        - If Optical confidence is low (e.g., cloudy), they are filtered out, and SAR detections act as primary leads.
-        - SAR detections are always included as all-weather/all-day primary leads.
+        Fuse one optical and one SAR batch.
+
+        Optical detections below ``optical_threshold`` (e.g. cloud-degraded)
+        are not reported on their own but still corroborate a SAR detection
+        at the same place. SAR detections are always reported as
+        all-weather/all-day leads.
         """
+        return self.fuse_sensors(
+            {"optical": optical_detections, "sar": sar_detections},
+            min_confidence={"optical": self.optical_threshold},
+        )
+
+    def fuse_sensors(
+        self,
+        detections_by_sensor: Dict[str, List[Detection]],
+        min_confidence: Optional[Dict[str, float]] = None,
+    ) -> List[Detection]:
+        """
+        Fuse any number of sensor batches.
+
+        ``min_confidence`` maps a sensor to the confidence its detections need
+        to be reported without corroboration from another sensor.
+        """
+        min_confidence = min_confidence or {}
+        items = [
+            (sensor, d)
+            for sensor, detections in detections_by_sensor.items()
+            for d in detections
+        ]
+        clusters = self.cluster(items)
+
         fused = []
-        
-        # Add optical detections if they meet the confidence threshold
-        for d in optical_detections:
-            if d.confidence >= self.optical_threshold:
-                d.label = f"{d.label} (Optical)"
-                fused.append(d)
-            
-        # Add SAR detections and mark source
-        for d in sar_detections:
-            d.label = f"{d.label} (SAR)"
-            fused.append(d)
-            
+        for members in clusters:
+            if len(members) == 1:
+                sensor, d = items[members[0]]
+                if d.confidence < min_confidence.get(sensor, 0.0):
+                    continue
+            fused.append(self.merge([items[i] for i in members]))
         return fused
+
+    def cluster(
+        self,
+        items: List[tuple[str, Detection]],
+        times: Optional[Sequence[float]] = None,
+        window_s: Optional[float] = None,
+    ) -> List[List[int]]:
+        """
+        Group ``(sensor, detection)`` items into objects; returns lists of item indexes.
+
+        With ``times`` and ``window_s`` two items only match if they were
+        observed at most ``window_s`` apart. Clusters come back in input
+        order of their first member.
+        """
+        parent = list(range(len(items)))
+        sensors = [{sensor} for sensor, _ in items]
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        located = [i for i, (_, d) in enumerate(items) if d.geo_location is not None]
+        if len(located) > 1:
+            from scipy.spatial import cKDTree
+
+            points = to_local_meters(np.array([items[i][1].geo_location for i in located], dtype=np.float64))
+            tree = cKDTree(points)
+            pairs = tree.query_pairs(self.gate_m, output_type="ndarray")
+            if len(pairs):
+                distances = np.linalg.norm(points[pairs[:, 0]] - points[pairs[:, 1]], axis=1)
+                for a, b in pairs[np.argsort(distances, kind="stable")]:
+                    i, j = located[a], located[b]
+                    if items[i][0] == items[j][0]:
+                        continue  # same sensor: duplicates are NMS's job, not fusion's
+                    if self.match_labels and items[i][1].label != items[j][1].label:
+                        continue
+                    if window_s is not None and abs(times[i] - times[j]) > window_s:
+                        continue
+                    root_i, root_j = find(i), find(j)
+                    if root_i == root_j or sensors[root_i] & sensors[root_j]:
+                        continue
+                    parent[root_j] = root_i
+                    sensors[root_i] |= sensors[root_j]
+
+        clusters: Dict[int, List[int]] = {}
+        for i in range(len(items)):
+            clusters.setdefault(find(i), []).append(i)
+        return sorted(clusters.values(), key=lambda members: members[0])
+
+    @staticmethod
+    def merge(members: List[tuple[str, Detection]]) -> Detection:
+        sources = sorted({source for sensor, d in members for source in d.sources or [sensor]})
+        best = max((d for _, d in members), key=lambda d: d.confidence)
+        if len(members) == 1:
+            return best.model_copy(update={"sources": sources})
+
+        confidences = [d.confidence for _, d in members]
+        weights = np.array(confidences, dtype=np.float64)
+        locations = np.array([d.geo_location for _, d in members], dtype=np.float64)
+        if weights.sum() <= 0:
+            weights = np.ones_like(weights)
+        lat, lon = (weights[:, None] * locations).sum(axis=0) / weights.sum()
+        return best.model_copy(update={
+            "confidence": noisy_or(confidences),
+            "geo_location": (float(lat), float(lon)),
+            "sources": sources,
+        })
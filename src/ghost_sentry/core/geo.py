@@ -1,24 +1,143 @@
 """Geospatial coordinate utilities."""
-from pathlib import Path
-from typing import Optional
-import rasterio
-from rasterio.transform import xy
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
 
-def pixel_to_latlon(
-    image_path: str, 
-    pixel_x: int, 
-    pixel_y: int
-) -> Optional[tuple[float, float]]:
-    """Convert pixel coordinates to lat/lon if image has CRS metadata."""
+import numpy as np
+
+WGS84 = "EPSG:4326"
+DEFAULT_CACHE_ENTRIES = 256
+
+
+@dataclass(frozen=True)
+class RasterGeo:
+    """The georeferencing of one raster: pixel -> CRS affine plus the CRS."""
+    transform: Any  # affine.Affine
+    crs: Any  # rasterio.crs.CRS
+
+    def pixels_to_latlon(self, cols: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """(n, 2) array of (lat, lon) for pixel columns/rows, sampled at pixel centres."""
+        t = self.transform
+        cols = np.asarray(cols, dtype=np.float64) + 0.5
+        rows = np.asarray(rows, dtype=np.float64) + 0.5
+        xs = t.a * cols + t.b * rows + t.c
+        ys = t.d * cols + t.e * rows + t.f
+        if not self.crs.is_geographic:
+            from rasterio.warp import transform as warp
+            xs, ys = warp(self.crs, WGS84, xs, ys)
+        return np.column_stack([ys, xs])
+
+
+class GeoReferencer:
+    """
+    Pixel -> lat/lon conversion with raster metadata cached per scene.
+
+    A scene is opened once to read its transform and CRS, which are kept in
+    an LRU keyed by (path, mtime), so a rewritten file is re-read. Scenes
+    without a CRS (plain JPEGs, unreadable files) are cached as such too.
+    Whole batches of box centroids are converted in one vectorized call and
+    reprojected to WGS84 when the raster CRS is projected (e.g. UTM).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self._cache: OrderedDict[tuple[str, int], Optional[RasterGeo]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def metadata(self, image_path: str) -> Optional[RasterGeo]:
+        try:
+            key = (os.path.abspath(image_path), os.stat(image_path).st_mtime_ns)
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._cache:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            self.misses += 1
+        geo = _read_metadata(image_path)
+        with self._lock:
+            self._cache[key] = geo
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return geo
+
+    def pixels_to_latlon(self, image_path: str, cols, rows) -> Optional[np.ndarray]:
+        """(n, 2) (lat, lon) array, or None if the image is not georeferenced."""
+        geo = self.metadata(image_path)
+        if geo is None:
+            return None
+        return geo.pixels_to_latlon(cols, rows)
+
+    def georeference(self, image_path: str, detections: list, use_mock: bool = True) -> list:
+        """Fill ``geo_location`` from bbox centroids; fall back to mock coordinates."""
+        pending = [d for d in detections if d.geo_location is None]
+        if pending:
+            boxes = np.array([d.bbox for d in pending], dtype=np.int64).reshape(-1, 4)
+            latlon = self.pixels_to_latlon(
+                image_path, (boxes[:, 0] + boxes[:, 2]) // 2, (boxes[:, 1] + boxes[:, 3]) // 2
+            )
+            if latlon is not None:
+                for d, (lat, lon) in zip(pending, latlon.tolist()):
+                    d.geo_location = (lat, lon)
+        if use_mock:
+            for d in detections:
+                if d.geo_location is None:
+                    d.geo_location = mock_geo_location()
+        return detections
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def _read_metadata(image_path: str) -> Optional[RasterGeo]:
+    import rasterio
     try:
         with rasterio.open(image_path) as src:
             if src.crs is None:
                 return None
-            lon, lat = xy(src.transform, pixel_y, pixel_x)
-            return (lat, lon)
+            return RasterGeo(src.transform, src.crs)
     except Exception:
         return None
 
+
+# Shared by the CLI, pipeline stages and worker aggregator
+_referencer = GeoReferencer()
+
+
+def pixel_to_latlon(
+    image_path: str,
+    pixel_x: int,
+    pixel_y: int
+) -> Optional[tuple[float, float]]:
+    """Convert pixel coordinates to lat/lon if image has CRS metadata."""
+    latlon = _referencer.pixels_to_latlon(image_path, [pixel_x], [pixel_y])
+    if latlon is None:
+        return None
+    lat, lon = latlon[0].tolist()
+    return (lat, lon)
+
+def georeference_detections(image_path: str, detections: list, use_mock: bool = True) -> list:
+    """Fill ``geo_location`` from bbox centroids; fall back to mock coordinates."""
+    return _referencer.georeference(image_path, detections, use_mock=use_mock)
+
 # Mock coordinates for demo (LAX airport area)
 MOCK_CENTER = (33.9425, -118.4081)
 
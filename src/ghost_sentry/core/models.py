@@ -0,0 +1,15 @@
+"""Lightweight data models shared across the pipeline.
+
+Kept free of heavy dependencies (torch, rasterio, ...) so the API, console
+and CLI can import them without loading an inference engine.
+"""
+from typing import List, Optional
+from pydantic import BaseModel
+
+class Detection(BaseModel):
+    """A single detected object."""
+    label: str
+    confidence: float
+    bbox: tuple[int, int, int, int]  # x1, y1, x2, y2
+    geo_location: Optional[tuple[float, float]] = None  # lat, lon
+    sources: Optional[List[str]] = None  # sensors that observed it, e.g. ["optical", "sar"]
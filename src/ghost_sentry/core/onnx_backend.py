@@ -0,0 +1,261 @@
+"""ONNX Runtime detector backend for CPU-only deployments.
+
+``OnnxYOLO`` loads a YOLOv8 model exported to ONNX and mirrors the small
+part of the ultralytics ``YOLO`` interface that ``ObjectDetector`` uses
+(``names`` and ``predict``), so the two backends are interchangeable.
+Letterboxing, box decoding and NMS are done here in numpy; torch is never
+imported. onnxruntime and cv2 are imported when a model is loaded.
+"""
+import ast
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from ghost_sentry.core.boxes import batched_nms
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IMGSZ = 640
+IOU_THRESHOLD = 0.7  # ultralytics predict() default
+MAX_DETECTIONS = 300
+PAD_VALUE = 114
+
+ImageSource = Union[str, np.ndarray]
+
+
+@dataclass
+class OnnxBoxes:
+    """Kept boxes for one image, in original image pixels."""
+    xyxy: np.ndarray
+    conf: np.ndarray
+    cls: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cls)
+
+
+@dataclass
+class OnnxResult:
+    boxes: OnnxBoxes
+
+
+def load_image(source: ImageSource) -> np.ndarray:
+    """HxWx3 BGR uint8 array from a path or an array (the ultralytics convention)."""
+    if isinstance(source, np.ndarray):
+        return source
+    import cv2
+    image = cv2.imread(str(source), cv2.IMREAD_COLOR)
+    if image is None:
+        raise FileNotFoundError(f"Could not read image {source}")
+    return image
+
+
+def letterbox(image: np.ndarray, size: int = DEFAULT_IMGSZ) -> tuple[np.ndarray, float, tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to size x size. Returns (image, gain, (pad_x, pad_y))."""
+    import cv2
+    h, w = image.shape[:2]
+    gain = min(size / h, size / w)
+    new_w, new_h = int(round(w * gain)), int(round(h * gain))
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    image = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(PAD_VALUE,) * 3
+    )
+    return image, gain, (pad_x, pad_y)
+
+
+def to_tensor(images: Sequence[np.ndarray]) -> np.ndarray:
+    """Letterboxed BGR HWC uint8 images -> RGB NCHW float32 in [0, 1]."""
+    batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+def decode(
+    output: np.ndarray,
+    conf: float = 0.25,
+    classes: Optional[Sequence[int]] = None,
+    iou: float = IOU_THRESHOLD,
+    max_det: int = MAX_DETECTIONS,
+) -> OnnxBoxes:
+    """
+    Raw YOLOv8 head output for one image -> kept boxes in letterboxed pixels.
+
+    ``output`` is (4 + num_classes, anchors): cx, cy, w, h then per-class
+    scores. Each anchor takes its best class, as ultralytics does, and NMS
+    is class-aware.
+    """
+    scores = output[4:]
+    cls = scores.argmax(axis=0)
+    best = scores[cls, np.arange(scores.shape[1])]
+    keep = best > conf
+    if classes is not None:
+        keep &= np.isin(cls, classes)
+    cx, cy, w, h = output[:4, keep]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    cls, best = cls[keep], best[keep]
+
+    order = batched_nms(xyxy, best, cls, iou)[:max_det]
+    return OnnxBoxes(xyxy=xyxy[order], conf=best[order], cls=cls[order])
+
+
+def scale_boxes(boxes: OnnxBoxes, gain: float, pad: tuple[float, float], shape: tuple[int, int]) -> OnnxBoxes:
+    """Map boxes from letterboxed pixels back to the original (h, w) image, in place."""
+    pad_x, pad_y = round(pad[0] - 0.1), round(pad[1] - 0.1)
+    xyxy = boxes.xyxy
+    xyxy[:, [0, 2]] = ((xyxy[:, [0, 2]] - pad_x) / gain).clip(0, shape[1])
+    xyxy[:, [1, 3]] = ((xyxy[:, [1, 3]] - pad_y) / gain).clip(0, shape[0])
+    return boxes
+
+
+def _parse_metadata(value: Optional[str], default):
+    if not value:
+        return default
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return default
+
+
+class OnnxYOLO:
+    """YOLOv8 ONNX model served by ONNX Runtime on the CPU."""
+
+    def __init__(
+        self,
+        model_path: str,
+        imgsz: Optional[int] = None,
+        providers: Sequence[str] = ("CPUExecutionProvider",),
+        threads: Optional[int] = None,
+    ):
+        if Path(model_path).suffix != ".onnx":
+            raise ValueError(
+                f"The onnx backend needs an exported .onnx model, got '{model_path}' "
+                "(see `ghost_sentry.cli export`)"
+            )
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=list(providers))
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        # Exports without dynamic=True only accept the batch size they were traced with
+        self._fixed_batch = model_input.shape[0] if isinstance(model_input.shape[0], int) else None
+
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names: dict = _parse_metadata(meta.get("names"), {})
+        if not self.names:
+            num_classes = self.session.get_outputs()[0].shape[1] - 4
+            self.names = {i: str(i) for i in range(num_classes)}
+        if imgsz is None:
+            imgsz = _parse_metadata(meta.get("imgsz"), [DEFAULT_IMGSZ])[0]
+        self.imgsz = imgsz
+
+    def predict(
+        self,
+        sources: Sequence[ImageSource],
+        classes: Optional[Sequence[int]] = None,
+        conf: float = 0.25,
+        iou: float = IOU_THRESHOLD,
+        batch: Optional[int] = None,
+        verbose: bool = False,
+    ) -> List[OnnxResult]:
+        """Same call shape as ``YOLO.predict``; one result per source."""
+        images = [load_image(source) for source in sources]
+        boxed = [letterbox(image, self.imgsz) for image in images]
+        outputs = np.concatenate(list(self._run(to_tensor([b[0] for b in boxed]))))
+        results = []
+        for image, (_, gain, pad), output in zip(images, boxed, outputs):
+            boxes = decode(output, conf=conf, classes=classes, iou=iou)
+            results.append(OnnxResult(scale_boxes(boxes, gain, pad, image.shape[:2])))
+        return results
+
+    def _run(self, tensor: np.ndarray) -> Iterator[np.ndarray]:
+        step = self._fixed_batch or len(tensor)
+        for start in range(0, len(tensor), step):
+            yield self.session.run(None, {self._input_name: tensor[start:start + step]})[0]
+
+
+def export_onnx(model_path: str = "yolov8n.pt", imgsz: int = DEFAULT_IMGSZ, dynamic: bool = True) -> str:
+    """Export YOLO weights to ONNX with ultralytics. Returns the .onnx path."""
+    from ghost_sentry.core.detector import _yolo_class
+    return str(_yolo_class()(model_path).export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=False))
+
+
+class _CalibrationReader:
+    """Feeds letterboxed calibration images to the static quantizer, one at a time."""
+
+    def __init__(self, input_name: str, sources: Sequence[ImageSource], imgsz: int):
+        self._input_name = input_name
+        self._sources = iter(sources)
+        self._imgsz = imgsz
+
+    def get_next(self) -> Optional[dict]:
+        source = next(self._sources, None)
+        if source is None:
+            return None
+        return {self._input_name: to_tensor([letterbox(load_image(source), self._imgsz)[0]])}
+
+
+def _head_decode_nodes(model) -> List[str]:
+    """
+    Nodes of the YOLO Detect head that decode boxes and scores (DFL, anchor
+    maths, sigmoid). They stay in float: INT8 there collapses box coordinates
+    and small class scores, while the convolutions carry nearly all the cost.
+    """
+    dfl = next((n.name for n in model.graph.node if "/dfl/" in n.name), None)
+    if dfl is None:
+        return []
+    head = dfl.split("dfl/")[0]
+    return [
+        n.name for n in model.graph.node
+        if n.name.startswith(head) and (n.op_type != "Conv" or "/dfl/" in n.name)
+    ]
+
+
+def quantize_int8(
+    onnx_path: str,
+    calibration_images: Sequence[ImageSource],
+    output_path: Optional[str] = None,
+    imgsz: Optional[int] = None,
+) -> str:
+    """
+    INT8 static quantization (QDQ format, per-channel weights).
+
+    Activation ranges are calibrated on ``calibration_images``; a few dozen
+    representative scenes are enough. Returns the quantized model path.
+    """
+    import onnx
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    if not calibration_images:
+        raise ValueError("INT8 static quantization needs calibration images")
+    output_path = output_path or str(Path(onnx_path).with_name(Path(onnx_path).stem + "-int8.onnx"))
+    source = OnnxYOLO(onnx_path, imgsz=imgsz)
+    original = onnx.load(onnx_path, load_external_data=False)
+    quantize_static(
+        onnx_path,
+        output_path,
+        _CalibrationReader(source._input_name, calibration_images, source.imgsz),
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        nodes_to_exclude=_head_decode_nodes(original),
+    )
+
+    # Carry class names and input size over so OnnxYOLO can load the result alone
+    quantized = onnx.load(output_path)
+    existing = {prop.key for prop in quantized.metadata_props}
+    for prop in original.metadata_props:
+        if prop.key not in existing:
+            quantized.metadata_props.append(prop)
+    onnx.save(quantized, output_path)
+    logger.info(f"Quantized {onnx_path} -> {output_path} ({len(calibration_images)} calibration images)")
+    return output_path
@@ -0,0 +1,343 @@
+"""Staged asyncio ingestion pipeline with bounded queues and backpressure."""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from ghost_sentry.core import geo
+from ghost_sentry.core.detector import build_detector
+from ghost_sentry.core.models import Detection
+from ghost_sentry.core.sentry import process_detections
+from ghost_sentry.lattice.adapter import LatticeConnector
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_MODEL_PATH = "yolov8n.pt"
+EXECUTOR_KINDS = {"async", "thread", "process"}
+
+
+@dataclass
+class Stage:
+    """
+    A single pipeline stage.
+
+    ``func`` receives one item and returns the item handed to the next stage.
+    Returning ``None`` drops the item; with ``fan_out`` a returned list is
+    split into individual downstream items. ``executor`` selects where
+    ``func`` runs: on the event loop ("async"), in a thread pool ("thread")
+    or in a process pool ("process", for CPU-bound work).
+    """
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    executor: str = "async"
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    fan_out: bool = False
+    initializer: Optional[Callable[..., None]] = None
+    initargs: tuple = ()
+
+    def __post_init__(self):
+        if self.executor not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor '{self.executor}'. Expected one of {sorted(EXECUTOR_KINDS)}")
+        if self.workers < 1:
+            raise ValueError("Stage workers must be >= 1")
+
+
+@dataclass
+class StageStats:
+    """Running counters for one stage."""
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    total_wait_s: float = 0.0
+    total_latency_s: float = 0.0
+    max_latency_s: float = 0.0
+
+    def record(self, wait_s: float, latency_s: float) -> None:
+        self.processed += 1
+        self.total_wait_s += wait_s
+        self.total_latency_s += latency_s
+        self.max_latency_s = max(self.max_latency_s, latency_s)
+
+    def to_dict(self) -> dict:
+        completed = self.processed or 1
+        return {
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "avg_wait_ms": round(1000 * self.total_wait_s / completed, 3),
+            "avg_latency_ms": round(1000 * self.total_latency_s / completed, 3),
+            "max_latency_ms": round(1000 * self.max_latency_s, 3),
+        }
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages connected by bounded asyncio queues.
+
+    Each stage has its own input queue. When a queue fills up, upstream
+    workers block on ``put`` until the stage catches up, so a slow stage
+    throttles everything before it instead of growing memory without bound.
+    ``submit`` waits for space (backpressure); ``try_submit`` refuses the
+    item instead, which lets callers surface overload to their own clients.
+    """
+
+    def __init__(self, stages: List[Stage], sink: Optional[Callable[[Any], Any]] = None):
+        if not stages:
+            raise ValueError("Pipeline requires at least one stage")
+        self._stages = stages
+        self._sink = sink
+        self._queues: List[asyncio.Queue] = []
+        self._executors: dict[str, Executor] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {stage.name: StageStats() for stage in stages}
+        self._submitted = 0
+        self._rejected = 0
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def overloaded(self) -> bool:
+        """True when the intake queue is full and new work would be refused."""
+        return bool(self._queues) and self._queues[0].full()
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self._stages]
+        for index, stage in enumerate(self._stages):
+            if stage.executor == "thread":
+                self._executors[stage.name] = ThreadPoolExecutor(
+                    max_workers=stage.workers,
+                    thread_name_prefix=f"pipeline-{stage.name}",
+                    initializer=stage.initializer,
+                    initargs=stage.initargs,
+                )
+            elif stage.executor == "process":
+                self._executors[stage.name] = ProcessPoolExecutor(
+                    max_workers=stage.workers,
+                    initializer=stage.initializer,
+                    initargs=stage.initargs,
+                )
+            elif stage.initializer:
+                stage.initializer(*stage.initargs)
+            for _ in range(stage.workers):
+                self._tasks.append(asyncio.create_task(self._worker(index)))
+        self._running = True
+        logger.info(f"Pipeline started with stages: {[s.name for s in self._stages]}")
+
+    async def submit(self, item: Any) -> None:
+        """Queue an item, waiting for space if the first stage is saturated."""
+        if not self._running:
+            raise RuntimeError("Pipeline is not running")
+        await self._queues[0].put((time.perf_counter(), item))
+        self._submitted += 1
+
+    def try_submit(self, item: Any) -> bool:
+        """Queue an item without waiting. Returns False if the pipeline is saturated.
+
+        Call from the pipeline's event loop thread; the stage queues are not thread-safe.
+        """
+        if not self._running:
+            raise RuntimeError("Pipeline is not running")
+        try:
+            self._queues[0].put_nowait((time.perf_counter(), item))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            return False
+        self._submitted += 1
+        return True
+
+    async def join(self) -> None:
+        """Wait until every submitted item has left the last stage."""
+        for queue in self._queues:
+            await queue.join()
+
+    async def stop(self, drain: bool = True) -> None:
+        if not self._running:
+            return
+        if drain:
+            await self.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for executor in self._executors.values():
+            executor.shutdown(wait=drain, cancel_futures=not drain)
+        self._executors.clear()
+        self._running = False
+        logger.info("Pipeline stopped")
+
+    async def __aenter__(self) -> "Pipeline":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop(drain=exc_type is None)
+
+    def stats(self) -> dict:
+        stages = []
+        for index, stage in enumerate(self._stages):
+            queue = self._queues[index] if self._queues else None
+            stages.append({
+                "name": stage.name,
+                "executor": stage.executor,
+                "workers": stage.workers,
+                "queue_depth": queue.qsize() if queue else 0,
+                "queue_size": stage.queue_size,
+                "saturated": queue.full() if queue else False,
+                **self._stats[stage.name].to_dict(),
+            })
+        return {
+            "running": self._running,
+            "submitted": self._submitted,
+            "rejected": self._rejected,
+            "stages": stages,
+        }
+
+    async def _worker(self, index: int) -> None:
+        stage = self._stages[index]
+        stats = self._stats[stage.name]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self._queues) else None
+
+        while True:
+            enqueued_at, item = await inbox.get()
+            try:
+                started = time.perf_counter()
+                stats.in_flight += 1
+                try:
+                    result = await self._call(stage, item)
+                except Exception as e:
+                    stats.errors += 1
+                    logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                    continue
+                finally:
+                    stats.in_flight -= 1
+                stats.record(started - enqueued_at, time.perf_counter() - started)
+
+                if result is None:
+                    stats.dropped += 1
+                    continue
+                outputs = result if stage.fan_out else [result]
+                for output in outputs:
+                    if outbox is not None:
+                        await outbox.put((time.perf_counter(), output))
+                    elif self._sink is not None:
+                        try:
+                            sunk = self._sink(output)
+                            if asyncio.iscoroutine(sunk):
+                                await sunk
+                        except Exception as e:
+                            stats.errors += 1
+                            logger.error(f"Pipeline sink after '{stage.name}' failed: {e}")
+            finally:
+                inbox.task_done()
+
+    async def _call(self, stage: Stage, item: Any) -> Any:
+        if stage.executor == "async":
+            result = stage.func(item)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executors[stage.name], stage.func, item)
+
+
+# --- Ghost Sentry ingestion stages -------------------------------------------
+#
+# Stage functions live at module level so they can be pickled into process
+# pools. Each worker thread/process keeps its own warm detector.
+
+_local = threading.local()
+
+
+def load_detector(
+    model_path: str = DEFAULT_MODEL_PATH,
+    tile_size: int = 0,
+    backend: str = "ultralytics",
+    cache_dir: Optional[str] = None,
+    tile_store: Optional[str] = None,
+) -> None:
+    """Load a detector for the current worker (thread or process); see ``build_detector``."""
+    _local.detector = build_detector(
+        model_path, backend=backend, tile_size=tile_size, cache_dir=cache_dir, tile_store=tile_store
+    )
+
+
+def detect_stage(image_path: str) -> tuple[str, List[Detection]]:
+    detector = getattr(_local, "detector", None)
+    if detector is None:
+        load_detector()
+        detector = _local.detector
+    return image_path, detector.detect(image_path)
+
+
+def geo_stage(item: tuple[str, List[Detection]]) -> tuple[str, List[Detection]]:
+    image_path, detections = item
+    return image_path, geo.georeference_detections(image_path, detections)
+
+
+@dataclass
+class SentryStage:
+    """
+    Correlation, cueing and publishing. Runs serially to keep ordering.
+
+    Returns the publish stats tagged with the image path, so a pipeline sink
+    learns which scenes are fully processed.
+    """
+    connector: LatticeConnector
+    totals: dict = field(default_factory=lambda: {"tracks": 0, "tasks": 0})
+
+    def __call__(self, item: tuple[str, List[Detection]]) -> dict:
+        image_path, detections = item
+        stats = process_detections(detections, self.connector)
+        self.totals["tracks"] += stats["tracks"]
+        self.totals["tasks"] += stats["tasks"]
+        return {"image_path": image_path, **stats}
+
+
+def build_ingestion_pipeline(
+    connector: LatticeConnector,
+    detect_workers: int = 1,
+    detect_executor: str = "thread",
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    model_path: str = DEFAULT_MODEL_PATH,
+    tile_size: int = 0,
+    backend: str = "ultralytics",
+    cache_dir: Optional[str] = None,
+    tile_store: Optional[str] = None,
+    sink: Optional[Callable[[dict], Any]] = None,
+) -> Pipeline:
+    """
+    Build the detect -> geo -> sentry pipeline.
+
+    Items submitted are image paths. Detection is the CPU-heavy stage and gets
+    ``detect_workers`` thread or process workers, each with its own model.
+    Publishing stays on a single worker so DB writes and task debounce remain
+    ordered. With ``cache_dir`` scenes seen before skip inference; with
+    ``tile_store`` (tiled mode) clouded and unchanged tiles do. ``sink``
+    receives the publish stats of each completed image.
+    """
+    return Pipeline([
+        Stage(
+            "detect",
+            detect_stage,
+            workers=detect_workers,
+            executor=detect_executor,
+            queue_size=queue_size,
+            initializer=load_detector,
+            initargs=(model_path, tile_size, backend, cache_dir, tile_store),
+        ),
+        Stage("geo", geo_stage, executor="thread", queue_size=queue_size),
+        Stage("sentry", SentryStage(connector), executor="thread", queue_size=queue_size),
+    ], sink=sink)
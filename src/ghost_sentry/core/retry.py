@@ -0,0 +1,18 @@
+"""Retry policy shared by the outbound HTTP clients (Lattice, Sentinel Hub)."""
+from typing import Optional
+
+# Throttling and transient server errors; anything else would be rejected again
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def retry_after(response, max_s: float) -> Optional[float]:
+    """Server-requested delay from a ``Retry-After`` header in seconds, capped at ``max_s``.
+
+    Returns None when the header is missing or not a number of seconds, so the
+    caller falls back to its own backoff.
+    """
+    try:
+        delay = float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+    return min(max(delay, 0.0), max_s)
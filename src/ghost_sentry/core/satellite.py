@@ -1,32 +1,206 @@
 """Satellite data client for Sentinel-2."""
-import os
-import httpx
+import asyncio
+import hashlib
+import json
 import logging
-from typing import List, Optional
-from ghost_sentry.core.detector import Detection
-from dotenv import load_dotenv
+import math
+import os
+import threading
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Mapping, Optional, Union
+
+from ghost_sentry.core.retry import RETRYABLE_STATUS, retry_after
+
+DEFAULT_BASE_URL = "https://services.sentinel-hub.com"
+TOKEN_PATH = "/auth/realms/main/protocol/openid-connect/token"
+PROCESS_PATH = "/api/v1/process"
+DEFAULT_CACHE_DIR = ".sentinel_cache"
+DEFAULT_CACHE_MAX_BYTES = 2 * 2**30
+# Refresh this long before the token actually expires
+TOKEN_REFRESH_MARGIN_S = 60.0
+DEFAULT_TOKEN_TTL_S = 300.0
+DEFAULT_LOOKBACK_DAYS = 30
+DEFAULT_SCENE_PX = 1024
+# ~22 km: a 1024 px request then stays close to Sentinel-2's native 10-20 m
+DEFAULT_MAX_TILE_DEG = 0.2
+
+TRUE_COLOR_EVALSCRIPT = """//VERSION=3
+function setup() {
+  return {input: ["B04", "B03", "B02"], output: {bands: 3, sampleType: "UINT16"}};
+}
+function evaluatePixel(s) {
+  return [s.B04 * 10000, s.B03 * 10000, s.B02 * 10000];
+}
+"""
+
+
+class SceneCache:
+    """
+    Content-addressed store of downloaded scenes with size-bounded LRU eviction.
+
+    Scene bytes live under ``scenes/<sha256>.tif``, so identical imagery
+    fetched through different requests is stored once. ``requests/<key>``
+    maps a request key to the content hash of the scene it returned.
+    Recency is the scene file's mtime, touched on every hit.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self._scenes = self.directory / "scenes"
+        self._requests = self.directory / "requests"
+        self._scenes.mkdir(parents=True, exist_ok=True)
+        self._requests.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        entries = sorted((p.stat().st_mtime_ns, p.stem, p.stat().st_size) for p in self._scenes.glob("*.tif"))
+        for _, digest, size in entries:
+            self._sizes[digest] = size
+            self._bytes += size
+        self._evict()
+
+    def get(self, request_key: str) -> Optional[str]:
+        """Path of the scene cached for ``request_key``, or None."""
+        try:
+            digest = (self._requests / request_key).read_text().strip()
+            path = self._scene_path(digest)
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if digest in self._sizes:
+                self._sizes.move_to_end(digest)
+        return str(path)
+
+    def put(self, request_key: str, content: bytes) -> str:
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._scene_path(digest)
+        if not path.exists():
+            tmp = path.with_suffix(f".{os.getpid()}.part")
+            tmp.write_bytes(content)
+            os.replace(tmp, path)
+        (self._requests / request_key).write_text(digest)
+        with self._lock:
+            self._bytes -= self._sizes.pop(digest, 0)
+            self._sizes[digest] = len(content)
+            self._bytes += len(content)
+            self._evict()
+        return str(path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "scenes": len(self._sizes),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _scene_path(self, digest: str) -> Path:
+        return self._scenes / f"{digest}.tif"
+
+    def _evict(self) -> None:
+        # Request entries pointing at an evicted scene simply miss next time
+        while self._bytes > self.max_bytes and len(self._sizes) > 1:
+            digest, size = self._sizes.popitem(last=False)
+            self._bytes -= size
+            self._scene_path(digest).unlink(missing_ok=True)
+            self.evictions += 1
 
-load_dotenv()
 
 class SentinelClient:
-    """Client for interacting with Sentinel Hub / Sentinel-2 data."""
-    
-    def __init__(self):
-        self.client_id = os.getenv("SENTINEL_CLIENT_ID")
-        self.client_secret = os.getenv("SENTINEL_CLIENT_SECRET")
-        self.base_url = "https://services.sentinel-hub.com"
-        self.token = None
-
-    async def authenticate(self) -> bool:
-        """Authenticate with Sentinel Hub."""
+    """
+    Client for interacting with Sentinel Hub / Sentinel-2 data.
+
+    One keep-alive ``httpx.AsyncClient`` is shared by every call. The OAuth
+    token is cached and refreshed shortly before it expires (or after a
+    401). Downloaded scenes go through a ``SceneCache``, and concurrent
+    requests for the same scene share a single download.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        base_url: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        max_connections: int = 10,
+        timeout: float = 60.0,
+    ):
+        from dotenv import load_dotenv
+        load_dotenv()
+        self.client_id = client_id or os.getenv("SENTINEL_CLIENT_ID")
+        self.client_secret = client_secret or os.getenv("SENTINEL_CLIENT_SECRET")
+        self.base_url = (base_url or os.getenv("SENTINEL_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.cache = SceneCache(cache_dir or os.getenv("SENTINEL_CACHE_DIR") or DEFAULT_CACHE_DIR, cache_max_bytes)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._client = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.downloads = 0
+
+    def _http(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "SentinelClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    @property
+    def token_valid(self) -> bool:
+        return self.token is not None and time.monotonic() < self._token_expires_at - TOKEN_REFRESH_MARGIN_S
+
+    async def authenticate(self, force: bool = False) -> bool:
+        """Authenticate with Sentinel Hub, reusing the current token until it nears expiry."""
         if not self.client_id or not self.client_secret:
             logging.warning("Sentinel credentials missing. Operating in MOCK mode.")
             return False
-            
-        try:
-            async with httpx.AsyncClient() as client:
-                res = await client.post(
-                    f"{self.base_url}/auth/realms/main/protocol/openid-connect/token",
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+
+        async with self._auth_lock:
+            # Another caller may have refreshed while we waited
+            if self.token_valid and not force:
+                return True
+            try:
+                res = await self._http().post(
+                    TOKEN_PATH,
                     data={
                         "grant_type": "client_credentials",
                         "client_id": self.client_id,
@@ -34,25 +208,218 @@ class SentinelClient:
                     }
                 )
                 res.raise_for_status()
-                self.token = res.json().get("access_token")
-                return True
-        except Exception as e:
-            logging.error(f"Authentication failed: {e}")
-            return False
+                body = res.json()
+                self.token = body.get("access_token")
+                self._token_expires_at = time.monotonic() + float(body.get("expires_in", DEFAULT_TOKEN_TTL_S))
+                return self.token is not None
+            except Exception as e:
+                logging.error(f"Authentication failed: {e}")
+                self.token = None
+                return False
 
-    async def get_latest_image_path(self, bbox: List[float]) -> Optional[str]:
+    def build_request(
+        self,
+        bbox: List[float],
+        time_from: Optional[str] = None,
+        time_to: Optional[str] = None,
+        width: int = DEFAULT_SCENE_PX,
+        height: int = DEFAULT_SCENE_PX,
+    ) -> dict:
+        """Process API body for the most recent true-colour scene over ``bbox`` (lon/lat)."""
+        # Day granularity keeps the request (and its cache key) stable within a day
+        time_to = time_to or date.today().isoformat()
+        time_from = time_from or (date.fromisoformat(time_to[:10]) - timedelta(days=DEFAULT_LOOKBACK_DAYS)).isoformat()
+        return {
+            "input": {
+                "bounds": {"bbox": [round(float(v), 6) for v in bbox], "properties": {"crs": "http://www.opengis.net/def/crs/OGC/1.3/CRS84"}},
+                "data": [{
+                    "type": "sentinel-2-l2a",
+                    "dataFilter": {
+                        "timeRange": {"from": f"{time_from[:10]}T00:00:00Z", "to": f"{time_to[:10]}T23:59:59Z"},
+                        "mosaickingOrder": "mostRecent",
+                    },
+                }],
+            },
+            "output": {"width": width, "height": height, "responses": [{"identifier": "default", "format": {"type": "image/tiff"}}]},
+            "evalscript": TRUE_COLOR_EVALSCRIPT,
+        }
+
+    @staticmethod
+    def request_key(request: dict) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    async def get_latest_image_path(self, bbox: List[float], **request_options) -> Optional[str]:
         """
         Query for the latest Sentinel-2 image for a bounding box.
         Returns the local path to the downloaded image or None.
-        
-        Currently, this is a placeholder structural implementation.
         """
-        if not self.token:
+        request = self.build_request(bbox, **request_options)
+        key = self.request_key(request)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            path = await self._download(key, request)
+            future.set_result(path)
+            return path
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise; don't also warn about an unretrieved exception
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _download(self, key: str, request: dict) -> Optional[str]:
+        if not self.token_valid and not await self.authenticate():
             return None
-            
-        # Structural implementation for future API calls
-        logging.info(f"Querying Sentinel-2 for bbox: {bbox}")
-        return "path/to/downloaded/sentinel_image.jpg"
+        logging.info(f"Querying Sentinel-2 for bbox: {request['input']['bounds']['bbox']}")
+        res = await self._post_process(request)
+        if res.status_code == 401:
+            # Token revoked or expired early: refresh once and retry
+            if not await self.authenticate(force=True):
+                return None
+            res = await self._post_process(request)
+        res.raise_for_status()
+        self.downloads += 1
+        return self.cache.put(key, res.content)
+
+    async def _post_process(self, request: dict):
+        return await self._http().post(
+            PROCESS_PATH,
+            json=request,
+            headers={"Authorization": f"Bearer {self.token}", "Accept": "image/tiff"},
+        )
+
+
+def split_bbox(bbox: List[float], max_tile_deg: float = DEFAULT_MAX_TILE_DEG) -> List[List[float]]:
+    """Split a (min_lon, min_lat, max_lon, max_lat) box into an even grid of tiles no wider than ``max_tile_deg``."""
+    min_lon, min_lat, max_lon, max_lat = map(float, bbox)
+    cols = max(1, math.ceil((max_lon - min_lon) / max_tile_deg - 1e-9))
+    rows = max(1, math.ceil((max_lat - min_lat) / max_tile_deg - 1e-9))
+    lon_step = (max_lon - min_lon) / cols
+    lat_step = (max_lat - min_lat) / rows
+    return [
+        [min_lon + c * lon_step, min_lat + r * lat_step, min_lon + (c + 1) * lon_step, min_lat + (r + 1) * lat_step]
+        for r in range(rows)
+        for c in range(cols)
+    ]
+
+
+@dataclass
+class FetchResult:
+    aoi: Any  # AOI name, or index when AOIs were given as a list
+    bbox: List[float]  # the tile actually fetched
+    path: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+class FetchScheduler:
+    """
+    Fetches the latest scene for many AOIs with bounded parallelism.
+
+    Large AOIs are split into tiles. At most ``concurrency`` tiles are in
+    flight at once. Throttling (429), server errors and transport failures
+    are retried with exponential backoff and jitter, honouring Retry-After.
+    ``fetch`` yields each tile as soon as it is done, so downstream
+    detection starts while the rest of the cycle is still downloading.
+    """
+
+    def __init__(
+        self,
+        client: SentinelClient,
+        concurrency: int = 4,
+        retries: int = 3,
+        backoff_s: float = 1.0,
+        max_backoff_s: float = 30.0,
+        max_tile_deg: float = DEFAULT_MAX_TILE_DEG,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.client = client
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.max_tile_deg = max_tile_deg
+
+    async def fetch(
+        self,
+        aois: Union[Mapping[Any, List[float]], Iterable[List[float]]],
+        **request_options,
+    ) -> AsyncIterator[FetchResult]:
+        """Yield one result per tile, in completion order."""
+        items = aois.items() if isinstance(aois, Mapping) else enumerate(aois)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._fetch_tile(name, tile, semaphore, request_options))
+            for name, bbox in items
+            for tile in split_bbox(bbox, self.max_tile_deg)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def feed(
+        self,
+        aois: Union[Mapping[Any, List[float]], Iterable[List[float]]],
+        submit: Callable[[str], Awaitable[Any]],
+        **request_options,
+    ) -> dict:
+        """Stream fetched scene paths into ``submit`` (e.g. ``Pipeline.submit``). Returns counts."""
+        counts = {"tiles": 0, "fetched": 0, "failed": 0, "retries": 0}
+        async for result in self.fetch(aois, **request_options):
+            counts["tiles"] += 1
+            counts["retries"] += max(0, result.attempts - 1)
+            if result.path:
+                counts["fetched"] += 1
+                await submit(result.path)
+            else:
+                counts["failed"] += 1
+                logging.warning(f"Fetch failed for AOI {result.aoi} {result.bbox}: {result.error}")
+        return counts
+
+    async def _fetch_tile(self, name, bbox, semaphore: asyncio.Semaphore, request_options: dict) -> FetchResult:
+        import httpx
+
+        result = FetchResult(aoi=name, bbox=bbox)
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                result.attempts = attempt + 1
+                try:
+                    result.path = await self.client.get_latest_image_path(bbox, **request_options)
+                    if result.path is None:
+                        result.error = "not authenticated"
+                    return result
+                except httpx.HTTPStatusError as e:
+                    result.error = f"HTTP {e.response.status_code}"
+                    if e.response.status_code not in RETRYABLE_STATUS:
+                        return result
+                    delay = retry_after(e.response, self.max_backoff_s)
+                except httpx.TransportError as e:
+                    result.error = f"{type(e).__name__}: {e}"
+                    delay = None
+                if attempt < self.retries:
+                    await asyncio.sleep(delay if delay is not None else self._backoff(attempt))
+        return result
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from many tiles from arriving in lockstep
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt))
+
 
 def get_satellite_client():
     """Factory for getting the client."""
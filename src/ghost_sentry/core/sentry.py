@@ -1,5 +1,10 @@
-from datetime import datetime, timedelta, UTC
-from ghost_sentry.core.detector import Detection
+import os
+import uuid
+from datetime import timedelta
+from typing import Optional
+from ghost_sentry.core.models import Detection
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.core.debounce import DebounceCache
 from ghost_sentry.lattice.entities import TrackBuilder
 from ghost_sentry.lattice.adapter import LatticeConnector
 
@@ -9,58 +14,83 @@ CONFIDENCE_THRESHOLD = 0.85
 
 # Debounce configuration
 DEBOUNCE_WINDOW = timedelta(minutes=10)
-_recent_tasks: dict[str, datetime] = {}
+DEBOUNCE_MAX_ENTRIES = 10_000
+# Share debounce through the SQLite DB when several ingestion workers run
+SHARED_DEBOUNCE = os.environ.get("GHOST_SENTRY_SHARED_DEBOUNCE", "0") == "1"
+_debounce = DebounceCache(DEBOUNCE_WINDOW, max_size=DEBOUNCE_MAX_ENTRIES, shared=SHARED_DEBOUNCE)
+
+# Persistent entities shared by every call to process_detections
+_matcher = EntityMatcher()
 
 def should_task(entity_id: str) -> bool:
     """Check if an entity should be tasked (debounced)."""
-    now = datetime.now(UTC)
-    if entity_id in _recent_tasks:
-        if now - _recent_tasks[entity_id] < DEBOUNCE_WINDOW:
-            return False
-    _recent_tasks[entity_id] = now
-    return True
+    return _debounce.should_fire(entity_id)
 
 from ghost_sentry.core import track_state, analytics, assets
 
 def process_detections(
     detections: list[Detection],
-    connector: LatticeConnector
+    connector: LatticeConnector,
+    matcher: Optional[EntityMatcher] = None,
+    source: str = "optical"
 ) -> dict:
-    """Process detections and generate Tracks + Tasks."""
-    stats = {"tracks": 0, "tasks": 0}
-    
+    """
+    Process detections and generate Tracks + Tasks.
+
+    Detections are first correlated into persistent entities, so repeated
+    sightings of the same object update one track instead of creating a new
+    one each time. Every entity touched by the batch is published once, with
+    its latest observation.
+    """
+    matcher = matcher if matcher is not None else _matcher
+    stats = {"detections": len(detections), "tracks": 0, "tasks": 0}
+
+    latest: dict[str, Detection] = {}
     for detection in detections:
-        # Always publish track
-        track = TrackBuilder.from_detection(detection)
+        if detection.geo_location:
+            sources = detection.sources or [source]
+            entity = matcher.correlate(
+                detection.label, detection.geo_location, detection.confidence, sources[0]
+            )
+            # Fused detections were seen by several sensors at once
+            for extra in sources[1:]:
+                if extra not in entity.sources:
+                    entity.sources.append(extra)
+            entity_id = entity.entity_id
+            # Update in-memory state for analytics
+            track_state.update_position(entity_id, detection.geo_location)
+        else:
+            # Cannot correlate without a position
+            entity_id = str(uuid.uuid4())
+        latest[entity_id] = detection
+
+    for entity_id, detection in latest.items():
+        track = TrackBuilder.from_detection(detection, entity_id=entity_id)
         connector.publish_track(track)
         stats["tracks"] += 1
-        
-        # Update in-memory state for analytics
-        if detection.geo_location:
-            track_state.update_position(track.entityId, detection.geo_location)
-        
+
         # Check for loitering behavior
-        is_loitering = analytics.detect_loitering(track.entityId)
-        
+        is_loitering = analytics.detect_loitering(entity_id)
+
         # Auto-cue for high-priority detections or anomalies
-        is_high_priority = (detection.label in HIGH_PRIORITY_LABELS and 
+        is_high_priority = (detection.label in HIGH_PRIORITY_LABELS and
                            detection.confidence >= CONFIDENCE_THRESHOLD)
-        
-        if (is_high_priority or is_loitering) and should_task(track.entityId):
+
+        if (is_high_priority or is_loitering) and should_task(entity_id):
             # Proximity-based asset assignment
             assigned_asset = assets.assign_asset(
                 detection.geo_location or (0.0, 0.0),
                 assets.get_available_assets()
             )
-            
+
             task = {
                 "type": "VERIFICATION_REQUEST" if not is_loitering else "ANOMALY_VERIFICATION",
-                "target_entity_id": track.entityId,
+                "target_entity_id": entity_id,
                 "description": f"Confirm {detection.label} at {detection.geo_location}",
                 "priority": "HIGH" if detection.label == "airplane" or is_loitering else "MEDIUM",
                 "assigned_to": assigned_asset.id if assigned_asset else "DISPATCH_PENDING"
             }
             connector.publish_task(task)
             stats["tasks"] += 1
-    
+
     return stats
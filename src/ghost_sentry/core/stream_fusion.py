@@ -0,0 +1,244 @@
+"""Time-aligned streaming fusion of N sensor feeds."""
+import asyncio
+import bisect
+import inspect
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Union
+
+from ghost_sentry.core.fusion import FusionEngine
+from ghost_sentry.core.models import Detection
+
+logger = logging.getLogger(__name__)
+
+# Observations of one object by different sensors at most this far apart are joined
+DEFAULT_WINDOW_S = 60.0
+# How far behind its newest observation a feed may still deliver (out-of-order tolerance)
+DEFAULT_MAX_DELAY_S = 120.0
+# A feed silent this long (wall clock) no longer holds back the others
+DEFAULT_IDLE_TIMEOUT_S = 300.0
+DEFAULT_MAX_PENDING = 10_000
+
+
+@dataclass
+class Observation:
+    sensor: str  # "fused" for joined output
+    time: float  # event (acquisition) time, epoch seconds
+    detection: Detection
+
+
+@dataclass
+class _Feed:
+    max_delay_s: float
+    last_arrival: float
+    max_time: float = -math.inf
+    received: int = 0
+    late: int = 0
+
+    @property
+    def watermark(self) -> float:
+        return self.max_time - self.max_delay_s
+
+
+@dataclass(order=True)
+class _Pending:
+    time: float
+    seq: int
+    arrived: float = field(compare=False)
+    observation: Observation = field(compare=False)
+
+
+class StreamingFusion:
+    """
+    Joins detections from feeds arriving at different rates and latencies.
+
+    Each feed has a watermark: its newest event time minus its
+    ``max_delay_s``. Nothing older is expected from it any more. The global
+    watermark is the minimum over feeds that are not idle. It never moves
+    backwards. An observation is final once the global watermark is
+    ``window_s`` past it, because every partner it could join with has
+    arrived. It is then spatially fused (``FusionEngine.cluster``) with
+    pending observations at most ``window_s`` away in time, and emitted.
+
+    Added latency is bounded by ``window_s`` plus the slowest active feed's
+    delay. A feed silent for ``idle_timeout_s`` stops holding the others
+    back. Memory is bounded by ``max_pending``: past it, the oldest
+    observations are finalised early. Observations older than the watermark
+    (later than their feed promised) are still fused with whatever is
+    pending and are counted as ``late``.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[FusionEngine] = None,
+        sensors: Iterable[str] = ("optical", "sar"),
+        window_s: float = DEFAULT_WINDOW_S,
+        max_delay_s: Union[float, Dict[str, float]] = DEFAULT_MAX_DELAY_S,
+        idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        min_confidence: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_pending < 1:
+            raise ValueError("max_pending must be >= 1")
+        self.engine = engine or FusionEngine()
+        self.window_s = window_s
+        self.max_delay_s = max_delay_s
+        self.idle_timeout_s = idle_timeout_s
+        self.max_pending = max_pending
+        self.min_confidence = min_confidence or {}
+        self.clock = clock
+        self.watermark = -math.inf
+        self._feeds: Dict[str, _Feed] = {}
+        self._pending: List[_Pending] = []  # sorted by event time
+        self._seq = itertools.count()
+        self.counts = {"emitted": 0, "fused": 0, "dropped": 0, "forced": 0}
+        self.max_hold_s = 0.0
+        for sensor in sensors:
+            self._feed(sensor)
+
+    def push(self, sensor: str, event_time: float, detections: List[Detection]) -> List[Observation]:
+        """Add one scene/message batch from ``sensor``; returns whatever became final."""
+        now = self.clock()
+        feed = self._feed(sensor)
+        feed.last_arrival = now
+        feed.received += len(detections)
+        feed.max_time = max(feed.max_time, event_time)
+        if event_time < self.watermark:
+            feed.late += len(detections)
+        for d in detections:
+            bisect.insort(self._pending, _Pending(event_time, next(self._seq), now, Observation(sensor, event_time, d)))
+        return self._advance(now)
+
+    def tick(self) -> List[Observation]:
+        """Re-check watermarks without new data (lets idle feeds time out)."""
+        return self._advance(self.clock())
+
+    def flush(self) -> List[Observation]:
+        """Emit everything still pending (end of stream)."""
+        return self._emit(math.inf, self.clock())
+
+    def stats(self) -> dict:
+        now = self.clock()
+        return {
+            **self.counts,
+            "pending": len(self._pending),
+            "watermark": self.watermark,
+            "max_hold_s": round(self.max_hold_s, 3),
+            "feeds": {
+                sensor: {
+                    "received": feed.received,
+                    "late": feed.late,
+                    "watermark": feed.watermark,
+                    "idle": self._idle(feed, now),
+                }
+                for sensor, feed in self._feeds.items()
+            },
+        }
+
+    async def run(
+        self,
+        feeds: Dict[str, AsyncIterator[tuple[float, List[Detection]]]],
+        emit: Callable[[List[Observation]], Any],
+        tick_s: float = 1.0,
+    ) -> None:
+        """
+        Consume ``(event_time, detections)`` batches from every feed concurrently.
+
+        ``emit`` (sync or async) gets each non-empty list of final
+        observations. Pending observations are flushed once every feed ends.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=len(feeds) * 4 or 1)
+
+        async def pump(sensor, feed):
+            async for event_time, detections in feed:
+                await queue.put((sensor, event_time, detections))
+
+        async def deliver(observations):
+            if observations:
+                result = emit(observations)
+                if inspect.isawaitable(result):
+                    await result
+
+        pumps = [asyncio.create_task(pump(sensor, feed)) for sensor, feed in feeds.items()]
+        done = asyncio.gather(*pumps)
+        try:
+            while not (done.done() and queue.empty()):
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=tick_s)
+                except asyncio.TimeoutError:
+                    await deliver(self.tick())
+                    continue
+                await deliver(self.push(*item))
+            await done  # surface a feed's exception
+            await deliver(self.flush())
+        finally:
+            for task in pumps:
+                task.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+
+    def _feed(self, sensor: str) -> _Feed:
+        if sensor not in self._feeds:
+            delay = self.max_delay_s
+            if isinstance(delay, dict):
+                delay = delay.get(sensor, DEFAULT_MAX_DELAY_S)
+            # A feed that has not spoken yet holds the others back until it idles out
+            self._feeds[sensor] = _Feed(max_delay_s=delay, last_arrival=self.clock())
+        return self._feeds[sensor]
+
+    def _idle(self, feed: _Feed, now: float) -> bool:
+        return now - feed.last_arrival > self.idle_timeout_s
+
+    def _advance(self, now: float) -> List[Observation]:
+        active = [feed for feed in self._feeds.values() if not self._idle(feed, now)]
+        if active:
+            watermark = min(feed.watermark for feed in active)
+        else:
+            # Every feed is quiet: nothing else is coming soon, release what we hold
+            watermark = max((feed.max_time for feed in self._feeds.values()), default=-math.inf) + self.window_s
+        self.watermark = max(self.watermark, watermark)
+        ready_until = self.watermark - self.window_s
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            forced_until = self._pending[overflow - 1].time
+            if forced_until > ready_until:
+                forced = sum(1 for p in self._pending[:overflow] if p.time > ready_until)
+                self.counts["forced"] += forced
+                logger.warning(f"Fusion buffer over {self.max_pending}; finalising {forced} observations early")
+                ready_until = forced_until
+        return self._emit(ready_until, now)
+
+    def _emit(self, ready_until: float, now: float) -> List[Observation]:
+        n_ready = bisect.bisect_right(self._pending, ready_until, key=lambda p: p.time)
+        if n_ready == 0:
+            return []
+        # Anything within the join window of a final observation can still be its partner
+        horizon = self._pending[n_ready - 1].time + self.window_s
+        candidates = self._pending[:bisect.bisect_right(self._pending, horizon, key=lambda p: p.time)]
+        clusters = self.engine.cluster(
+            [(p.observation.sensor, p.observation.detection) for p in candidates],
+            times=[p.time for p in candidates],
+            window_s=self.window_s,
+        )
+
+        emitted, taken = [], set()
+        for members in clusters:
+            if min(members) >= n_ready:
+                continue  # nothing final in it yet; may still gain members
+            taken.update(members)
+            group = [candidates[i] for i in members]
+            self.max_hold_s = max(self.max_hold_s, max(now - p.arrived for p in group))
+            if len(group) == 1:
+                observation = group[0].observation
+                if observation.detection.confidence < self.min_confidence.get(observation.sensor, 0.0):
+                    self.counts["dropped"] += 1
+                    continue
+            merged = self.engine.merge([(p.observation.sensor, p.observation.detection) for p in group])
+            emitted.append(Observation("fused", max(p.time for p in group), merged))
+            self.counts["fused"] += len(group) > 1
+        self._pending = [p for i, p in enumerate(self._pending) if i not in taken]
+        self.counts["emitted"] += len(emitted)
+        return emitted
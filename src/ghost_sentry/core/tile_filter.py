@@ -0,0 +1,222 @@
+"""Pre-inference tile filter: skip clouded tiles and tiles unchanged since the last pass."""
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from ghost_sentry.core.detection_cache import decode, encode
+from ghost_sentry.core.models import Detection
+
+logger = logging.getLogger(__name__)
+
+# Pixels bright and grey enough to be cloud in an 8-bit true-colour tile
+CLOUD_BRIGHTNESS = 200
+CLOUD_MAX_SPREAD = 40
+# Skip a tile when at least this much of it is cloud or no-data
+DEFAULT_CLOUD_FRACTION = 0.9
+# Only every Nth pixel in each direction is looked at for the cloud mask
+MASK_STRIDE = 4
+# Grey-level thumbnail compared against the previous acquisition
+SIGNATURE_SIZE = 32
+# Thumbnail cells whose (brightness-normalised) mean moved by more than this count as changed
+DEFAULT_CHANGE_THRESHOLD = 12.0
+
+
+def obscured_fraction(image: np.ndarray) -> float:
+    """Share of an HxWx3 uint8 tile that is cloud (bright, colourless) or no-data (all zero)."""
+    sample = image[::MASK_STRIDE, ::MASK_STRIDE].astype(np.int16)
+    low = sample.min(axis=2)
+    high = sample.max(axis=2)
+    cloud = (low >= CLOUD_BRIGHTNESS) & (high - low <= CLOUD_MAX_SPREAD)
+    nodata = high == 0
+    return float(np.count_nonzero(cloud | nodata)) / cloud.size
+
+
+def tile_signature(image: np.ndarray, size: int = SIGNATURE_SIZE) -> np.ndarray:
+    """
+    size x size uint8 grey thumbnail of a tile (block means).
+
+    A 64-bit dHash would miss vehicle-scale change in a 640 px tile; a
+    32x32 thumbnail keeps cells of ~20 px, about the size of a truck in
+    10 m imagery, while staying a 1 KB comparison.
+    """
+    grey = image.mean(axis=2, dtype=np.float32) if image.ndim == 3 else image.astype(np.float32)
+    h, w = grey.shape
+    rows = np.linspace(0, h, min(size, h) + 1).astype(int)
+    cols = np.linspace(0, w, min(size, w) + 1).astype(int)
+    sums = np.add.reduceat(np.add.reduceat(grey, rows[:-1], axis=0), cols[:-1], axis=1)
+    counts = np.outer(np.diff(rows), np.diff(cols))
+    return np.clip(sums / counts, 0, 255).astype(np.uint8)
+
+
+def changed_cells(a: np.ndarray, b: np.ndarray, threshold: float = DEFAULT_CHANGE_THRESHOLD) -> int:
+    """Thumbnail cells that differ by more than ``threshold``, after removing any overall brightness shift."""
+    if a.shape != b.shape:
+        return a.size
+    a = a.astype(np.float32)
+    b = b.astype(np.float32)
+    diff = np.abs((a - a.mean()) - (b - b.mean()))
+    return int(np.count_nonzero(diff > threshold))
+
+
+def tile_key(src, tile) -> str:
+    """
+    Stable id for a tile's ground footprint, so passes over the same AOI line up.
+
+    Georeferenced scenes are keyed by CRS and window bounds; plain images fall
+    back to the file name.
+    """
+    if src.crs is not None:
+        scope = src.crs.to_string()
+        bounds = ",".join(f"{v:.6f}" for v in src.window_bounds(tile.window))
+    else:
+        scope = Path(src.name).name
+        bounds = f"{tile.col_off},{tile.row_off}"
+    return f"{scope}|{bounds}|{tile.width}x{tile.height}"
+
+
+class TileStore:
+    """
+    Last inferred signature and detections per tile footprint, in SQLite.
+
+    Detections are kept in tile pixel coordinates so they can be shifted into
+    any scene that covers the same footprint.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tiles ("
+            "key TEXT PRIMARY KEY, signature BLOB, shape TEXT, detections BLOB, updated REAL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple[np.ndarray, List[Detection]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT signature, shape, detections FROM tiles WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        signature, shape, detections = row
+        rows, cols = map(int, shape.split("x"))
+        return np.frombuffer(signature, dtype=np.uint8).reshape(rows, cols), decode(detections)
+
+    def put(self, key: str, signature: np.ndarray, detections: List[Detection]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tiles (key, signature, shape, detections, updated) VALUES (?, ?, ?, ?, ?)",
+                (key, signature.tobytes(), "x".join(map(str, signature.shape)), encode(detections), time.time()),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class TileDecision:
+    action: str  # "infer", "cloud" or "unchanged"
+    signature: np.ndarray
+    detections: List[Detection] = field(default_factory=list)  # reused from the last pass when skipped
+
+    @property
+    def skip(self) -> bool:
+        return self.action != "infer"
+
+
+class TileFilter:
+    """
+    Decides per tile whether YOLO needs to run.
+
+    A tile is skipped when it is mostly cloud/no-data, or when its thumbnail
+    matches the one stored for the same footprint on the last inferred pass.
+    Skipped tiles hand back that pass's detections (``reuse_detections``),
+    so a cloudy or static tile does not make known objects disappear. The
+    stored reference is only replaced when the tile is actually inferred, so
+    slow drift still accumulates into a change.
+    """
+
+    def __init__(
+        self,
+        store: TileStore,
+        cloud_fraction: float = DEFAULT_CLOUD_FRACTION,
+        change_threshold: float = DEFAULT_CHANGE_THRESHOLD,
+        max_changed_cells: int = 0,
+        reuse_detections: bool = True,
+    ):
+        self.store = store
+        self.cloud_fraction = cloud_fraction
+        self.change_threshold = change_threshold
+        self.max_changed_cells = max_changed_cells
+        self.reuse_detections = reuse_detections
+        self._lock = threading.Lock()
+        self.counts = {"tiles": 0, "inferred": 0, "skipped_cloud": 0, "skipped_unchanged": 0, "reused_detections": 0}
+
+    def identity(self) -> dict:
+        return {
+            "cloud_fraction": self.cloud_fraction,
+            "change_threshold": self.change_threshold,
+            "max_changed_cells": self.max_changed_cells,
+            "reuse_detections": self.reuse_detections,
+        }
+
+    def check(self, key: str, image: np.ndarray) -> TileDecision:
+        signature = tile_signature(image)
+        previous = self.store.get(key)
+        if obscured_fraction(image) >= self.cloud_fraction:
+            action = "cloud"
+        elif previous is not None and changed_cells(
+            previous[0], signature, self.change_threshold
+        ) <= self.max_changed_cells:
+            action = "unchanged"
+        else:
+            action = "infer"
+        reused = previous[1] if action != "infer" and previous is not None and self.reuse_detections else []
+        with self._lock:
+            self.counts["tiles"] += 1
+            self.counts["inferred" if action == "infer" else f"skipped_{action}"] += 1
+            self.counts["reused_detections"] += len(reused)
+        return TileDecision(action, signature, reused)
+
+    def record(self, key: str, decision: TileDecision, detections: List[Detection]) -> None:
+        """Store an inferred tile's signature and (tile-local) detections for the next pass."""
+        self.store.put(key, decision.signature, detections)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self.counts)
+        skipped = counts["skipped_cloud"] + counts["skipped_unchanged"]
+        return {**counts, "skipped": skipped, "skip_rate": round(skipped / counts["tiles"], 3) if counts["tiles"] else 0.0}
+
+
+# One filter per store per process, shared by all detector threads
+_filters: dict[str, TileFilter] = {}
+_filters_lock = threading.Lock()
+
+
+def open_filter(store_path: str, **options) -> TileFilter:
+    resolved = str(Path(store_path).resolve())
+    with _filters_lock:
+        if resolved not in _filters:
+            _filters[resolved] = TileFilter(TileStore(resolved), **options)
+        return _filters[resolved]
+
+
+def filter_stats() -> dict:
+    """Stats for every tile filter opened in this process, by store path."""
+    return {path: f.stats() for path, f in _filters.items()}
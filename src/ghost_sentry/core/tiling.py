@@ -0,0 +1,175 @@
+"""Tiled windowed inference for large scenes (e.g. full Sentinel-2 tiles)."""
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ghost_sentry.core.boxes import batched_nms
+from ghost_sentry.core.models import Detection
+
+DEFAULT_TILE_SIZE = 640
+DEFAULT_OVERLAP = 64
+# Sentinel-2 L2A reflectance DN mapped to full 8-bit brightness
+REFLECTANCE_SCALE = 3000.0
+
+
+@dataclass(frozen=True)
+class Tile:
+    col_off: int
+    row_off: int
+    width: int
+    height: int
+
+    @property
+    def window(self):
+        from rasterio.windows import Window
+        return Window(self.col_off, self.row_off, self.width, self.height)
+
+
+def _offsets(length: int, tile_size: int, step: int) -> List[int]:
+    if length <= tile_size:
+        return [0]
+    offsets = list(range(0, length - tile_size, step))
+    offsets.append(length - tile_size)  # last tile flush with the edge
+    return offsets
+
+
+def tile_grid(width: int, height: int, tile_size: int = DEFAULT_TILE_SIZE, overlap: int = DEFAULT_OVERLAP) -> List[Tile]:
+    """Overlapping tiles covering a width x height raster. Tiles are full size unless the raster is smaller."""
+    if overlap >= tile_size:
+        raise ValueError("overlap must be smaller than tile_size")
+    step = tile_size - overlap
+    return [
+        Tile(col, row, min(tile_size, width), min(tile_size, height))
+        for row in _offsets(height, tile_size, step)
+        for col in _offsets(width, tile_size, step)
+    ]
+
+
+def to_bgr8(bands: np.ndarray) -> np.ndarray:
+    """(bands, h, w) raster block -> contiguous HxWx3 BGR uint8, as YOLO expects for arrays."""
+    if bands.shape[0] == 1:
+        bands = np.repeat(bands, 3, axis=0)
+    if bands.dtype != np.uint8:
+        bands = np.clip(bands.astype(np.float32) * (255.0 / REFLECTANCE_SCALE), 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(bands[2::-1].transpose(1, 2, 0))
+
+
+class TiledDetector:
+    """
+    Runs a detector over a large raster tile by tile.
+
+    Overlapping windows are read with rasterio windowed reads, so only
+    ``batch_size`` tiles are ever in memory regardless of scene size. Boxes
+    are shifted back to scene pixel coordinates and duplicates across tile
+    seams are merged with class-aware NMS. An optional ``tile_filter``
+    (see ``ghost_sentry.core.tile_filter``) skips clouded and unchanged tiles
+    before they reach the detector.
+    """
+
+    def __init__(
+        self,
+        detector,
+        tile_size: int = DEFAULT_TILE_SIZE,
+        overlap: int = DEFAULT_OVERLAP,
+        batch_size: int = 8,
+        merge_threshold: float = 0.5,
+        merge_metric: str = "ios",
+        bands: Sequence[int] = (1, 2, 3),
+        tile_filter: Optional[Any] = None,
+    ):
+        self.detector = detector
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self.merge_threshold = merge_threshold
+        self.merge_metric = merge_metric
+        self.bands = list(bands)
+        self.tile_filter = tile_filter
+        self.tiles_processed = 0
+        self.tiles_skipped = 0
+
+    def identity(self) -> dict:
+        identity = {
+            **self.detector.identity(),
+            "tile_size": self.tile_size,
+            "overlap": self.overlap,
+            "bands": self.bands,
+            "merge": [self.merge_metric, self.merge_threshold],
+        }
+        if self.tile_filter is not None:
+            identity["tile_filter"] = self.tile_filter.identity()
+        return identity
+
+    def iter_tiles(self, src) -> Iterator[tuple[Tile, np.ndarray]]:
+        indexes = self.bands if src.count >= len(self.bands) else [1]
+        for tile in tile_grid(src.width, src.height, self.tile_size, self.overlap):
+            yield tile, to_bgr8(src.read(indexes=indexes, window=tile.window))
+
+    def detect(self, image_path: str) -> List[Detection]:
+        """Detect over the whole scene; bboxes are in scene pixel coordinates."""
+        import rasterio
+        found: List[Detection] = []
+        # (tile, pixels, (store key, filter decision) or None)
+        batch: List[tuple[Tile, np.ndarray, Optional[tuple]]] = []
+        with rasterio.open(image_path) as src:
+            for tile, array in self.iter_tiles(src):
+                pending = None
+                if self.tile_filter is not None:
+                    from ghost_sentry.core.tile_filter import tile_key
+                    key = tile_key(src, tile)
+                    decision = self.tile_filter.check(key, array)
+                    if decision.skip:
+                        self.tiles_skipped += 1
+                        found.extend(self._shift(tile, decision.detections))
+                        continue
+                    pending = (key, decision)
+                batch.append((tile, array, pending))
+                if len(batch) == self.batch_size:
+                    found.extend(self._run_batch(batch))
+                    batch = []
+            if batch:
+                found.extend(self._run_batch(batch))
+        return self.merge(found)
+
+    def detect_batch(self, image_paths: Sequence[str], batch_size: int = 8) -> List[List[Detection]]:
+        """One scene at a time; each scene's tiles are already batched by ``self.batch_size``."""
+        return [self.detect(image_path) for image_path in image_paths]
+
+    def _run_batch(self, batch: List[tuple[Tile, np.ndarray, Optional[tuple]]]) -> List[Detection]:
+        results = self.detector.detect_batch([array for _, array, _ in batch], batch_size=len(batch))
+        self.tiles_processed += len(batch)
+        shifted = []
+        for (tile, _, pending), detections in zip(batch, results):
+            if pending is not None:
+                self.tile_filter.record(*pending, detections)
+            shifted.extend(self._shift(tile, detections))
+        return shifted
+
+    @staticmethod
+    def _shift(tile: Tile, detections: List[Detection]) -> List[Detection]:
+        """Tile pixel coordinates -> scene pixel coordinates."""
+        shifted = []
+        for d in detections:
+            x1, y1, x2, y2 = d.bbox
+            shifted.append(Detection.model_construct(
+                label=d.label,
+                confidence=d.confidence,
+                bbox=(x1 + tile.col_off, y1 + tile.row_off, x2 + tile.col_off, y2 + tile.row_off),
+            ))
+        return shifted
+
+    def merge(self, detections: List[Detection]) -> List[Detection]:
+        """Collapse duplicates from overlapping tiles, keeping the most confident box."""
+        if len(detections) < 2:
+            return detections
+        labels = [d.label for d in detections]
+        label_ids = {label: i for i, label in enumerate(dict.fromkeys(labels))}
+        keep = batched_nms(
+            np.array([d.bbox for d in detections], dtype=np.float64),
+            np.array([d.confidence for d in detections]),
+            np.array([label_ids[label] for label in labels]),
+            self.merge_threshold,
+            self.merge_metric,
+        )
+        return [detections[i] for i in keep]
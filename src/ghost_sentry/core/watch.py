@@ -0,0 +1,185 @@
+"""Watch-folder ingestion: tail a directory and feed new imagery to the pipeline.
+
+Change notification uses inotify (through ``watchfiles``) when it is
+installed and falls back to polling otherwise. Either way a file is only
+handed on once its size and mtime have stopped changing, so scenes still
+being copied in are not read half-written.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from ghost_sentry.core.workers import IMAGE_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_SETTLE_S = 1.0
+CHECKPOINT_NAME = ".ghost_sentry_checkpoint.jsonl"
+
+
+def _signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class Checkpoint:
+    """
+    Append-only record of files that made it all the way through the pipeline.
+
+    Each line is one processed file with the size and mtime it had. A file is
+    processed again only if it is replaced (different size or mtime), so a
+    restarted watcher picks up exactly where the last one stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._done: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                    self._done[entry["path"]] = (entry["size"], entry["mtime_ns"])
+                except (ValueError, KeyError):
+                    logger.warning(f"Skipping corrupt checkpoint line in {self.path}")
+
+    def is_done(self, path: str, signature: Optional[tuple[int, int]] = None) -> bool:
+        done = self._done.get(path)
+        return done is not None and done == (signature or _signature(path))
+
+    def mark(self, path: str) -> None:
+        signature = _signature(path)
+        if signature is None:
+            return
+        with self._lock:
+            self._done[path] = signature
+            with self.path.open("a") as f:
+                f.write(json.dumps({"path": path, "size": signature[0], "mtime_ns": signature[1]}) + "\n")
+
+    def record(self, result: dict) -> None:
+        """Pipeline sink: checkpoint the image a completed result came from."""
+        self.mark(result["image_path"])
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+
+class FolderWatcher:
+    """
+    Hands each new, fully written image under ``directory`` to ``submit`` once.
+
+    Files already in the checkpoint are skipped, including on startup, when
+    the existing backlog is scanned first. ``submit`` may block (the pipeline
+    applies backpressure); the watcher simply waits, so concurrency is bounded
+    by the pipeline's queues and workers. A file that fails is not retried
+    until it changes or the watcher restarts.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        checkpoint: Checkpoint,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        settle_s: float = DEFAULT_SETTLE_S,
+        use_inotify: Optional[bool] = None,
+    ):
+        self.directory = Path(directory).resolve()
+        self.checkpoint = checkpoint
+        self.poll_interval = poll_interval
+        self.settle_s = settle_s
+        self.use_inotify = _has_watchfiles() if use_inotify is None else use_inotify
+        # path -> (signature, monotonic time it was last seen changing)
+        self._candidates: dict[str, tuple[Optional[tuple[int, int]], float]] = {}
+        # Handed on but not checkpointed yet: in flight, or failed (not retried until changed)
+        self._submitted: dict[str, tuple[int, int]] = {}
+        self._stop = asyncio.Event()
+        self.submitted = 0
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self, submit: Callable[[str], Awaitable[Any]]) -> None:
+        """Watch until ``stop()`` is called."""
+        self._scan()
+        source = asyncio.create_task(self._inotify() if self.use_inotify else self._poll())
+        logger.info(f"Watching {self.directory} ({'inotify' if self.use_inotify else 'polling'})")
+        try:
+            while not self._stop.is_set():
+                for path in self._ready():
+                    await submit(path)
+                    self.submitted += 1
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=min(self.poll_interval, self.settle_s))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            source.cancel()
+            await asyncio.gather(source, return_exceptions=True)
+
+    def observe(self, path: str) -> None:
+        """Note that ``path`` appeared or changed."""
+        if Path(path).suffix.lower() not in IMAGE_SUFFIXES:
+            return
+        path = os.path.abspath(path)
+        signature = _signature(path)
+        if signature is None or self.checkpoint.is_done(path, signature):
+            return
+        if self._submitted.get(path) == signature:
+            return
+        if path not in self._candidates:
+            self._candidates[path] = (signature, time.monotonic())
+
+    def _ready(self) -> list[str]:
+        """Candidates whose size and mtime held still for ``settle_s``."""
+        # Finished files are the checkpoint's to remember
+        for path, signature in list(self._submitted.items()):
+            if self.checkpoint.is_done(path, signature):
+                del self._submitted[path]
+        now = time.monotonic()
+        ready = []
+        for path, (seen, since) in list(self._candidates.items()):
+            current = _signature(path)
+            if current is None:
+                del self._candidates[path]
+            elif current != seen:
+                self._candidates[path] = (current, now)
+            elif now - since >= self.settle_s:
+                del self._candidates[path]
+                self._submitted[path] = current
+                ready.append(path)
+        return sorted(ready)
+
+    def _scan(self) -> None:
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                self.observe(os.path.join(root, name))
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            self._scan()
+
+    async def _inotify(self) -> None:
+        from watchfiles import Change, awatch
+
+        async for changes in awatch(self.directory, stop_event=self._stop):
+            for change, path in changes:
+                if change != Change.deleted:
+                    self.observe(path)
+
+
+def _has_watchfiles() -> bool:
+    try:
+        import watchfiles  # noqa: F401
+    except ImportError:
+        return False
+    return True
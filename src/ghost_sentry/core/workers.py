@@ -0,0 +1,137 @@
+"""Multi-process detection ingestion workers."""
+import functools
+import logging
+import multiprocessing as mp
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from ghost_sentry.core import geo
+from ghost_sentry.core.detector import build_detector
+from ghost_sentry.core.models import Detection
+from ghost_sentry.core.sentry import process_detections
+from ghost_sentry.lattice.adapter import LatticeConnector
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+
+# Per-process detector, loaded once by the pool initializer
+_detector: Any = None
+
+
+def _init_worker(detector_factory: Callable[[], Any], torch_threads: Optional[int]) -> None:
+    global _detector
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+    _detector = detector_factory()
+
+
+def _detect_path(image_path: str) -> tuple[str, List[Detection], Optional[str]]:
+    try:
+        return image_path, _detector.detect(image_path), None
+    except Exception as e:
+        return image_path, [], str(e)
+
+
+def iter_image_paths(paths: Iterable[str]) -> Iterator[str]:
+    """Expand directories into the image files they contain (sorted)."""
+    for p in map(Path, paths):
+        if p.is_dir():
+            for child in sorted(p.rglob("*")):
+                if child.suffix.lower() in IMAGE_SUFFIXES:
+                    yield str(child)
+        else:
+            yield str(p)
+
+
+@dataclass
+class IngestStats:
+    images: int = 0
+    failed: int = 0
+    detections: int = 0
+    tracks: int = 0
+    tasks: int = 0
+    elapsed_s: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def images_per_s(self) -> float:
+        return self.images / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "images": self.images,
+            "failed": self.failed,
+            "detections": self.detections,
+            "tracks": self.tracks,
+            "tasks": self.tasks,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "images_per_s": round(self.images_per_s, 3),
+        }
+
+
+class IngestWorkerPool:
+    """
+    Pushes a backlog of scenes through N detector processes.
+
+    Each worker process loads its detector once and pulls image paths from
+    the pool's shared task queue. Detection batches (one list per image)
+    flow back to the calling process, which is the single aggregator that
+    georeferences, correlates and persists them, so correlation state and
+    DB writes stay in one place.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        model_path: str = "yolov8n.pt",
+        detector_factory: Optional[Callable[[], Any]] = None,
+        chunksize: int = 1,
+        torch_threads: Optional[int] = 1,
+        start_method: str = "spawn",
+        backend: str = "ultralytics",
+        cache_dir: Optional[str] = None,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.chunksize = chunksize
+        self._detector_factory = detector_factory or functools.partial(
+            build_detector, model_path, backend=backend, cache_dir=cache_dir
+        )
+        # Only the PyTorch backend has torch thread pools to pin
+        self._torch_threads = torch_threads if backend == "ultralytics" else None
+        # spawn avoids forking a parent that may already hold torch thread pools
+        self._context = mp.get_context(start_method)
+
+    def run(
+        self,
+        image_paths: Iterable[str],
+        connector: LatticeConnector,
+        use_mock_geo: bool = True,
+    ) -> IngestStats:
+        stats = IngestStats()
+        start = time.perf_counter()
+        with self._context.Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(self._detector_factory, self._torch_threads),
+        ) as pool:
+            results = pool.imap_unordered(_detect_path, image_paths, chunksize=self.chunksize)
+            for image_path, detections, error in results:
+                stats.images += 1
+                if error:
+                    stats.failed += 1
+                    stats.errors.append(f"{image_path}: {error}")
+                    logger.error(f"Detection failed for {image_path}: {error}")
+                    continue
+                geo.georeference_detections(image_path, detections, use_mock=use_mock_geo)
+                result = process_detections(detections, connector)
+                stats.detections += result["detections"]
+                stats.tracks += result["tracks"]
+                stats.tasks += result["tasks"]
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
@@ -0,0 +1,45 @@
+"""Columnar batches of cooperative track reports (AIS, ADS-B)."""
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+
+def _empty(dtype) -> np.ndarray:
+    return np.empty(0, dtype=dtype)
+
+
+@dataclass
+class TrackBatch:
+    """
+    One column per field, one row per decoded message.
+
+    ``ids`` are the transmitter's own identity (MMSI as int64, ICAO 24-bit
+    address as 6-byte hex). Missing values are NaN.
+    """
+    source: str  # "ais" or "adsb"
+    entity_type: str  # label shared with imagery detections, e.g. "boat"
+    ids: np.ndarray = field(default_factory=lambda: _empty(np.int64))
+    lat: np.ndarray = field(default_factory=lambda: _empty(np.float64))
+    lon: np.ndarray = field(default_factory=lambda: _empty(np.float64))
+    time: np.ndarray = field(default_factory=lambda: _empty(np.float64))  # epoch seconds
+    speed_kn: np.ndarray = field(default_factory=lambda: _empty(np.float32))
+    course_deg: np.ndarray = field(default_factory=lambda: _empty(np.float32))
+    altitude_ft: np.ndarray = field(default_factory=lambda: _empty(np.float32))
+
+    COLUMNS = ("ids", "lat", "lon", "time", "speed_kn", "course_deg", "altitude_ft")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def select(self, mask: np.ndarray) -> "TrackBatch":
+        return TrackBatch(self.source, self.entity_type, **{c: getattr(self, c)[mask] for c in self.COLUMNS})
+
+    @classmethod
+    def concat(cls, batches: List["TrackBatch"]) -> "TrackBatch":
+        first = batches[0]
+        return cls(
+            first.source,
+            first.entity_type,
+            **{c: np.concatenate([getattr(b, c) for b in batches]) for c in cls.COLUMNS},
+        )
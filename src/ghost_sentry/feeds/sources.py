@@ -0,0 +1,150 @@
+"""Line-aligned byte chunks from files and local TCP/UDP feeds, and batch ingestion."""
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Iterable, Iterator, Optional, Union
+
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.feeds.adsb import SbsDecoder
+from ghost_sentry.feeds.ais import AisDecoder
+from ghost_sentry.feeds.batch import TrackBatch
+
+CHUNK_BYTES = 1 << 20
+# UDP datagrams arriving within this long of each other are decoded together
+UDP_BATCH_S = 0.05
+
+DECODERS = {"ais": AisDecoder, "adsb": SbsDecoder}
+
+
+class LineChunker:
+    """Splits a byte stream at the last newline, carrying the partial line over."""
+
+    def __init__(self):
+        self._tail = b""
+
+    def feed(self, data: bytes) -> bytes:
+        data = self._tail + data
+        cut = data.rfind(b"\n") + 1
+        self._tail = data[cut:]
+        return data[:cut]
+
+    def flush(self) -> bytes:
+        tail, self._tail = self._tail, b""
+        return tail
+
+
+def iter_file_chunks(path: str, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    chunker = LineChunker()
+    with open(path, "rb") as f:
+        for data in iter(lambda: f.read(chunk_bytes), b""):
+            chunk = chunker.feed(data)
+            if chunk:
+                yield chunk
+    tail = chunker.flush()
+    if tail:
+        yield tail
+
+
+async def iter_tcp_chunks(host: str, port: int, chunk_bytes: int = CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Chunks from a TCP feed (e.g. an AIS-catcher or dump1090 port 30003) until it closes."""
+    reader, writer = await asyncio.open_connection(host, port)
+    chunker = LineChunker()
+    try:
+        while data := await reader.read(chunk_bytes):
+            chunk = chunker.feed(data)
+            if chunk:
+                yield chunk
+        tail = chunker.flush()
+        if tail:
+            yield tail
+    finally:
+        writer.close()
+
+
+class _DatagramQueue(asyncio.DatagramProtocol):
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    def datagram_received(self, data, addr):
+        self.queue.put_nowait(data)
+
+
+async def iter_udp_chunks(
+    host: str, port: int, batch_s: float = UDP_BATCH_S, chunk_bytes: int = CHUNK_BYTES
+) -> AsyncIterator[bytes]:
+    """Datagrams received on host:port, grouped into chunks of up to ``batch_s`` / ``chunk_bytes``."""
+    queue: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: _DatagramQueue(queue), local_addr=(host, port))
+    try:
+        while True:
+            parts = [await queue.get()]
+            size = len(parts[0])
+            deadline = loop.time() + batch_s
+            while size < chunk_bytes:
+                try:
+                    part = await asyncio.wait_for(queue.get(), timeout=max(0.0, deadline - loop.time()))
+                except asyncio.TimeoutError:
+                    break
+                parts.append(part)
+                size += len(part)
+            # Datagrams hold whole sentences; make sure each ends a line
+            yield b"\n".join(p.rstrip(b"\r\n") for p in parts) + b"\n"
+    finally:
+        transport.close()
+
+
+class FeedIngestor:
+    """
+    Decodes chunks of a cooperative feed and correlates them in bulk.
+
+    One ``EntityMatcher.correlate_batch`` call per chunk, so the per-message
+    cost is the vectorised decode only.
+    """
+
+    def __init__(self, decoder: Union[AisDecoder, SbsDecoder], matcher: Optional[EntityMatcher] = None):
+        if matcher is None:
+            from ghost_sentry.core.sentry import _matcher as matcher
+        self.decoder = decoder
+        self.matcher = matcher
+        self.messages = 0
+        self.chunks = 0
+        self.entities_touched = 0
+        self.busy_s = 0.0
+
+    def ingest(self, chunk: bytes) -> TrackBatch:
+        start = time.perf_counter()
+        batch = self.decoder.decode(chunk)
+        if len(batch):
+            touched = self.matcher.correlate_batch(
+                batch.entity_type, batch.ids, batch.lat, batch.lon, source=batch.source
+            )
+            self.entities_touched += len(touched)
+        self.messages += len(batch)
+        self.chunks += 1
+        self.busy_s += time.perf_counter() - start
+        return batch
+
+    def ingest_all(self, chunks: Iterable[bytes]) -> dict:
+        for chunk in chunks:
+            self.ingest(chunk)
+        return self.stats()
+
+    async def run(self, chunks: AsyncIterator[bytes], stats_interval: float = 0.0) -> dict:
+        last_report = time.monotonic()
+        async for chunk in chunks:
+            self.ingest(chunk)
+            if stats_interval and time.monotonic() - last_report >= stats_interval:
+                last_report = time.monotonic()
+                logging.info(f"[feed:{self.decoder.source}] {self.stats()}")
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "source": self.decoder.source,
+            "chunks": self.chunks,
+            "messages": self.messages,
+            "rejected": self.decoder.rejected,
+            "entities_touched": self.entities_touched,
+            "messages_per_s": round(self.messages / self.busy_s) if self.busy_s else 0,
+        }
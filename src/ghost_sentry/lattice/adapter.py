@@ -1,7 +1,8 @@
 import os
 import logging
+from typing import List
 from ghost_sentry.lattice.entities import LatticeTrack
-from ghost_sentry.core import db, events
+from ghost_sentry.core import db, events, serialization
 
 
 class LatticeConnectionError(Exception):
@@ -14,7 +15,8 @@ class LatticeConnector:
     
     Modes:
         - dev: Local SQLite persistence with event bus (default)
-        - prod: gRPC connection to Lattice service (requires LATTICE_ENDPOINT)
+        - prod: batched NDJSON publishes to a Lattice endpoint over a keep-alive
+          connection (requires LATTICE_ENDPOINT; see lattice.client)
     """
     
     def __init__(self, mode: str = "dev"):
@@ -27,38 +29,50 @@ class LatticeConnector:
             self._init_prod_connection()
     
     def _init_prod_connection(self) -> None:
-        """Initialize production Lattice gRPC connection."""
+        """Initialize the production Lattice connection (one pooled HTTP client)."""
         endpoint = os.environ.get("LATTICE_ENDPOINT")
         if not endpoint:
             raise EnvironmentError(
                 "LATTICE_ENDPOINT environment variable required for prod mode. "
-                "Expected format: grpc://lattice.example.com:443"
+                "Expected format: https://lattice.example.com "
+                "(python -m ghost_sentry.lattice.standin runs a local stand-in)"
             )
-        
-        # Production Lattice SDK integration point
-        # In a real deployment, this would establish gRPC channel:
-        #
-        # import grpc
-        # from anduril.lattice.v1 import lattice_pb2_grpc
-        # 
-        # credentials = grpc.ssl_channel_credentials()
-        # self._channel = grpc.secure_channel(endpoint, credentials)
-        # self._stub = lattice_pb2_grpc.LatticeServiceStub(self._channel)
-        #
+        if not endpoint.startswith(("http://", "https://")):
+            raise LatticeConnectionError(f"Unsupported LATTICE_ENDPOINT {endpoint!r}; expected an http(s) URL")
+
+        from ghost_sentry.lattice.client import LatticeClient
         self._endpoint = endpoint
+        self._client = LatticeClient(
+            endpoint,
+            token=os.environ.get("LATTICE_API_KEY"),
+            buffer_size=int(os.environ.get("LATTICE_BUFFER_SIZE", "10000")),
+        )
         self._logger.info(f"Lattice connector initialized for endpoint: {endpoint}")
-    
+
     def publish_track(self, track: LatticeTrack) -> None:
         """Publish a track entity to Lattice."""
         if self.mode == "dev":
-            db.add_event("track", track.model_dump(), entity_id=track.entityId)
-            events.publish(events.TrackEvent(entity_id=track.entityId, data=track.model_dump()))
+            # Dump and serialize once; the DB row and every event consumer share the bytes
+            data = track.model_dump()
+            raw = serialization.dumps(data)
+            db.add_event("track", raw, entity_id=track.entityId)
+            events.publish(events.TrackEvent(entity_id=track.entityId, data=data, raw=raw))
         else:
-            # Production gRPC publish
-            # In real deployment:
-            # request = PublishTrackRequest(track=track.to_proto())
-            # self._stub.PublishTrack(request)
-            self._logger.info(f"[PROD] Would publish track {track.entityId} to {self._endpoint}")
+            self._client.publish("track", track.model_dump())
+
+    def publish_tracks(self, tracks: List[LatticeTrack]) -> None:
+        """Publish several tracks as one batch: one DB transaction, one remote call."""
+        if not tracks:
+            return
+        if self.mode == "dev":
+            batch = []
+            for track in tracks:
+                data = track.model_dump()
+                batch.append(events.TrackEvent(entity_id=track.entityId, data=data, raw=serialization.dumps(data)))
+            db.add_events([("track", event.raw, event.entity_id) for event in batch])
+            events.publish_many(batch)
+        else:
+            self._client.publish_many("track", [track.model_dump() for track in tracks])
     
     def publish_task(self, task: dict) -> None:
         if self.mode == "dev":
@@ -80,4 +94,12 @@ class LatticeConnector:
             db.add_event("task", task_event_data, entity_id=entity_id)
             events.publish(events.TrackEvent(entity_id=entity_id, data={"type": "task", "task": task_event_data}))
         else:
-            self._logger.info(f"[PROD] Would publish task to {self._endpoint}")
+            self._client.publish("task", task)
+
+    def close(self) -> None:
+        """Deliver anything still buffered (prod mode) and release the connection."""
+        if self.mode == "prod":
+            self._client.close()
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, **(self._client.stats() if self.mode == "prod" else {})}
@@ -0,0 +1,168 @@
+"""Prod-mode Lattice transport: pooled HTTP client with an outbound buffer."""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from ghost_sentry.core.retry import RETRYABLE_STATUS, retry_after
+DEFAULT_BUFFER_SIZE = 10_000
+DEFAULT_BATCH_SIZE = 500
+
+# Publish endpoints: one NDJSON object per line
+ENDPOINTS = {"track": "/v1/tracks", "task": "/v1/tasks"}
+
+
+class LatticeClient:
+    """
+    Publishes tracks and tasks to a Lattice endpoint over one keep-alive connection.
+
+    Every publish goes into a bounded outbox, which is then drained in batches
+    of up to ``batch_size`` entries, each sent as a single NDJSON request.
+    Consecutive entries of the same kind share a request, so tracks and tasks
+    keep their relative order. Throttling, 5xx and network errors are retried
+    with jittered exponential backoff. When retries run out the client is
+    marked disconnected: publishes keep buffering (the oldest entries are
+    dropped once ``buffer_size`` is reached) and delivery resumes on the
+    first publish or ``drain`` after ``max_backoff_s``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        token: Optional[str] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        retries: int = 3,
+        backoff_s: float = 0.1,
+        max_backoff_s: float = 5.0,
+        timeout: float = 10.0,
+    ):
+        import httpx
+
+        headers = {"Content-Type": "application/x-ndjson"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        self.endpoint = endpoint.rstrip("/")
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._http = httpx.Client(
+            base_url=self.endpoint,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+        )
+        self._outbox: Deque[Tuple[str, bytes]] = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.connected = True
+        self._retry_at = 0.0
+        self.sent = 0
+        self.requests = 0
+        self.retried = 0
+        self.dropped = 0
+        self.disconnects = 0
+
+    def publish(self, kind: str, payload: dict) -> int:
+        """Queue one entry and drain what can be sent. Returns entries delivered."""
+        return self.publish_many(kind, [payload])
+
+    def publish_many(self, kind: str, payloads: list) -> int:
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown publish kind {kind!r}; expected one of {sorted(ENDPOINTS)}")
+        lines = [json.dumps(p, separators=(",", ":")).encode() for p in payloads]
+        with self._lock:
+            overflow = len(self._outbox) + len(lines) - self._outbox.maxlen
+            if overflow > 0:
+                self.dropped += overflow
+                logging.warning(f"Lattice outbox full; dropped {overflow} oldest entries")
+            self._outbox.extend((kind, line) for line in lines)
+        return self.drain()
+
+    def drain(self) -> int:
+        """Send buffered entries until the outbox is empty or the endpoint is unreachable."""
+        delivered = 0
+        with self._send_lock:
+            if not self.connected and time.monotonic() < self._retry_at:
+                return 0
+            while True:
+                with self._lock:
+                    if not self._outbox:
+                        break
+                    kind = self._outbox[0][0]
+                    batch = []
+                    while self._outbox and len(batch) < self.batch_size and self._outbox[0][0] == kind:
+                        batch.append(self._outbox.popleft()[1])
+                if not self._send(kind, batch):
+                    with self._lock:
+                        # Back to the front in order; if publishes filled the
+                        # outbox meanwhile, the oldest entries lose out as usual
+                        free = self._outbox.maxlen - len(self._outbox)
+                        keep = batch[max(0, len(batch) - free):]
+                        self.dropped += len(batch) - len(keep)
+                        self._outbox.extendleft((kind, line) for line in reversed(keep))
+                    break
+                delivered += len(batch)
+        return delivered
+
+    def _send(self, kind: str, lines: list) -> bool:
+        import httpx
+
+        body = b"\n".join(lines) + b"\n"
+        for attempt in range(self.retries + 1):
+            delay = None
+            try:
+                response = self._http.post(ENDPOINTS[kind], content=body)
+                response.raise_for_status()
+                self.requests += 1
+                self.sent += len(lines)
+                if not self.connected:
+                    logging.info(f"Lattice endpoint {self.endpoint} reachable again")
+                self.connected = True
+                return True
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRYABLE_STATUS:
+                    # Not worth retrying; the batch would be rejected again
+                    logging.error(f"Lattice rejected {len(lines)} {kind}s: HTTP {e.response.status_code}")
+                    self.dropped += len(lines)
+                    return True
+                delay = retry_after(e.response, self.max_backoff_s)
+                error = f"HTTP {e.response.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            if attempt < self.retries:
+                self.retried += 1
+                time.sleep(delay if delay is not None else self._backoff(attempt))
+        if self.connected:
+            self.disconnects += 1
+            logging.warning(f"Lattice endpoint {self.endpoint} unreachable ({error}); buffering")
+        self.connected = False
+        self._retry_at = time.monotonic() + self.max_backoff_s
+        return False
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt))
+
+    def close(self) -> None:
+        """Make a last delivery attempt, then close the connection."""
+        self._retry_at = 0.0
+        self.drain()
+        if self._outbox:
+            logging.warning(f"Closing Lattice client with {len(self._outbox)} undelivered entries")
+        self._http.close()
+
+    def stats(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "connected": self.connected,
+            "buffered": len(self._outbox),
+            "sent": self.sent,
+            "requests": self.requests,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "disconnects": self.disconnects,
+        }
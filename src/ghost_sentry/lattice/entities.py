@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Optional
 from pydantic import BaseModel, Field
-from ghost_sentry.core.detector import Detection
+from ghost_sentry.core.models import Detection
 
 class LatticeLocation(BaseModel):
     latitudeDegrees: float
@@ -40,19 +40,27 @@ class TrackBuilder:
     """Builds Lattice Track entities from Detections."""
     
     @staticmethod
-    def from_detection(detection: Detection) -> LatticeTrack:
+    def from_detection(detection: Detection, entity_id: Optional[str] = None) -> LatticeTrack:
+        """
+        Build a track; pass ``entity_id`` to update a persistent (correlated) entity.
+
+        The whole track is validated from one nested dict in a single
+        pydantic-core call, instead of building each sub-model (and dumping
+        the location) separately. ``model_construct`` is no faster here: it
+        runs in Python, while validation runs in Rust.
+        """
         lat, lon = detection.geo_location or (0.0, 0.0)
-        return LatticeTrack(
-            description=f"Detected {detection.label}",
-            ontology=LatticeOntology(platform_type=detection.label.capitalize()),
-            location={"position": LatticeLocation(
-                latitudeDegrees=lat,
-                longitudeDegrees=lon
-            ).model_dump()},
-            milView=LatticeMilView(
-                disposition="DISPOSITION_UNKNOWN",
-                environment="ENVIRONMENT_AIR" if detection.label == "airplane" else "ENVIRONMENT_LAND"
-            ),
-            provenance=LatticeProvenance(),
-            confidence=detection.confidence
-        )
+        now = datetime.now(timezone.utc).isoformat()
+        return LatticeTrack.model_validate({
+            "entityId": entity_id or str(uuid.uuid4()),
+            "description": f"Detected {detection.label}",
+            "ontology": {"platform_type": detection.label.capitalize()},
+            "location": {"position": {"latitudeDegrees": float(lat), "longitudeDegrees": float(lon), "altitudeHaeMeters": 0.0}},
+            "milView": {
+                "disposition": "DISPOSITION_UNKNOWN",
+                "environment": "ENVIRONMENT_AIR" if detection.label == "airplane" else "ENVIRONMENT_LAND",
+            },
+            "provenance": {"sourceUpdateTime": now},
+            "confidence": detection.confidence,
+            "createdTime": now,
+        })
@@ -0,0 +1,144 @@
+"""Coalescing batch publisher in front of a LatticeConnector."""
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from ghost_sentry.lattice.adapter import LatticeConnector
+from ghost_sentry.lattice.entities import LatticeTrack
+
+DEFAULT_FLUSH_INTERVAL_S = 0.25
+DEFAULT_MAX_BATCH = 500
+
+
+class BatchPublisher:
+    """
+    Buffers track updates and publishes them in batches from a background thread.
+
+    The buffer holds one track per entity: a newer update replaces the
+    pending one (latest wins), so a fast-moving entity costs one write per
+    flush instead of one per update. The buffer is flushed every
+    ``flush_interval_s`` or as soon as it holds ``max_batch`` entities, as a
+    single ``connector.publish_tracks`` call (one DB transaction and event
+    bus fan-out in dev mode, one remote call in prod).
+
+    Drop-in for the connector: ``process_detections`` and the pipeline call
+    ``publish_track``/``publish_task`` on it. Tasks are not coalesced. A task
+    flushes pending tracks first, so consumers never see a task for a track
+    they have not received.
+    """
+
+    def __init__(
+        self,
+        connector: LatticeConnector,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.connector = connector
+        self.mode = connector.mode
+        self.flush_interval_s = flush_interval_s
+        self.max_batch = max_batch
+        self._pending: Dict[str, LatticeTrack] = {}
+        self._oldest: Optional[float] = None  # submit time of the oldest pending update
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()  # keeps batches in order
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.published = 0
+        self.flushes = 0
+        self.errors = 0
+        self._latency_total_s = 0.0
+        self.max_latency_s = 0.0
+        self._started = time.monotonic()
+
+    def start(self) -> "BatchPublisher":
+        if self._thread is None:
+            self._closed.clear()
+            self._thread = threading.Thread(target=self._run, name="lattice-batch-publisher", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the flusher and publish whatever is still buffered."""
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def __enter__(self) -> "BatchPublisher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def publish_track(self, track: LatticeTrack) -> None:
+        with self._lock:
+            self.submitted += 1
+            if track.entityId in self._pending:
+                self.coalesced += 1
+            elif self._oldest is None:
+                self._oldest = time.monotonic()
+            self._pending[track.entityId] = track
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def publish_task(self, task: dict) -> None:
+        self.flush()
+        self.connector.publish_task(task)
+
+    def flush(self) -> int:
+        """Publish the buffer now, on the calling thread. Returns the batch size."""
+        with self._publish_lock:
+            with self._lock:
+                batch, self._pending = list(self._pending.values()), {}
+                oldest, self._oldest = self._oldest, None
+            if not batch:
+                return 0
+            try:
+                self.connector.publish_tracks(batch)
+            except Exception as e:
+                self.errors += 1
+                logging.error(f"Batch publish of {len(batch)} tracks failed, retrying next flush: {e}")
+                with self._lock:
+                    # Requeue unless a newer update arrived meanwhile
+                    for track in batch:
+                        self._pending.setdefault(track.entityId, track)
+                    self._oldest = oldest if self._oldest is None else min(oldest, self._oldest)
+                return 0
+            latency = time.monotonic() - oldest
+            self.published += len(batch)
+            self.flushes += 1
+            self._latency_total_s += latency
+            self.max_latency_s = max(self.max_latency_s, latency)
+            return len(batch)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "published": self.published,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "avg_batch": round(self.published / self.flushes, 1) if self.flushes else 0.0,
+            "avg_flush_latency_ms": round(1000 * self._latency_total_s / self.flushes, 2) if self.flushes else 0.0,
+            "max_flush_latency_ms": round(1000 * self.max_latency_s, 2),
+            "tracks_per_s": round(self.published / elapsed, 1) if elapsed > 0 else 0.0,
+            "flush_interval_ms": round(1000 * self.flush_interval_s, 1),
+            "max_batch": self.max_batch,
+        }
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            self.flush()
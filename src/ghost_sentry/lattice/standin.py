@@ -0,0 +1,272 @@
+"""
+Local stand-in for the Lattice publish endpoints (stdlib only).
+
+Accepts the NDJSON batches ``LatticeClient`` sends, keeps the latest state
+of every track, streams entity snapshots and updates to subscribers, and
+can be told to fail or go away so throughput and reconnect behaviour can
+be exercised offline.
+
+Usage: python -m ghost_sentry.lattice.standin [--port 8787] [--token secret]
+"""
+import argparse
+import json
+import queue
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+STREAM_CHUNK_LINES = 500
+HEARTBEAT_S = 5.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    standin: "LatticeStandIn"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.standin._lock:
+            self.standin._connections.add(self.connection)
+
+    def finish(self):
+        with self.standin._lock:
+            self.standin._connections.discard(self.connection)
+        super().finish()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = self.standin._check(self.headers.get("Authorization"))
+        if status is None:
+            kind = {"/v1/tracks": "track", "/v1/tasks": "task"}.get(self.path)
+            if kind is None:
+                status = 404
+            else:
+                try:
+                    entries = [json.loads(line) for line in body.splitlines() if line.strip()]
+                except json.JSONDecodeError:
+                    status = 400
+                else:
+                    self.standin._accept(kind, entries)
+                    return self._reply(200, {"accepted": len(entries)})
+        self._reply(status, {"error": status})
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._reply(200, {"status": "ok"})
+        if self.path == "/v1/tracks":
+            with self.standin._lock:
+                return self._reply(200, list(self.standin.tracks.values()))
+        if self.path == "/v1/stats":
+            return self._reply(200, self.standin.stats())
+        if self.path == "/v1/entities/stream":
+            status = self.standin._check(self.headers.get("Authorization"))
+            if status is None:
+                return self._stream()
+            return self._reply(status, {"error": status})
+        self._reply(404, {"error": 404})
+
+    def _stream(self) -> None:
+        """
+        Chunked NDJSON: every current track (``"snapshot": true``), a
+        ``snapshotComplete`` marker, then live updates until disconnect.
+
+        The subscription starts before the snapshot is taken, so an update
+        racing the snapshot may arrive twice but is never missed.
+        """
+        updates = self.standin._subscribe()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            with self.standin._lock:
+                snapshot = list(self.standin.tracks.values())
+            lines = []
+            for track in snapshot:
+                lines.append(json.dumps({"entity": track, "snapshot": True}))
+                if len(lines) == STREAM_CHUNK_LINES:
+                    self._chunk(lines)
+                    lines = []
+            lines.append(json.dumps({"snapshotComplete": len(snapshot)}))
+            self._chunk(lines)
+            while True:
+                try:
+                    track = updates.get(timeout=HEARTBEAT_S)
+                except queue.Empty:
+                    self._chunk([json.dumps({"heartbeat": time.time()})])
+                    continue
+                if track is None:
+                    break
+                lines = [json.dumps({"entity": track})]
+                while len(lines) < STREAM_CHUNK_LINES:
+                    try:
+                        track = updates.get_nowait()
+                    except queue.Empty:
+                        break
+                    if track is None:
+                        break
+                    lines.append(json.dumps({"entity": track}))
+                self._chunk(lines)
+                if track is None:
+                    break
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass  # subscriber went away
+        finally:
+            self.standin._unsubscribe(updates)
+            self.close_connection = True
+
+    def _chunk(self, lines: list) -> None:
+        data = ("\n".join(lines) + "\n").encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _reply(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", self.standin.retry_after)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LatticeStandIn:
+    """
+    Threaded HTTP server implementing ``POST /v1/tracks``, ``POST /v1/tasks``
+    and the ``GET /v1/entities/stream`` subscription.
+
+    ``fail_next(n, status)`` answers the next ``n`` publishes with an error
+    (429s carry ``Retry-After: <retry_after>``);
+    ``stop()`` followed by ``start()`` brings the server back on the same
+    port, as a restarted Lattice instance would.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.tracks: dict = {}
+        self.tasks: list = []
+        self.requests = 0
+        self.track_updates = 0
+        self.retry_after = "0"
+        self._failures: list = []
+        self._connections: set = set()
+        self._subscribers: list = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "LatticeStandIn":
+        handler = type("Handler", (_Handler,), {"standin": self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="lattice-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            for updates in self._subscribers:
+                updates.put(None)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+        # Drop keep-alive connections too, or clients would not notice the outage
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "LatticeStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 503) -> None:
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _check(self, authorization: Optional[str]) -> Optional[int]:
+        if self.token and authorization != f"Bearer {self.token}":
+            return 401
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def _accept(self, kind: str, entries: list) -> None:
+        with self._lock:
+            self.requests += 1
+            if kind == "task":
+                self.tasks.extend(entries)
+                return
+            self.track_updates += len(entries)
+            for track in entries:
+                self.tracks[track["entityId"]] = track
+                for updates in self._subscribers:
+                    updates.put(track)
+
+    def put_tracks(self, tracks: list) -> None:
+        """Inject tracks as if another node on the mesh had published them."""
+        self._accept("track", tracks)
+
+    def _subscribe(self) -> queue.Queue:
+        updates: queue.Queue = queue.Queue()
+        with self._lock:
+            self._subscribers.append(updates)
+        return updates
+
+    def _unsubscribe(self, updates: queue.Queue) -> None:
+        with self._lock:
+            if updates in self._subscribers:
+                self._subscribers.remove(updates)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "track_updates": self.track_updates,
+                "tracks": len(self.tracks),
+                "tasks": len(self.tasks),
+                "subscribers": len(self._subscribers),
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--token", default=None, help="Require this bearer token")
+    args = parser.parse_args()
+
+    with LatticeStandIn(args.host, args.port, args.token) as standin:
+        print(f"Lattice stand-in listening on {standin.url} (LATTICE_ENDPOINT={standin.url})")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
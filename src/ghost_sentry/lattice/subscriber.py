@@ -0,0 +1,245 @@
+"""Entity subscription: stream tracks from the mesh into the local picture."""
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+
+from ghost_sentry.core import db, events, serialization
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.feeds.sources import LineChunker
+
+STREAM_PATH = "/v1/entities/stream"
+SOURCE = "lattice"
+OWN_INTEGRATION = "ghost-sentry"
+# Entities whose last update time is remembered for deduplication
+DEFAULT_MAX_ENTITIES = 100_000
+
+
+def _update_time(track: dict) -> float:
+    """Source update time of a track as epoch seconds (0 when missing or malformed)."""
+    stamp = (track.get("provenance") or {}).get("sourceUpdateTime") or track.get("createdTime")
+    try:
+        return datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class LatticeSubscriber:
+    """
+    Streams entity updates from a Lattice endpoint and applies them as deltas.
+
+    The stream is read a network chunk at a time, so a large initial
+    snapshot is never held in memory as a whole. Each chunk's updates are
+    deduplicated by entity id and source update time: replays, the overlap
+    between snapshot and live updates, and out-of-order older states are
+    dropped. What remains is applied in bulk: one ``correlate_batch`` call
+    per entity type (mesh entities are keyed ``lattice:<entityId>``, so a
+    mesh track can claim a nearby entity we found in imagery), one DB
+    transaction for the current-track store, and one event-bus batch.
+    Tracks we published ourselves (``ignore_integration``) are skipped.
+    Update times are kept for the ``max_entities`` most recently updated
+    entities; an entity evicted from that table is simply applied again on
+    its next update.
+
+    Ingest lag is the time from a live update's source time to its
+    application here (snapshot entries are excluded).
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        matcher: Optional[EntityMatcher] = None,
+        token: Optional[str] = None,
+        store: bool = True,
+        ignore_integration: Optional[str] = OWN_INTEGRATION,
+        backoff_s: float = 0.5,
+        max_backoff_s: float = 30.0,
+        timeout: float = 30.0,
+        max_entities: int = DEFAULT_MAX_ENTITIES,
+    ):
+        if matcher is None:
+            from ghost_sentry.core.sentry import _matcher as matcher
+        self.endpoint = endpoint.rstrip("/")
+        self.matcher = matcher
+        self.token = token
+        self.store = store
+        self.ignore_integration = ignore_integration
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.timeout = timeout
+        self.max_entities = max_entities
+        # entityId -> last applied update time, least recently updated first
+        self._versions: "OrderedDict[str, float]" = OrderedDict()
+        self.connected = False
+        self.connections = 0
+        self.received = 0
+        self.applied = 0
+        self.duplicates = 0
+        self.echoes = 0
+        self.malformed = 0
+        self.snapshot_entities = 0
+        self.snapshot_s: Optional[float] = None
+        self._connected_at: Optional[float] = None
+        self._live = 0
+        self._lag_total_s = 0.0
+        self.last_lag_s = 0.0
+        self.max_lag_s = 0.0
+
+    def apply_lines(self, lines: list, now: Optional[float] = None) -> int:
+        """Apply a batch of NDJSON stream lines. Returns the number of entities updated."""
+        latest: Dict[str, tuple] = {}
+        snapshot_complete = False
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                self.malformed += 1
+                continue
+            if "snapshotComplete" in message:
+                snapshot_complete = True
+                continue
+            track = message.get("entity")
+            if not isinstance(track, dict) or "entityId" not in track:
+                continue
+            self.received += 1
+            if message.get("snapshot"):
+                self.snapshot_entities += 1
+            if self.ignore_integration and (track.get("provenance") or {}).get("integrationName") == self.ignore_integration:
+                self.echoes += 1
+                continue
+            entity_id = track["entityId"]
+            stamp = _update_time(track)
+            seen = latest.get(entity_id, (None, self._versions.get(entity_id)))[1]
+            # Without a source time there is nothing to order by: the last one received wins
+            if stamp and seen is not None and stamp <= seen:
+                self.duplicates += 1
+                continue
+            if entity_id in latest:
+                self.duplicates += 1  # superseded within this batch
+            latest[entity_id] = (track, stamp, not message.get("snapshot"))
+        if latest:
+            self._apply(latest, time.time() if now is None else now)
+        if snapshot_complete:
+            # Only once the snapshot entries in this batch have been applied
+            self._snapshot_done()
+        return len(latest)
+
+    def _apply(self, latest: Dict[str, tuple], now: float) -> None:
+        by_type = defaultdict(list)
+        for entity_id, (track, stamp, live) in latest.items():
+            self._versions[entity_id] = stamp
+            self._versions.move_to_end(entity_id)
+            position = (track.get("location") or {}).get("position") or {}
+            platform = (track.get("ontology") or {}).get("platform_type") or "unknown"
+            if "latitudeDegrees" in position and "longitudeDegrees" in position:
+                by_type[platform.lower()].append(
+                    (entity_id, position["latitudeDegrees"], position["longitudeDegrees"], track.get("confidence", 0.0))
+                )
+            if live and stamp:
+                # Snapshot entries are as old as their last update; only live ones measure lag
+                lag = max(0.0, now - stamp)
+                self._live += 1
+                self._lag_total_s += lag
+                self.last_lag_s = lag
+                self.max_lag_s = max(self.max_lag_s, lag)
+
+        for entity_type, rows in by_type.items():
+            ids, lats, lons, confidences = zip(*rows)
+            self.matcher.correlate_batch(
+                entity_type, np.array(ids), np.array(lats), np.array(lons), SOURCE, np.array(confidences)
+            )
+        if self.store:
+            batch = [
+                events.TrackEvent(entity_id=entity_id, data=track, raw=serialization.dumps(track))
+                for entity_id, (track, _, _) in latest.items()
+            ]
+            db.add_events([("track", event.raw, event.entity_id) for event in batch])
+            events.publish_many(batch)
+        self.applied += len(latest)
+        while len(self._versions) > self.max_entities:
+            self._versions.popitem(last=False)
+
+    def _snapshot_done(self) -> None:
+        if self._connected_at is not None and self.snapshot_s is None:
+            self.snapshot_s = time.monotonic() - self._connected_at
+
+    async def consume(self) -> None:
+        """Read one subscription until the server closes it."""
+        import httpx
+
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        timeout = httpx.Timeout(self.timeout, read=None)
+        async with httpx.AsyncClient(base_url=self.endpoint, headers=headers, timeout=timeout) as client:
+            async with client.stream("GET", STREAM_PATH) as response:
+                response.raise_for_status()
+                self.connected = True
+                self.connections += 1
+                self._connected_at = time.monotonic()
+                self.snapshot_s = None
+                chunker = LineChunker()
+                try:
+                    async for data in response.aiter_bytes():
+                        chunk = chunker.feed(data)
+                        if chunk:
+                            # Off the event loop: DB writes for a big snapshot chunk take a while
+                            await asyncio.to_thread(self.apply_lines, chunk.splitlines())
+                    self.apply_lines(chunker.flush().splitlines())
+                finally:
+                    self.connected = False
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> dict:
+        """Stay subscribed, reconnecting with jittered backoff, until ``stop`` is set."""
+        import httpx
+
+        stop = stop or asyncio.Event()
+        attempt = 0
+        while not stop.is_set():
+            self._connected_at = None
+            consumer = asyncio.ensure_future(self.consume())
+            stopper = asyncio.ensure_future(stop.wait())
+            await asyncio.wait({consumer, stopper}, return_when=asyncio.FIRST_COMPLETED)
+            stopper.cancel()
+            if not consumer.done():
+                consumer.cancel()
+                await asyncio.gather(consumer, return_exceptions=True)
+                break
+            error = consumer.exception()
+            if error is not None and not isinstance(error, (httpx.HTTPError, OSError)):
+                raise error
+            # A subscription that was established resets the backoff
+            attempt = 0 if self._connected_at is not None else attempt + 1
+            delay = random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt))
+            logging.warning(f"Lattice subscription to {self.endpoint} ended ({error or 'closed'}); retrying in {delay:.1f}s")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "connected": self.connected,
+            "connections": self.connections,
+            "received": self.received,
+            "applied": self.applied,
+            "duplicates": self.duplicates,
+            "echoes": self.echoes,
+            "malformed": self.malformed,
+            "entities": len(self._versions),
+            "snapshot_entities": self.snapshot_entities,
+            "snapshot_s": round(self.snapshot_s, 3) if self.snapshot_s is not None else None,
+            "lag_ms": {
+                "last": round(1000 * self.last_lag_s, 1),
+                "avg": round(1000 * self._lag_total_s / self._live, 1) if self._live else 0.0,
+                "max": round(1000 * self.max_lag_s, 1),
+            },
+        }
@@ -1,16 +1,26 @@
 """Cursor-on-Target (CoT) XML generator."""
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from ghost_sentry.core.detector import Detection
+from typing import Iterable, List, Optional
+from xml.sax.saxutils import escape
 
-COT_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
-<event version="2.0" uid="{uid}" type="{cot_type}" time="{time}" start="{time}" stale="{stale}" how="m-g">
+from ghost_sentry.core.models import Detection
+
+# The event is rendered in three parts so the per-entity parts can be cached
+# and the timestamps formatted once per batch
+_HEAD = '''<?xml version="1.0" encoding="UTF-8"?>
+<event version="2.0" uid="{uid}" type="{cot_type}" '''
+_STAMP = 'time="{time}" start="{time}" stale="{stale}" '
+_BODY = '''how="m-g">
   <point lat="{lat}" lon="{lon}" hae="0" ce="10" le="10"/>
   <detail>
     <contact callsign="{callsign}"/>
     <remarks>{remarks}</remarks>
   </detail>
 </event>'''
+COT_TEMPLATE = _HEAD + _STAMP + _BODY
 
 COT_TYPE_MAP = {
     "airplane": "a-f-A",  # Assumed friendly air
@@ -18,20 +28,112 @@ COT_TYPE_MAP = {
     "car": "a-u-G-E-V",
     "boat": "a-u-S",  # Unknown surface
 }
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+STALE_AFTER = timedelta(minutes=5)
+# uid = uuid5(UID_NAMESPACE, entityId): the same entity is the same marker on every refresh
+UID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "urn:ghost-sentry:cot")
+DEFAULT_CACHE_SIZE = 10_000
+
+_ATTR = {'"': "&quot;"}
+
 
 def to_cursor_on_target(detection: Detection) -> str:
     """Convert a Detection to CoT XML."""
     lat, lon = detection.geo_location or (0.0, 0.0)
     now = datetime.now(timezone.utc)
-    stale = now + timedelta(minutes=5)
-    
+    stale = now + STALE_AFTER
+
     return COT_TEMPLATE.format(
         uid=str(uuid.uuid4()),
         cot_type=COT_TYPE_MAP.get(detection.label, "a-u-G"),
-        time=now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-        stale=stale.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        time=now.strftime(TIME_FORMAT),
+        stale=stale.strftime(TIME_FORMAT),
         lat=lat,
         lon=lon,
         callsign=f"GS-{detection.label.upper()[:3]}",
         remarks=f"Detected {detection.label} (conf: {detection.confidence:.2f})"
     )
+
+
+def entity_uid(entity_id: str) -> str:
+    """Deterministic CoT uid for a track entity."""
+    return str(uuid.uuid5(UID_NAMESPACE, entity_id))
+
+
+def _revision(track: dict):
+    return (track.get("provenance") or {}).get("sourceUpdateTime") or track.get("createdTime")
+
+
+class CotEncoder:
+    """
+    Renders track dicts (``LatticeTrack.model_dump()`` or stored JSON) as CoT.
+
+    The uid, type, point and detail of each track are rendered once per
+    revision (``provenance.sourceUpdateTime``) and cached for the
+    ``cache_size`` most recently seen entities; only the time/stale stamp,
+    formatted once per ``encode_many`` call, changes between refreshes.
+    Safe to share between the event loop and request threads.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        # entityId -> (revision, head, body)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, track: dict, now: Optional[datetime] = None) -> Optional[str]:
+        """CoT XML for one track, or None if it has no entityId, platform type or position."""
+        return next(iter(self.encode_many([track], now)), None)
+
+    def encode_many(self, tracks: Iterable[dict], now: Optional[datetime] = None) -> List[str]:
+        """CoT XML for every renderable track, all stamped with the same time."""
+        now = now or datetime.now(timezone.utc)
+        stamp = _STAMP.format(time=now.strftime(TIME_FORMAT), stale=(now + STALE_AFTER).strftime(TIME_FORMAT))
+        out = []
+        for track in tracks:
+            parts = self._parts(track)
+            if parts is not None:
+                out.append(parts[0] + stamp + parts[1])
+        return out
+
+    def _parts(self, track: dict) -> Optional[tuple]:
+        entity_id = track.get("entityId")
+        revision = _revision(track)
+        with self._lock:
+            cached = self._cache.get(entity_id)
+            if cached is not None and revision is not None and cached[0] == revision:
+                self._cache.move_to_end(entity_id)
+                self.hits += 1
+                return cached[1:]
+        try:
+            label = track["ontology"]["platform_type"].lower()
+            position = track["location"]["position"]
+            lat, lon = position["latitudeDegrees"], position["longitudeDegrees"]
+            confidence = track.get("confidence", 0.9)
+            head = _HEAD.format(uid=entity_uid(entity_id), cot_type=COT_TYPE_MAP.get(label, "a-u-G"))
+            body = _BODY.format(
+                lat=lat,
+                lon=lon,
+                callsign=escape(f"GS-{label.upper()[:3]}", _ATTR),
+                remarks=escape(f"Detected {label} (conf: {confidence:.2f})"),
+            )
+        except (KeyError, TypeError, AttributeError, ValueError):
+            return None
+        with self._lock:
+            self.misses += 1
+            self._cache[entity_id] = (revision, head, body)
+            self._cache.move_to_end(entity_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return head, body
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
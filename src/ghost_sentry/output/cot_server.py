@@ -0,0 +1,261 @@
+"""
+Raw CoT streaming to TAK clients over TCP and UDP (multicast).
+
+ATAK/WinTAK take CoT as a TCP stream (events back to back) or as one event
+per UDP datagram, usually to the SA multicast group 239.2.3.1:6969. The
+server keeps the latest version of every track it is given and:
+
+* sends a newly connected TCP client the whole picture, then live updates;
+* renders each update once and writes the same bytes to every client;
+* drops a client whose unsent output exceeds ``max_buffer`` bytes on top of
+  one whole picture instead of blocking the others or buffering without
+  bound (a snapshot or refresh alone is several MB at 10k entities);
+* sends an entity at most once per ``min_interval_s``; updates in between
+  are coalesced and the latest goes out when the interval has passed;
+* re-sends the whole picture every ``refresh_s`` so markers do not go stale.
+
+All state is touched on the event loop; ``publish`` may be called from any
+thread (e.g. as an ``events`` listener fed by the ingestion pipeline).
+"""
+import asyncio
+import logging
+import socket
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from ghost_sentry.core import events
+from ghost_sentry.output.cot import CotEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8087
+DEFAULT_MULTICAST = "239.2.3.1:6969"
+DEFAULT_MAX_BUFFER = 1 << 20
+# Kernel send buffer per client: bounds what a stalled client can hold beyond max_buffer
+DEFAULT_SEND_BUFFER = 256 * 1024
+DEFAULT_MIN_INTERVAL_S = 1.0
+DEFAULT_REFRESH_S = 60.0
+DEFAULT_MAX_ENTITIES = 10_000
+READ_BYTES = 1 << 16
+# Hundreds of TAK clients may reconnect at once after a network blip
+LISTEN_BACKLOG = 1024
+
+
+class CotServer:
+    """Pushes track updates to TAK clients; ``port=None`` disables TCP, ``udp=None`` disables UDP."""
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: Optional[int] = DEFAULT_PORT,
+        udp: Optional[str] = None,
+        encoder: Optional[CotEncoder] = None,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+        send_buffer: Optional[int] = DEFAULT_SEND_BUFFER,
+        min_interval_s: float = DEFAULT_MIN_INTERVAL_S,
+        refresh_s: float = DEFAULT_REFRESH_S,
+        max_entities: int = DEFAULT_MAX_ENTITIES,
+        multicast_ttl: int = 1,
+    ):
+        self.host = host
+        self.port = port
+        self.udp = udp
+        self.encoder = encoder or CotEncoder(cache_size=max_entities)
+        self.max_buffer = max_buffer
+        self.send_buffer = send_buffer
+        self.min_interval_s = min_interval_s
+        self.refresh_s = refresh_s
+        self.max_entities = max_entities
+        self.multicast_ttl = multicast_ttl
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._udp_transport: Optional[asyncio.DatagramTransport] = None
+        self._udp_target = None
+        self._refresher: Optional[asyncio.Task] = None
+        self._clients: set = set()
+        self._handlers: set = set()
+        # entityId -> latest track, least recently updated first
+        self._latest: "OrderedDict[str, dict]" = OrderedDict()
+        self._last_sent: dict = {}
+        self._deferred: set = set()
+        self._picture_bytes = 0
+        self.connections = 0
+        self.slow_drops = 0
+        self.updates = 0
+        self.rate_limited = 0
+        self.events_sent = 0
+        self.bytes_sent = 0
+        self.datagrams_sent = 0
+
+    async def start(self) -> "CotServer":
+        self._loop = asyncio.get_running_loop()
+        if self.port is not None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=LISTEN_BACKLOG)
+            self.port = self._server.sockets[0].getsockname()[1]
+            logger.info(f"CoT TCP stream on {self.host}:{self.port}")
+        if self.udp:
+            host, port = self.udp.rsplit(":", 1)
+            self._udp_target = (host, int(port))
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.multicast_ttl)
+            self._udp_transport, _ = await self._loop.create_datagram_endpoint(asyncio.DatagramProtocol, sock=sock)
+            logger.info(f"CoT UDP to {self.udp}")
+        if self.refresh_s > 0:
+            self._refresher = asyncio.create_task(self._refresh())
+        return self
+
+    async def stop(self):
+        if self._refresher is not None:
+            self._refresher.cancel()
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._clients):
+            writer.transport.abort()
+        self._clients.clear()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def seed(self, tracks: Iterable[dict]):
+        """Add tracks to the picture (e.g. from the DB at startup) without sending them."""
+        for track in tracks:
+            if track.get("entityId"):
+                self._remember(track["entityId"], track)
+
+    def publish(self, track: dict):
+        """Send a track update to every client (rate limited per entity). Thread-safe."""
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._offer(track)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._offer, track)
+
+    def on_event(self, event: events.TrackEvent):
+        """``events`` listener: forwards track events, ignores task/asset events."""
+        if "entityId" in event.data:
+            self.publish(event.data)
+
+    def _remember(self, entity_id: str, track: dict):
+        self._latest[entity_id] = track
+        self._latest.move_to_end(entity_id)
+        while len(self._latest) > self.max_entities:
+            evicted, _ = self._latest.popitem(last=False)
+            self._last_sent.pop(evicted, None)
+
+    def _offer(self, track: dict):
+        entity_id = track.get("entityId")
+        if not entity_id:
+            return
+        self.updates += 1
+        self._remember(entity_id, track)
+        if entity_id in self._deferred:
+            self.rate_limited += 1  # the deferred send will pick up this version
+            return
+        now = self._loop.time()
+        due = self._last_sent.get(entity_id, float("-inf")) + self.min_interval_s
+        if now >= due:
+            self._send_latest(entity_id)
+        else:
+            self.rate_limited += 1
+            self._deferred.add(entity_id)
+            self._loop.call_at(due, self._send_deferred, entity_id)
+
+    def _send_deferred(self, entity_id: str):
+        self._deferred.discard(entity_id)
+        if entity_id in self._latest:
+            self._send_latest(entity_id)
+
+    def _send_latest(self, entity_id: str):
+        self._last_sent[entity_id] = self._loop.time()
+        xml = self.encoder.encode(self._latest[entity_id])
+        if xml is not None:
+            self._broadcast([xml.encode() + b"\n"])
+
+    def _broadcast(self, datagrams: list):
+        """Write the events to every TCP client (as one buffer) and send one datagram each over UDP."""
+        if not datagrams:
+            return
+        data = b"".join(datagrams)
+        for writer in list(self._clients):
+            self._write(writer, data)
+        if self._udp_transport is not None:
+            for datagram in datagrams:
+                self._udp_transport.sendto(datagram, self._udp_target)
+            self.datagrams_sent += len(datagrams)
+        self.events_sent += len(datagrams)
+
+    def _write(self, writer: asyncio.StreamWriter, data: bytes):
+        transport = writer.transport
+        if transport.is_closing():
+            self._clients.discard(writer)
+            return
+        if transport.get_write_buffer_size() > self.max_buffer + self._picture_bytes:
+            # The client is not keeping up; never let one reader hold memory or the loop
+            self.slow_drops += 1
+            self._clients.discard(writer)
+            logger.warning(f"Dropping slow CoT client {writer.get_extra_info('peername')}")
+            transport.abort()
+            return
+        transport.write(data)
+        self.bytes_sent += len(data)
+
+    def _picture(self) -> list:
+        picture = [xml.encode() + b"\n" for xml in self.encoder.encode_many(self._latest.values())]
+        # Healthy clients may still be draining the last snapshot/refresh; only the backlog beyond it counts
+        self._picture_bytes = max(self._picture_bytes, sum(map(len, picture)))
+        return picture
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._handlers.add(asyncio.current_task())
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.send_buffer:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        # Snapshot and registration happen with no await in between, so no update is missed
+        self._write(writer, b"".join(self._picture()))
+        self._clients.add(writer)
+        try:
+            # TAK clients may send their own SA/pings; read and discard until they hang up
+            while await reader.read(READ_BYTES):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_s)
+            self._broadcast(self._picture())
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "connections": self.connections,
+            "slow_drops": self.slow_drops,
+            "entities": len(self._latest),
+            "picture_bytes": self._picture_bytes,
+            "updates": self.updates,
+            "rate_limited": self.rate_limited,
+            "events_sent": self.events_sent,
+            "bytes_sent": self.bytes_sent,
+            "datagrams_sent": self.datagrams_sent,
+        }
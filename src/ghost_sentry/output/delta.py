@@ -0,0 +1,173 @@
+"""
+Delta encoding of track documents for bandwidth-constrained subscribers.
+
+Messages, one JSON object each::
+
+    {"type": "track_full",  "id": ..., "rev": 7, "data": {...whole track...}}
+    {"type": "track_delta", "id": ..., "rev": 8, "base": 7,
+     "set": {"location.position.latitudeDegrees": 33.1, ...}, "unset": ["expiryTime"]}
+
+A client keeps the last document and revision per id and applies a delta
+only when its ``base`` matches; otherwise it ignores the entity until the
+next ``track_full``, which is sent on first sight, every
+``keyframe_every`` revisions and at least every ``keyframe_s`` seconds.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+FULL = "track_full"
+DELTA = "track_delta"
+DEFAULT_KEYFRAME_EVERY = 20
+DEFAULT_KEYFRAME_S = 30.0
+DEFAULT_MAX_ENTITIES = 10_000
+
+
+def diff(old: dict, new: dict, prefix: str = "") -> Tuple[Dict[str, Any], list]:
+    """Dotted paths whose value changed (or appeared) in ``new``, and paths that disappeared."""
+    changed: Dict[str, Any] = {}
+    removed = []
+    for key, value in new.items():
+        path = prefix + key
+        if key not in old:
+            changed[path] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub_changed, sub_removed = diff(old[key], value, path + ".")
+            changed.update(sub_changed)
+            removed.extend(sub_removed)
+        elif old[key] != value:
+            changed[path] = value
+    removed.extend(prefix + key for key in old if key not in new)
+    return changed, removed
+
+
+def patch(doc: dict, changed: Dict[str, Any], removed: list) -> dict:
+    """Apply a ``diff`` to ``doc``; only the dicts along changed paths are copied."""
+    root = dict(doc)
+    copied = {id(root)}
+    for path in list(changed) + list(removed):
+        *parents, leaf = path.split(".")
+        node = root
+        for key in parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = {}
+            if id(child) not in copied:
+                child = dict(child)
+                copied.add(id(child))
+                node[key] = child
+            node = child
+        if path in changed:
+            node[leaf] = changed[path]
+        else:
+            node.pop(leaf, None)
+    return root
+
+
+class DeltaEncoder:
+    """
+    Turns a stream of full track documents into full/delta messages.
+
+    One encoder serves every subscriber, so each update is diffed once.
+    A subscriber that joins late starts from ``keyframes()``. State is kept
+    for the ``max_entities`` most recently updated entities; an evicted
+    entity gets a full document when it is next seen.
+    """
+
+    def __init__(
+        self,
+        keyframe_every: int = DEFAULT_KEYFRAME_EVERY,
+        keyframe_s: float = DEFAULT_KEYFRAME_S,
+        max_entities: int = DEFAULT_MAX_ENTITIES,
+        clock=time.monotonic,
+    ):
+        self.keyframe_every = keyframe_every
+        self.keyframe_s = keyframe_s
+        self.max_entities = max_entities
+        self.clock = clock
+        # id -> (document, revision, time of last keyframe)
+        self._state: "OrderedDict[str, Tuple[dict, int, float]]" = OrderedDict()
+        self.fulls = 0
+        self.deltas = 0
+        self.unchanged = 0
+        self.evictions = 0
+
+    def encode(self, entity_id: str, doc: dict) -> Optional[dict]:
+        """The message for a new version of ``doc``, or None if nothing changed."""
+        now = self.clock()
+        state = self._state.get(entity_id)
+        if state is None:
+            return self._keyframe(entity_id, doc, 1, now)
+        old, rev, keyframed_at = state
+        if rev % self.keyframe_every == 0 or now - keyframed_at >= self.keyframe_s:
+            if old == doc:
+                self.unchanged += 1
+                return None
+            return self._keyframe(entity_id, doc, rev + 1, now)
+        changed, removed = diff(old, doc)
+        if not changed and not removed:
+            self.unchanged += 1
+            return None
+        self._state[entity_id] = (doc, rev + 1, keyframed_at)
+        self._state.move_to_end(entity_id)
+        self.deltas += 1
+        message = {"type": DELTA, "id": entity_id, "rev": rev + 1, "base": rev, "set": changed}
+        if removed:
+            message["unset"] = removed
+        return message
+
+    def keyframes(self):
+        """A full message for every entity at its current revision (for a joining subscriber)."""
+        for entity_id, (doc, rev, _) in self._state.items():
+            yield {"type": FULL, "id": entity_id, "rev": rev, "data": doc}
+
+    def clear(self):
+        """Forget every entity; each gets a full document when next seen."""
+        self._state.clear()
+
+    def _keyframe(self, entity_id: str, doc: dict, rev: int, now: float) -> dict:
+        self._state[entity_id] = (doc, rev, now)
+        self._state.move_to_end(entity_id)
+        while len(self._state) > self.max_entities:
+            self._state.popitem(last=False)
+            self.evictions += 1
+        self.fulls += 1
+        return {"type": FULL, "id": entity_id, "rev": rev, "data": doc}
+
+    def stats(self) -> dict:
+        sent = self.fulls + self.deltas
+        return {
+            "entities": len(self._state),
+            "full": self.fulls,
+            "delta": self.deltas,
+            "unchanged": self.unchanged,
+            "evictions": self.evictions,
+            "delta_fraction": round(self.deltas / sent, 3) if sent else 0.0,
+        }
+
+
+class DeltaDecoder:
+    """Client side: rebuilds full documents from full/delta messages."""
+
+    def __init__(self):
+        self.docs: Dict[str, dict] = {}
+        self.revs: Dict[str, int] = {}
+        self.gaps = 0
+
+    def apply(self, message: dict) -> Optional[dict]:
+        """The updated document, or None if the message could not be applied (await a keyframe)."""
+        entity_id = message["id"]
+        if message["type"] == FULL:
+            self.docs[entity_id] = message["data"]
+            self.revs[entity_id] = message["rev"]
+            return message["data"]
+        if message["type"] != DELTA:
+            return None
+        if self.revs.get(entity_id) != message["base"]:
+            if self.revs.get(entity_id, 0) < message["rev"]:
+                self.gaps += 1
+            return None
+        doc = patch(self.docs[entity_id], message["set"], message.get("unset", []))
+        self.docs[entity_id] = doc
+        self.revs[entity_id] = message["rev"]
+        return doc
@@ -1,7 +1,7 @@
 """Test script for FusionEngine."""
 import json
 from pathlib import Path
-from ghost_sentry.core.detector import Detection
+from ghost_sentry.core.models import Detection
 from ghost_sentry.core.fusion import FusionEngine
 
 def test_fusion():
@@ -10,8 +10,8 @@ def test_fusion():
     
     # Mock SAR detections
     sar_data = [
-        {"label": "tank", "confidence": 0.82, "bbox": [0,0,0,0], "geo_location": [33.95, -118.42], "sensor": "SAR"},
-        {"label": "truck", "confidence": 0.91, "bbox": [0,0,0,0], "geo_location": [33.94, -118.41], "sensor": "SAR"}
+        {"label": "tank", "confidence": 0.82, "bbox": [0,0,0,0], "geo_location": [33.95, -118.42], "sources": ["sar"]},
+        {"label": "truck", "confidence": 0.91, "bbox": [0,0,0,0], "geo_location": [33.94, -118.41], "sources": ["sar"]}
     ]
     sar = [Detection(**d) for d in sar_data]
     
@@ -20,7 +20,7 @@ def test_fusion():
     
     print(f"Fused Detections: {len(fused)}")
     for d in fused:
-        print(f"- {d.label} at {d.geo_location} (Confidence: {d.confidence})")
+        print(f"- {d.label} at {d.geo_location} (Confidence: {d.confidence}, Sources: {d.sources})")
 
 if __name__ == "__main__":
     test_fusion()
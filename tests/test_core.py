@@ -8,6 +8,7 @@ from ghost_sentry.output.cot import to_cursor_on_target
 import tempfile
 import json
 from pathlib import Path
+from unittest.mock import MagicMock
 
 
 class TestDetection:
@@ -66,6 +67,29 @@ class TestTrackBuilder:
         track = TrackBuilder.from_detection(d)
         assert track.milView.environment == "ENVIRONMENT_LAND"
 
+    def test_matches_nested_model_construction(self):
+        """Test that the single-pass build dumps exactly like building each sub-model."""
+        import numpy as np
+        from ghost_sentry.lattice.entities import (
+            LatticeLocation, LatticeMilView, LatticeOntology, LatticeProvenance
+        )
+        d = Detection(label="airplane", confidence=0.92, bbox=(0, 0, 1, 1))
+        d.geo_location = (np.float64(33.94), np.float64(-118.40))  # as set by georeferencing
+        track = TrackBuilder.from_detection(d, entity_id="e1")
+
+        reference = LatticeTrack(
+            entityId="e1",
+            description="Detected airplane",
+            ontology=LatticeOntology(platform_type="Airplane"),
+            location={"position": LatticeLocation(latitudeDegrees=33.94, longitudeDegrees=-118.40).model_dump()},
+            milView=LatticeMilView(disposition="DISPOSITION_UNKNOWN", environment="ENVIRONMENT_AIR"),
+            provenance=LatticeProvenance(sourceUpdateTime=track.provenance.sourceUpdateTime),
+            confidence=0.92,
+            createdTime=track.createdTime,
+        )
+        assert track.model_dump() == reference.model_dump()
+        assert type(track.location["position"]["latitudeDegrees"]) is float
+
 
 class TestSentryLogic:
     """Tests for the autonomous cueing logic."""
@@ -73,11 +97,14 @@ class TestSentryLogic:
     @pytest.fixture(autouse=True)
     def setup_test_db(self, monkeypatch, tmp_path):
         """Setup a test database for each test."""
-        from ghost_sentry.core import db, sentry
+        from ghost_sentry.core import db, sentry, track_state
+        from ghost_sentry.core.correlation import EntityMatcher
         test_db = tmp_path / "test_sentry.db"
         monkeypatch.setattr(db, "DB_PATH", test_db)
-        # Reset the debounce cache for each test
-        sentry._recent_tasks.clear()
+        # Reset the debounce cache and entity state for each test
+        sentry._debounce.clear()
+        monkeypatch.setattr(sentry, "_matcher", EntityMatcher())
+        track_state.clear_cache()
         db.init_db()
         yield
     
@@ -117,6 +144,50 @@ class TestSentryLogic:
         assert stats["tracks"] == 1
         assert stats["tasks"] == 0  # car is not in HIGH_PRIORITY_LABELS
 
+    def test_repeated_sightings_update_one_entity(self):
+        """Test that repeated sightings of one object produce one track and one task."""
+        from ghost_sentry.core import db
+        detections = [
+            Detection(label="airplane", confidence=0.92, bbox=(0,0,100,100), geo_location=(33.94 + i * 1e-5, -118.40))
+            for i in range(5)
+        ]
+
+        connector = LatticeConnector()
+        stats = process_detections(detections, connector)
+
+        assert stats["detections"] == 5
+        assert stats["tracks"] == 1
+        assert stats["tasks"] == 1
+        assert len(db.get_tracks()) == 1
+
+    def test_entity_persists_across_batches(self):
+        """Test that a later sighting updates the same entity and builds history."""
+        from ghost_sentry.core import db, track_state
+
+        connector = LatticeConnector()
+        for i in range(3):
+            process_detections(
+                [Detection(label="truck", confidence=0.70, bbox=(0,0,50,50), geo_location=(34.0, -117.0 + i * 1e-5))],
+                connector
+            )
+
+        tracks = db.get_tracks()
+        assert len(tracks) == 1
+        entity_id = tracks[0]["entityId"]
+        assert len(db.get_track_history(entity_id)) == 3
+        assert len(track_state.get_positions(entity_id)) == 3
+
+    def test_distinct_objects_get_distinct_tracks(self):
+        """Test that far-apart detections are not merged."""
+        detections = [
+            Detection(label="car", confidence=0.8, bbox=(0,0,50,50), geo_location=(33.94, -118.40)),
+            Detection(label="car", confidence=0.8, bbox=(0,0,50,50), geo_location=(33.99, -118.40)),
+        ]
+
+        stats = process_detections(detections, LatticeConnector())
+
+        assert stats["tracks"] == 2
+
 
 class TestCoTGeneration:
     """Tests for CoT XML generation."""
@@ -154,7 +225,7 @@ class TestFusionEngine:
     """Tests for the multi-modal fusion engine."""
     
     def test_fuse_combines_sources(self):
-        """Test that FusionEngine merges Optical and SAR sources."""
+        """Test that FusionEngine keeps separate objects from both sensors, labels untouched."""
         from ghost_sentry.core.fusion import FusionEngine
         engine = FusionEngine()
         optical = [Detection(label="tank", confidence=0.9, bbox=(0,0,0,0), geo_location=(33.94, -118.4))]
@@ -162,8 +233,11 @@ class TestFusionEngine:
         
         fused = engine.fuse(optical, sar)
         assert len(fused) == 2
-        assert "(Optical)" in fused[0].label
-        assert "(SAR)" in fused[1].label
+        assert [d.label for d in fused] == ["tank", "truck"]
+        assert fused[0].sources == ["optical"]
+        assert fused[1].sources == ["sar"]
+        # Inputs are not mutated
+        assert optical[0].label == "tank" and optical[0].sources is None
 
     def test_fuse_filters_low_confidence_optical(self):
         """Test that FusionEngine filters out optical detections below threshold."""
@@ -180,9 +254,85 @@ class TestFusionEngine:
         ]
         
         fused = engine.fuse(optical, sar)
-        # Should have truck (Optical) and boat (SAR). car (Optical) filtered.
+        # Should have truck (optical) and boat (SAR). car (optical) filtered.
         assert len(fused) == 2
         labels = [d.label for d in fused]
-        assert "truck (Optical)" in labels
-        assert "boat (SAR)" in labels
-        assert "car (Optical)" not in labels
+        assert "truck" in labels
+        assert "boat" in labels
+        assert "car" not in labels
+
+    def test_same_object_from_both_sensors_merged(self):
+        """Test that co-located optical and SAR detections become one, more confident detection."""
+        from ghost_sentry.core.fusion import FusionEngine
+        engine = FusionEngine(gate_m=50)
+        # ~20 m apart
+        optical = [Detection(label="truck", confidence=0.6, bbox=(10,10,30,30), geo_location=(33.94, -118.4))]
+        sar = [Detection(label="truck", confidence=0.5, bbox=(0,0,4,4), geo_location=(33.94018, -118.4))]
+
+        fused = engine.fuse(optical, sar)
+
+        assert len(fused) == 1
+        assert fused[0].label == "truck"
+        assert fused[0].confidence == pytest.approx(1 - 0.4 * 0.5)
+        assert fused[0].sources == ["optical", "sar"]
+        assert fused[0].bbox == (10, 10, 30, 30)  # from the more confident member
+        assert 33.94 < fused[0].geo_location[0] < 33.94018
+
+    def test_gate_and_labels_keep_distinct_objects_apart(self):
+        """Test that detections beyond the gate, or of a different class, are not merged."""
+        from ghost_sentry.core.fusion import FusionEngine
+        engine = FusionEngine(gate_m=50)
+        optical = [
+            Detection(label="truck", confidence=0.9, bbox=(0,0,0,0), geo_location=(33.94, -118.4)),
+            Detection(label="boat", confidence=0.9, bbox=(0,0,0,0), geo_location=(33.95, -118.4)),
+        ]
+        sar = [
+            Detection(label="truck", confidence=0.9, bbox=(0,0,0,0), geo_location=(33.9410, -118.4)),  # ~110 m
+            Detection(label="truck", confidence=0.9, bbox=(0,0,0,0), geo_location=(33.95, -118.4)),  # wrong class
+        ]
+
+        assert len(engine.fuse(optical, sar)) == 4
+        assert len(FusionEngine(gate_m=50, match_labels=False).fuse(optical, sar)) == 3
+
+    def test_one_detection_per_sensor_closest_pair_wins(self):
+        """Test that two SAR returns near one optical box do not collapse into a single object."""
+        from ghost_sentry.core.fusion import FusionEngine
+        engine = FusionEngine(gate_m=50)
+        optical = [Detection(label="truck", confidence=0.9, bbox=(0,0,0,0), geo_location=(33.94, -118.4))]
+        sar = [
+            Detection(label="truck", confidence=0.7, bbox=(0,0,0,0), geo_location=(33.94027, -118.4)),  # ~30 m
+            Detection(label="truck", confidence=0.7, bbox=(0,0,0,0), geo_location=(33.94009, -118.4)),  # ~10 m
+        ]
+
+        fused = engine.fuse(optical, sar)
+
+        assert len(fused) == 2
+        merged = [d for d in fused if d.sources == ["optical", "sar"]]
+        assert len(merged) == 1
+        assert merged[0].geo_location[0] < 33.94009
+
+    def test_low_confidence_optical_still_corroborates_sar(self):
+        """Test that a sub-threshold optical detection boosts a matching SAR detection."""
+        from ghost_sentry.core.fusion import FusionEngine
+        engine = FusionEngine(optical_threshold=0.8)
+        optical = [Detection(label="boat", confidence=0.4, bbox=(0,0,0,0), geo_location=(33.7, -118.2))]
+        sar = [Detection(label="boat", confidence=0.7, bbox=(0,0,0,0), geo_location=(33.7, -118.2))]
+
+        [fused] = engine.fuse(optical, sar)
+
+        assert fused.confidence == pytest.approx(1 - 0.6 * 0.3)
+        assert fused.sources == ["optical", "sar"]
+
+    def test_fused_provenance_reaches_entity(self):
+        """Test that every contributing sensor is recorded on the correlated entity."""
+        from ghost_sentry.core.correlation import EntityMatcher
+        from ghost_sentry.core.sentry import process_detections
+        matcher = EntityMatcher()
+        connector = MagicMock()
+        detection = Detection(label="truck", confidence=0.5, bbox=(0,0,0,0), geo_location=(33.94, -118.4),
+                              sources=["optical", "sar"])
+
+        process_detections([detection], connector, matcher=matcher)
+
+        [entity] = matcher.get_active_entities()
+        assert entity.sources == ["optical", "sar"]
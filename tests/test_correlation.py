@@ -128,3 +128,93 @@ class TestEntityMatcher:
         
         assert counts["TENTATIVE"] == 1
         assert counts["FIRM"] == 1
+
+
+class _Clock(datetime):
+    """``datetime`` whose now() runs ``offset`` ahead, to simulate idle time."""
+    offset = timedelta(0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + cls.offset
+
+
+class TestEntityAging:
+
+    def test_idle_entities_are_evicted_by_correlate(self, monkeypatch):
+        import numpy as np
+        from ghost_sentry.core import correlation
+        monkeypatch.setattr(correlation, "datetime", _Clock)
+        monkeypatch.setattr(_Clock, "offset", timedelta(0))
+        matcher = EntityMatcher(sweep_interval_s=0)
+        for i in range(500):
+            matcher.correlate("truck", (30.0 + i * 0.01, -117.0), 0.8, "optical")
+        # Two reports per transmitter: FIRM, so they need two sweeps (FIRM -> STALE -> DROPPED)
+        ids = np.repeat(np.arange(500), 2)
+        matcher.correlate_batch("boat", ids, 20.0 + ids * 0.01, np.full(len(ids), -120.0), "ais")
+        assert sum(matcher.entity_count().values()) == 1000
+
+        monkeypatch.setattr(_Clock, "offset", timedelta(hours=2))
+        matcher.correlate("airplane", (40.0, -100.0), 0.9, "optical")
+        matcher.correlate("airplane", (40.0, -100.0), 0.9, "optical")
+
+        assert sum(matcher.entity_count().values()) == 1
+        assert matcher._by_external == {}
+        assert set(matcher._cell_of) == set(matcher._entities)
+
+    def test_sweep_is_throttled(self, monkeypatch):
+        from ghost_sentry.core import correlation
+        monkeypatch.setattr(correlation, "datetime", _Clock)
+        monkeypatch.setattr(_Clock, "offset", timedelta(0))
+        matcher = EntityMatcher(sweep_interval_s=3600)
+        matcher.correlate("truck", (30.0, -117.0), 0.8, "optical")
+
+        monkeypatch.setattr(_Clock, "offset", timedelta(hours=2))
+        matcher.correlate("truck", (35.0, -117.0), 0.8, "optical")
+
+        assert matcher.entity_count()["DROPPED"] == 1  # aged, but eviction waits for the next sweep
+
+    def test_matches_across_grid_cell_boundary(self):
+        matcher = EntityMatcher()
+        cell = matcher._cell_deg
+        first = matcher.correlate("boat", (cell * 100 - cell * 0.1, 0.0), 0.8, "optical")
+
+        second = matcher.correlate("boat", (cell * 100 + cell * 0.1, 0.0), 0.8, "sar")
+
+        assert second is first
+        assert matcher._cell_of[first.entity_id][1] == 100
+
+
+class TestMatcherThreadSafety:
+
+    def test_correlate_and_batch_from_two_threads(self):
+        """The pipeline's sentry stage and the mesh subscriber share one matcher."""
+        import threading
+        import numpy as np
+        matcher = EntityMatcher(sweep_interval_s=0)  # sweep (iterate every entity) on every call
+        errors = []
+
+        def optical():
+            try:
+                for i in range(3000):
+                    matcher.correlate("boat", (30.0 + (i % 1500) * 0.01, -118.0), 0.8, "optical")
+            except Exception as e:
+                errors.append(e)
+
+        def mesh():
+            try:
+                for i in range(300):
+                    ids = np.arange(i * 10, i * 10 + 10)
+                    matcher.correlate_batch("boat", ids, 30.0 + ids * 0.01, np.full(10, -118.0), "lattice")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=optical), threading.Thread(target=mesh)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert set(matcher._cell_of) == set(matcher._entities)
+        assert all(e.entity_id in matcher._entities for e in matcher._by_external.values())
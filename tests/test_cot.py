@@ -0,0 +1,96 @@
+"""Tests for the track CoT encoder."""
+import uuid
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.output.cot import UID_NAMESPACE, CotEncoder, entity_uid
+
+NOW = datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc)
+
+
+def _track(entity_id="t1", label="airplane", lat=33.94, confidence=0.92):
+    detection = Detection(label=label, confidence=confidence, bbox=(0, 0, 1, 1), geo_location=(lat, -118.4))
+    return TrackBuilder.from_detection(detection, entity_id=entity_id).model_dump()
+
+
+def _event(xml):
+    return ElementTree.fromstring(xml.encode())
+
+
+class TestCotEncoder:
+
+    def test_renders_track(self):
+        event = _event(CotEncoder().encode(_track(), now=NOW))
+
+        assert event.get("uid") == str(uuid.uuid5(UID_NAMESPACE, "t1"))
+        assert event.get("type") == "a-f-A"
+        assert (event.get("time"), event.get("start"), event.get("stale")) == (
+            "2024-01-15T10:30:00Z", "2024-01-15T10:30:00Z", "2024-01-15T10:35:00Z"
+        )
+        assert (event.find("point").get("lat"), event.find("point").get("lon")) == ("33.94", "-118.4")
+        assert event.find("detail/contact").get("callsign") == "GS-AIR"
+        assert event.find("detail/remarks").text == "Detected airplane (conf: 0.92)"
+
+    def test_uid_is_stable_per_entity(self):
+        encoder = CotEncoder()
+
+        first = _event(encoder.encode(_track("t1")))
+        again = _event(CotEncoder().encode(_track("t1", lat=34.0)))
+        other = _event(encoder.encode(_track("t2")))
+
+        assert first.get("uid") == again.get("uid") == entity_uid("t1")
+        assert other.get("uid") != first.get("uid")
+
+    def test_cached_per_revision(self):
+        encoder = CotEncoder()
+        track = _track()
+        moved = _track(lat=34.0)
+
+        encoder.encode(track)
+        encoder.encode(track)
+        assert 'lat="34.0"' in encoder.encode(moved)
+
+        assert encoder.stats()["hits"] == 1
+        assert encoder.stats()["misses"] == 2
+
+    def test_batch_shares_timestamps_and_skips_bad_tracks(self):
+        tracks = [_track("a"), {"entityId": "broken"}, _track("b", label="boat")]
+
+        xmls = CotEncoder().encode_many(tracks, now=NOW)
+
+        assert [_event(x).get("type") for x in xmls] == ["a-f-A", "a-u-S"]
+        assert {_event(x).get("time") for x in xmls} == {"2024-01-15T10:30:00Z"}
+
+    def test_null_provenance(self):
+        track = _track()
+        track["provenance"] = None
+
+        xmls = CotEncoder().encode_many([track], now=NOW)
+
+        assert [_event(x).get("uid") for x in xmls] == [entity_uid("t1")]
+
+    def test_escapes_mesh_supplied_text(self):
+        track = _track()
+        track["ontology"]["platform_type"] = 'Boat<"&>'
+
+        event = _event(CotEncoder().encode(track))
+
+        assert event.find("detail/remarks").text.startswith('Detected boat<"&>')
+
+
+class TestCotEndpoints:
+
+    def test_refresh_keeps_uids(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)  # importing the API initialises ./ghost_sentry.db
+        from ghost_sentry import api
+        from ghost_sentry.core import db
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "ghost_sentry.db")
+        db.init_db()
+        db.add_event("track", _track("t1"), entity_id="t1")
+
+        first = api.get_tracks_cot().body.decode()
+        second = api.get_tracks_cot().body.decode()
+
+        assert _event(first).get("uid") == _event(second).get("uid") == entity_uid("t1")
@@ -0,0 +1,161 @@
+"""Tests for the TAK CoT streaming server."""
+import asyncio
+import socket
+import threading
+
+from ghost_sentry.core import events
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.output.cot import entity_uid
+from ghost_sentry.output.cot_server import CotServer
+
+
+def _track(entity_id="t1", lat=33.0):
+    detection = Detection(label="boat", confidence=0.8, bbox=(0, 0, 1, 1), geo_location=(lat, -118.0))
+    return TrackBuilder.from_detection(detection, entity_id=entity_id).model_dump()
+
+
+async def _read_events(reader, count, timeout=5.0):
+    data = b""
+    async def read():
+        nonlocal data
+        while data.count(b"</event>") < count:
+            chunk = await reader.read(1 << 16)
+            if not chunk:
+                break
+            data += chunk
+    await asyncio.wait_for(read(), timeout)
+    return data.decode()
+
+
+def _server(**kwargs):
+    return CotServer(host="127.0.0.1", port=0, refresh_s=0, **kwargs)
+
+
+class TestCotServer:
+
+    def test_snapshot_then_live_updates(self):
+        async def run():
+            async with _server(min_interval_s=0) as server:
+                server.seed([_track("stored")])
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                snapshot = await _read_events(reader, 1)
+                server.publish(_track("live", lat=34.0))
+                live = await _read_events(reader, 1)
+                writer.close()
+                return snapshot, live, server.stats()
+
+        snapshot, live, stats = asyncio.run(run())
+
+        assert f'uid="{entity_uid("stored")}"' in snapshot
+        assert f'uid="{entity_uid("live")}"' in live and 'lat="34.0"' in live
+        assert stats["connections"] == 1 and stats["events_sent"] == 1
+
+    def test_rate_limit_coalesces_to_latest(self):
+        async def run():
+            async with _server(min_interval_s=0.2) as server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                await asyncio.sleep(0.05)
+                for i in range(5):
+                    server.publish(_track(lat=33.0 + i))
+                data = await _read_events(reader, 2)
+                await asyncio.sleep(0.3)
+                writer.close()
+                return data, server.stats()
+
+        data, stats = asyncio.run(run())
+
+        assert data.count("</event>") == 2
+        assert 'lat="33.0"' in data and 'lat="37.0"' in data
+        assert stats["rate_limited"] == 4 and stats["events_sent"] == 2
+
+    def test_slow_client_is_dropped(self):
+        async def run():
+            async with _server(min_interval_s=0, max_buffer=64 * 1024, send_buffer=16 * 1024) as server:
+                slow = socket.socket()
+                slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+                slow.connect(("127.0.0.1", server.port))
+                fast_reader, fast_writer = await asyncio.open_connection("127.0.0.1", server.port)
+                await asyncio.sleep(0.05)
+                updates = 5000
+
+                async def produce():
+                    for i in range(updates):
+                        server.publish(_track(f"e{i}"))
+                        if i % 50 == 0:
+                            await asyncio.sleep(0)
+
+                _, received = await asyncio.gather(produce(), _read_events(fast_reader, updates, timeout=30))
+                stats = server.stats()
+                fast_writer.close()
+                slow.close()
+                return received.count("</event>"), stats
+
+        received, stats = asyncio.run(run())
+
+        assert received == 5000
+        assert stats["slow_drops"] == 1
+        assert stats["clients"] == 1
+
+    def test_picture_larger_than_max_buffer_keeps_reading_client(self):
+        async def run():
+            async with _server(min_interval_s=0, max_buffer=16 * 1024, send_buffer=16 * 1024) as server:
+                server.seed([_track(f"s{i}") for i in range(2000)])
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                await asyncio.sleep(0.05)  # snapshot queued, mostly unsent
+                server.publish(_track("live"))
+                snapshot = await _read_events(reader, 2001)
+                server._broadcast(server._picture())  # a refresh, as _refresh sends it
+                server.publish(_track("live", lat=34.0))
+                refresh = await _read_events(reader, 2002)
+                writer.close()
+                return snapshot, refresh, server.stats()
+
+        snapshot, refresh, stats = asyncio.run(run())
+
+        assert stats["picture_bytes"] > 16 * 1024 * 10
+        assert snapshot.count("</event>") == 2001
+        assert refresh.count("</event>") == 2002 and 'lat="34.0"' in refresh
+        assert stats["slow_drops"] == 0 and stats["clients"] == 1
+
+    def test_udp_datagram_per_event(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(5)
+        target = "127.0.0.1:%d" % receiver.getsockname()[1]
+
+        async def run():
+            async with CotServer(port=None, udp=target, refresh_s=0) as server:
+                server.publish(_track("a"))
+                server.publish(_track("b"))
+                await asyncio.sleep(0.05)
+                return server.stats()
+
+        stats = asyncio.run(run())
+        datagrams = [receiver.recv(65536).decode() for _ in range(2)]
+        receiver.close()
+
+        assert stats["datagrams_sent"] == 2
+        assert [d.count("</event>") for d in datagrams] == [1, 1]
+        assert f'uid="{entity_uid("b")}"' in datagrams[1]
+
+    def test_events_from_worker_thread(self):
+        async def run():
+            async with _server(min_interval_s=0) as server:
+                reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+                await asyncio.sleep(0.05)
+                track = _track("threaded")
+                worker = threading.Thread(target=lambda: [
+                    server.on_event(events.TrackEvent(entity_id="x", data={"type": "task"})),
+                    server.on_event(events.TrackEvent(entity_id="threaded", data=track)),
+                ])
+                worker.start()
+                data = await _read_events(reader, 1)
+                worker.join()
+                writer.close()
+                return data, server.stats()
+
+        data, stats = asyncio.run(run())
+
+        assert f'uid="{entity_uid("threaded")}"' in data
+        assert stats["updates"] == 1
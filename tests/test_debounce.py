@@ -0,0 +1,98 @@
+"""Tests for the cueing debounce cache."""
+from datetime import timedelta
+
+import pytest
+
+from ghost_sentry.core import db
+from ghost_sentry.core.debounce import DebounceCache
+
+
+class FakeClock:
+
+    def __init__(self, start: float = 1_000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDebounceCache:
+
+    def test_repeat_within_window_is_suppressed(self):
+        cache = DebounceCache(timedelta(seconds=60), clock=FakeClock())
+
+        assert cache.should_fire("entity-1") is True
+        assert cache.should_fire("entity-1") is False
+        assert cache.should_fire("entity-2") is True
+
+    def test_fires_again_after_window(self):
+        clock = FakeClock()
+        cache = DebounceCache(timedelta(seconds=60), clock=clock)
+
+        cache.should_fire("entity-1")
+        clock.now += 61
+
+        assert cache.should_fire("entity-1") is True
+
+    def test_expired_entries_are_evicted(self):
+        clock = FakeClock()
+        cache = DebounceCache(timedelta(seconds=60), clock=clock)
+        for i in range(5):
+            cache.should_fire(f"entity-{i}")
+
+        clock.now += 61
+        cache.should_fire("fresh")
+
+        assert len(cache) == 1
+        assert cache.stats()["expirations"] == 5
+
+    def test_size_cap_evicts_oldest(self):
+        cache = DebounceCache(timedelta(seconds=60), max_size=3, clock=FakeClock())
+        for i in range(5):
+            cache.should_fire(f"entity-{i}")
+
+        assert len(cache) == 3
+        assert "entity-0" not in cache
+        assert "entity-4" in cache
+        assert cache.stats()["evictions"] == 2
+
+    def test_hit_miss_metrics(self):
+        cache = DebounceCache(timedelta(seconds=60), clock=FakeClock())
+        cache.should_fire("a")
+        cache.should_fire("a")
+        cache.should_fire("a")
+        cache.should_fire("b")
+
+        stats = cache.stats()
+
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5
+
+
+class TestSharedDebounce:
+
+    @pytest.fixture(autouse=True)
+    def setup_test_db(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_debounce.db")
+        db.init_db()
+        yield
+
+    def test_workers_share_debounce(self):
+        clock = FakeClock()
+        worker_a = DebounceCache(timedelta(seconds=60), shared=True, clock=clock)
+        worker_b = DebounceCache(timedelta(seconds=60), shared=True, clock=clock)
+
+        assert worker_a.should_fire("entity-1") is True
+        assert worker_b.should_fire("entity-1") is False
+
+        clock.now += 61
+        assert worker_b.should_fire("entity-1") is True
+        assert worker_a.should_fire("entity-1") is False
+
+    def test_purge_removes_expired_claims(self):
+        assert db.claim_debounce("old", 10, now=100.0) is True
+        assert db.claim_debounce("new", 10, now=200.0) is True
+
+        assert db.purge_debounce(now=150.0) == 1
+        assert db.claim_debounce("new", 10, now=205.0) is False
@@ -0,0 +1,141 @@
+"""Tests for delta-encoded track updates."""
+import asyncio
+import json
+
+import pytest
+
+from ghost_sentry.core import db, events, serialization
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.output.delta import DELTA, FULL, DeltaDecoder, DeltaEncoder, diff, patch
+
+
+@pytest.fixture(autouse=True)
+def scratch_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "ghost_sentry.db")
+    monkeypatch.setattr(events, "_listeners", [])
+
+
+def _track(entity_id="t1", lat=33.0):
+    detection = Detection(label="tank", confidence=0.75, bbox=(0, 0, 1, 1), geo_location=(lat, -118.0))
+    return TrackBuilder.from_detection(detection, entity_id=entity_id).model_dump()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestDiff:
+
+    def test_round_trip(self):
+        old = {"a": 1, "b": {"c": 2, "d": 3}, "e": [1, 2], "gone": True}
+        new = {"a": 1, "b": {"c": 5, "d": 3, "f": None}, "e": [1, 2, 3]}
+
+        changed, removed = diff(old, new)
+
+        assert changed == {"b.c": 5, "b.f": None, "e": [1, 2, 3]}
+        assert removed == ["gone"]
+        assert patch(old, changed, removed) == new
+        assert old["b"]["c"] == 2  # patch works on a copy
+
+
+class TestDeltaEncoder:
+
+    def test_full_then_delta_with_only_changed_fields(self):
+        encoder = DeltaEncoder()
+        first = _track(lat=33.0)
+        second = {**first, "location": {"position": {**first["location"]["position"], "latitudeDegrees": 33.1}}}
+
+        full = encoder.encode("t1", first)
+        delta = encoder.encode("t1", second)
+
+        assert full == {"type": FULL, "id": "t1", "rev": 1, "data": first}
+        assert delta == {
+            "type": DELTA, "id": "t1", "rev": 2, "base": 1,
+            "set": {"location.position.latitudeDegrees": 33.1},
+        }
+        assert encoder.encode("t1", second) is None
+
+    def test_keyframe_every_n_revisions_and_seconds(self):
+        clock = FakeClock()
+        encoder = DeltaEncoder(keyframe_every=3, keyframe_s=10.0, clock=clock)
+
+        types = [encoder.encode("t1", {"n": n})["type"] for n in range(7)]
+        assert types == [FULL, DELTA, DELTA, FULL, DELTA, DELTA, FULL]
+
+        encoder.encode("t1", {"n": 7})
+        clock.now = 10.0
+        assert encoder.encode("t1", {"n": 8})["type"] == FULL
+
+    def test_evicts_least_recently_updated(self):
+        encoder = DeltaEncoder(max_entities=2)
+        for n, entity_id in enumerate("abac"):
+            encoder.encode(entity_id, {"id": entity_id, "n": n})
+
+        assert [m["id"] for m in encoder.keyframes()] == ["a", "c"]
+        assert encoder.encode("b", {"id": "b", "x": 1})["type"] == FULL
+        assert encoder.stats()["evictions"] == 2
+
+
+class TestDeltaDecoder:
+
+    def test_rebuilds_every_version(self):
+        encoder, decoder = DeltaEncoder(keyframe_every=4), DeltaDecoder()
+        versions = [_track(lat=33.0 + i * 0.01) for i in range(10)]
+        versions[5].pop("expiryTime")
+
+        for version in versions:
+            message = json.loads(serialization.dumps(encoder.encode("t1", version)))
+            assert decoder.apply(message) == json.loads(serialization.dumps(version))
+
+    def test_gap_waits_for_keyframe(self):
+        encoder, decoder = DeltaEncoder(keyframe_every=3), DeltaDecoder()
+        messages = [encoder.encode("t1", {"n": n}) for n in range(4)]
+
+        decoder.apply(messages[0])
+        assert decoder.apply(messages[2]) is None  # missed rev 2
+        assert decoder.gaps == 1
+        assert decoder.apply(messages[3]) == {"n": 3}
+
+
+class TestDeltaWebSocket:
+
+    def test_broadcast_shares_one_delta_frame(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)  # importing the API initialises ./ghost_sentry.db
+        from ghost_sentry import api
+        queues = [asyncio.Queue(), asyncio.Queue()]
+        monkeypatch.setattr(api, "_delta_subscribers", queues)
+        monkeypatch.setattr(api, "_delta_encoder", DeltaEncoder())
+        first = _track()
+        second = {**first, "confidence": 0.9}
+
+        async def broadcast():
+            for data in (first, second, second):
+                await api.broadcast_track(events.TrackEvent(entity_id="t1", data=data))
+            await api.broadcast_track(events.TrackEvent(entity_id="t1", data={"type": "task_update"}))
+
+        asyncio.run(broadcast())
+
+        frames = [[q.get_nowait() for _ in range(q.qsize())] for q in queues]
+        assert all(a is b for a, b in zip(*frames))
+        full, delta, task = (json.loads(text) for text in frames[0])
+        assert full["type"] == FULL
+        assert delta == {"type": DELTA, "id": "t1", "rev": 2, "base": 1, "set": {"confidence": 0.9}}
+        assert task == {"type": "task_update"}
+
+    def test_delta_client_over_websocket(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)
+        from fastapi.testclient import TestClient
+        from ghost_sentry import api
+        monkeypatch.setattr(api, "_delta_encoder", DeltaEncoder())
+        stored = _track("stored")
+        db.init_db()
+        db.add_event("track", stored, entity_id="stored")
+
+        with TestClient(api.app).websocket_connect("/ws/tracks?encoding=delta") as ws:
+            assert ws.receive_json() == {"type": FULL, "id": "stored", "rev": 1, "data": stored}
+            assert api.get_metrics()["delta"]["clients"] == 1
@@ -0,0 +1,168 @@
+"""Tests for the content-addressed detection cache."""
+import os
+
+import numpy as np
+import pytest
+
+from ghost_sentry.core.detection_cache import (
+    CachedDetector,
+    DetectionCache,
+    content_hash,
+    decode,
+    encode,
+)
+from ghost_sentry.core.models import Detection
+
+IDENTITY = {"model": "abc123", "backend": "ultralytics", "conf": 0.25, "classes": [2, 4]}
+
+
+class CountingDetector:
+    """Returns one 'truck' per image and records every source it runs inference on."""
+
+    def __init__(self, identity=IDENTITY):
+        self._identity = identity
+        self.seen = []
+
+    def identity(self):
+        return dict(self._identity)
+
+    def detect(self, source):
+        return self.detect_batch([source])[0]
+
+    def detect_batch(self, sources, batch_size=8):
+        self.seen.extend(sources)
+        return [[Detection(label="truck", confidence=0.8, bbox=(1, 2, 3, 4))] for _ in sources]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DetectionCache(str(tmp_path / "cache"))
+
+
+def _image(path, fill):
+    path.write_bytes(bytes([fill]) * 1024)
+    return str(path)
+
+
+class TestEncoding:
+
+    def test_round_trip(self):
+        detections = [
+            Detection(label="truck", confidence=0.91, bbox=(10, 20, 30, 40)),
+            Detection(label="boat", confidence=0.5, bbox=(0, 0, 5, 5)),
+        ]
+
+        assert decode(encode(detections)) == detections
+        assert decode(encode([])) == []
+
+    def test_content_hash_ignores_path(self, tmp_path):
+        a = _image(tmp_path / "a.jpg", 7)
+        b = _image(tmp_path / "b.jpg", 7)
+        c = _image(tmp_path / "c.jpg", 8)
+
+        assert content_hash(a) == content_hash(b) != content_hash(c)
+
+    def test_content_hash_of_arrays_includes_shape(self):
+        pixels = np.zeros((4, 4, 3), dtype=np.uint8)
+
+        assert content_hash(pixels) == content_hash(pixels.copy())
+        assert content_hash(pixels) != content_hash(pixels.reshape(2, 8, 3))
+
+
+class TestDetectionCache:
+
+    def test_hit_and_miss_counters(self, cache):
+        key = cache.key("img", IDENTITY)
+
+        assert cache.get(key) is None
+        cache.put(key, [Detection(label="car", confidence=0.7, bbox=(1, 1, 2, 2))])
+
+        assert cache.get(key)[0].label == "car"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_identity_is_part_of_key(self, cache):
+        assert cache.key("img", IDENTITY) != cache.key("img", {**IDENTITY, "conf": 0.5})
+        assert cache.key("img", IDENTITY) == cache.key("img", dict(reversed(list(IDENTITY.items()))))
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        entry_size = len(encode([Detection(label="car", confidence=0.7, bbox=(1, 1, 2, 2))]))
+        cache = DetectionCache(str(tmp_path), max_bytes=2 * entry_size)
+        detections = [Detection(label="car", confidence=0.7, bbox=(1, 1, 2, 2))]
+
+        cache.put("a", detections)
+        cache.put("b", detections)
+        cache.get("a")  # a is now more recent than b
+        cache.put("c", detections)
+
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 2 * entry_size
+
+    def test_reopened_cache_keeps_entries_and_recency(self, tmp_path):
+        detections = [Detection(label="car", confidence=0.7, bbox=(1, 1, 2, 2))]
+        first = DetectionCache(str(tmp_path))
+        first.put("old", detections)
+        first.put("new", detections)
+        os.utime(tmp_path / "old.json", ns=(1, 1))
+
+        reopened = DetectionCache(str(tmp_path), max_bytes=first.stats()["bytes"] - 1)
+
+        assert len(reopened) == 1
+        assert "new" in reopened
+
+
+class TestCachedDetector:
+
+    def test_repeated_scene_skips_inference(self, cache, tmp_path):
+        inner = CountingDetector()
+        detector = CachedDetector(inner, cache)
+        scene = _image(tmp_path / "scene.jpg", 1)
+        replay = _image(tmp_path / "replay.jpg", 1)  # same bytes, different name
+
+        first = detector.detect(scene)
+        second = detector.detect(replay)
+
+        assert first == second
+        assert inner.seen == [scene]
+
+    def test_batch_only_runs_misses(self, cache, tmp_path):
+        inner = CountingDetector()
+        detector = CachedDetector(inner, cache)
+        scenes = [_image(tmp_path / f"{i}.jpg", i) for i in range(4)]
+        detector.detect(scenes[1])
+
+        results = detector.detect_batch(scenes)
+
+        assert len(results) == 4 and all(len(r) == 1 for r in results)
+        assert inner.seen == [scenes[1], scenes[0], scenes[2], scenes[3]]
+
+    def test_model_change_misses(self, cache, tmp_path):
+        scene = _image(tmp_path / "scene.jpg", 1)
+        CachedDetector(CountingDetector(), cache).detect(scene)
+        retrained = CountingDetector({**IDENTITY, "model": "def456"})
+
+        CachedDetector(retrained, cache).detect(scene)
+
+        assert retrained.seen == [scene]
+
+    def test_batch_over_tiled_detector(self, cache, tmp_path):
+        rasterio = pytest.importorskip("rasterio")
+        from ghost_sentry.core.tiling import TiledDetector
+
+        scenes = []
+        for i, fill in enumerate([10, 20, 10]):
+            path = tmp_path / f"scene{i}.tif"
+            with rasterio.open(path, "w", driver="GTiff", width=128, height=128, count=3, dtype="uint8") as dst:
+                dst.write(np.full((3, 128, 128), fill, dtype=np.uint8))
+            scenes.append(str(path))
+        inner = CountingDetector()
+        detector = CachedDetector(TiledDetector(inner, tile_size=64, overlap=0), cache)
+
+        results = detector.detect_batch(scenes[:2])
+        replayed = detector.detect_batch(scenes[2:])
+
+        assert len(results) == 2 and replayed == results[:1]
+        assert len(inner.seen) == 8  # 4 tiles per new scene; the replay is served from the cache
@@ -0,0 +1,86 @@
+"""Tests for the YOLO detector wrapper (model is faked)."""
+import numpy as np
+import pytest
+
+from ghost_sentry.core import detector as detector_module
+from ghost_sentry.core.detector import ObjectDetector
+
+COCO_SUBSET = {0: "person", 1: "car", 2: "airplane", 3: "bus", 4: "truck", 5: "boat"}
+
+
+class FakeBoxes:
+
+    def __init__(self, rows):
+        rows = np.asarray(rows, dtype=float).reshape(-1, 6)
+        self.xyxy = rows[:, :4]
+        self.conf = rows[:, 4]
+        self.cls = rows[:, 5]
+
+    def __len__(self):
+        return len(self.cls)
+
+
+class FakeResult:
+
+    def __init__(self, rows):
+        self.boxes = FakeBoxes(rows)
+
+
+class FakeYOLO:
+
+    def __init__(self, model_path):
+        self.names = COCO_SUBSET
+        self.calls = []
+
+    def predict(self, sources, classes=None, conf=None, batch=None, verbose=True):
+        self.calls.append({"sources": list(sources), "classes": classes, "batch": batch})
+        return [
+            FakeResult([
+                [10.7, 20.2, 30.9, 40.5, 0.9, 2],   # airplane
+                [1, 2, 3, 4, 0.8, 0],               # person (not tactical)
+                [50, 60, 70, 80, 0.6, 4],           # truck
+            ])
+            for _ in sources
+        ]
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    monkeypatch.setattr(detector_module, "_yolo_class", lambda: FakeYOLO)
+    return ObjectDetector()
+
+
+def test_tactical_class_ids_precomputed(detector):
+    assert detector._tactical_ids.tolist() == [1, 2, 3, 4, 5]
+
+
+def test_detect_extracts_tactical_boxes(detector):
+    detections = detector.detect("scene.jpg")
+
+    assert [d.label for d in detections] == ["airplane", "truck"]
+    assert detections[0].bbox == (10, 20, 30, 40)
+    assert detections[0].confidence == pytest.approx(0.9)
+    assert detections[0].geo_location is None
+    assert detector.model.calls[0]["classes"] == [1, 2, 3, 4, 5]
+
+
+def test_detect_batch_chunks_sources(detector):
+    sources = [f"scene_{i}.jpg" for i in range(5)] + [np.zeros((64, 64, 3), dtype=np.uint8)]
+
+    results = detector.detect_batch(sources, batch_size=4)
+
+    assert len(results) == 6
+    assert all(len(r) == 2 for r in results)
+    assert [len(c["sources"]) for c in detector.model.calls] == [4, 2]
+    assert [c["batch"] for c in detector.model.calls] == [4, 2]
+
+
+def test_empty_result_yields_no_detections(detector, monkeypatch):
+    monkeypatch.setattr(detector.model, "predict", lambda sources, **kwargs: [FakeResult([]) for _ in sources])
+
+    assert detector.detect_batch(["a.jpg", "b.jpg"]) == [[], []]
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError, match="Unknown detector backend"):
+        ObjectDetector(backend="tensorrt")
@@ -0,0 +1,170 @@
+"""Tests for the AIS / ADS-B feed decoders and bulk correlation."""
+import asyncio
+import socket
+
+import numpy as np
+import pytest
+
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.feeds.adsb import SbsDecoder
+from ghost_sentry.feeds.ais import AisDecoder, encode_position_report
+from ghost_sentry.feeds.sources import FeedIngestor, iter_file_chunks, iter_tcp_chunks, iter_udp_chunks
+
+# Widely used reference sentence: MMSI 477553000, 47.58283 N 122.34583 W, COG 51
+REFERENCE = b"!AIVDM,1,1,,B,177KQJ5000G?tO`K>RA1wUbN0TKH,0*5C"
+
+SBS = b"""MSG,3,1,1,A1B2C3,1,2026/10/18,12:00:01.250,2026/10/18,12:00:01.300,,35000,,,33.9425,-118.4081,,,0,0,0,0
+MSG,4,1,1,A1B2C3,1,2026/10/18,12:00:01.250,2026/10/18,12:00:01.300,,,450,270,,,0,,,,,0
+MSG,1,1,1,A1B2C3,1,2026/10/18,12:00:01.250,2026/10/18,12:00:01.300,UAL123,,,,,,,,,,,0
+MSG,2,1,1,4ca2d6,1,2026/10/18,12:00:02.000,2026/10/18,12:00:02.000,,0,12,90,33.94,-118.40,,,,,,-1
+"""
+
+
+def _ais_lines(reports):
+    return "".join(encode_position_report(*r) + "\r\n" for r in reports).encode()
+
+
+class TestAisDecoder:
+
+    def test_reference_sentence(self):
+        batch = AisDecoder().decode(REFERENCE + b"\n")
+
+        assert batch.ids.tolist() == [477553000]
+        assert batch.lat[0] == pytest.approx(47.582833, abs=1e-6)
+        assert batch.lon[0] == pytest.approx(-122.345833, abs=1e-6)
+        assert batch.course_deg[0] == pytest.approx(51.0)
+        assert batch.speed_kn[0] == 0
+
+    def test_class_a_and_b_round_trip(self):
+        chunk = (
+            encode_position_report(366123456, 33.7412, -118.2651, sog=12.3, cog=271.5) + "\n"
+            + encode_position_report(244000111, -12.5, 4.25, sog=3, msg_type=18, channel="B") + "\n"
+        ).encode()
+
+        batch = AisDecoder().decode(chunk)
+
+        assert batch.ids.tolist() == [366123456, 244000111]
+        assert batch.lat.tolist() == pytest.approx([33.7412, -12.5], abs=1e-6)
+        assert batch.lon.tolist() == pytest.approx([-118.2651, 4.25], abs=1e-6)
+        assert batch.speed_kn.tolist() == pytest.approx([12.3, 3.0], abs=1e-4)
+        assert batch.source == "ais" and batch.entity_type == "boat"
+
+    def test_bad_checksum_and_unavailable_position_rejected(self):
+        good = encode_position_report(1, 10.0, 20.0)
+        corrupt = good[:-2] + ("00" if not good.endswith("00") else "01")
+        unavailable = encode_position_report(2, 91.0, 181.0)
+        decoder = AisDecoder()
+
+        batch = decoder.decode(f"{good}\n{corrupt}\n{unavailable}\n".encode())
+
+        assert batch.ids.tolist() == [1]
+        assert decoder.rejected == 2
+
+    def test_multipart_and_other_sentences_ignored(self):
+        chunk = b"\n".join([
+            b"!AIVDM,2,1,3,B,55P5TL01VIaAL@7WKO@mBplU@<PDhh000000001S;AJ::4A80?4i@E53,0*3E",
+            b"$GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,*47",
+            REFERENCE,
+        ])
+
+        assert AisDecoder().decode(chunk).ids.tolist() == [477553000]
+
+
+class TestSbsDecoder:
+
+    def test_positions_decoded_column_wise(self):
+        decoder = SbsDecoder()
+
+        batch = decoder.decode(SBS)
+
+        assert batch.ids.tolist() == [b"A1B2C3", b"4CA2D6"]
+        assert batch.lat.tolist() == [33.9425, 33.94]
+        assert batch.altitude_ft.tolist() == [35000.0, 0.0]
+        assert np.isnan(batch.speed_kn[0]) and batch.speed_kn[1] == 12
+        assert batch.time[1] - batch.time[0] == pytest.approx(0.75)
+        assert batch.entity_type == "airplane"
+
+
+class TestBulkCorrelation:
+
+    def test_one_entity_per_transmitter_latest_position_wins(self):
+        matcher = EntityMatcher()
+
+        touched = matcher.correlate_batch(
+            "boat", np.array([7, 8, 7, 7]), np.array([1.0, 5.0, 1.1, 1.2]), np.array([2.0, 6.0, 2.0, 2.0]), "ais"
+        )
+
+        assert len(touched) == 2
+        [seven] = [e for e in touched if e.external_id == "ais:7"]
+        assert seven.location == (1.2, 2.0)
+        assert seven.observation_count == 3
+        assert seven.state.value == "FIRM"
+
+        again = matcher.correlate_batch("boat", np.array([7]), np.array([1.3]), np.array([2.0]), "ais")
+        assert again[0] is seven
+        assert len(matcher.get_active_entities()) == 2
+
+    def test_transmitter_claims_nearby_imagery_entity(self):
+        matcher = EntityMatcher()
+        seen = matcher.correlate("boat", (33.7400, -118.2600), 0.7, "optical")
+
+        [entity] = matcher.correlate_batch(
+            "boat", np.array([366123456]), np.array([33.7402]), np.array([-118.2601]), "ais"
+        )
+
+        assert entity is seen
+        assert entity.sources == ["optical", "ais"]
+        assert entity.external_id == "ais:366123456"
+
+
+class TestFeedSources:
+
+    def test_file_chunks_split_on_line_boundaries(self, tmp_path):
+        path = tmp_path / "feed.nmea"
+        path.write_bytes(_ais_lines([(i, 30 + i * 1e-3, -118.0) for i in range(1, 201)]))
+        ingestor = FeedIngestor(AisDecoder(), EntityMatcher())
+
+        stats = ingestor.ingest_all(iter_file_chunks(str(path), chunk_bytes=1000))
+
+        assert stats["messages"] == 200
+        assert stats["rejected"] == 0
+        assert stats["chunks"] >= 9  # 1000-byte reads cut sentences in half
+        assert len(ingestor.matcher.get_active_entities()) == 200
+
+    def test_tcp_feed(self):
+        async def scenario():
+            async def serve(reader, writer):
+                writer.write(SBS * 3)
+                await writer.drain()
+                writer.close()
+
+            server = await asyncio.start_server(serve, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                ingestor = FeedIngestor(SbsDecoder(), EntityMatcher())
+                return await ingestor.run(iter_tcp_chunks("127.0.0.1", port))
+
+        stats = asyncio.run(scenario())
+
+        assert stats["messages"] == 6
+        assert stats["entities_touched"] >= 2
+
+    def test_udp_feed(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        async def scenario():
+            chunks = iter_udp_chunks("127.0.0.1", port, batch_s=0.05)
+            first = asyncio.ensure_future(chunks.__anext__())
+            await asyncio.sleep(0.05)  # listener bound
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+                for mmsi in (11, 12, 13):
+                    sender.sendto(encode_position_report(mmsi, 1.0, 2.0).encode(), ("127.0.0.1", port))
+            chunk = await asyncio.wait_for(first, timeout=2)
+            await chunks.aclose()
+            return chunk
+
+        batch = AisDecoder().decode(asyncio.run(scenario()))
+
+        assert sorted(batch.ids.tolist()) == [11, 12, 13]
@@ -0,0 +1,100 @@
+"""Tests for pixel -> lat/lon georeferencing."""
+import os
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin, xy
+from rasterio.warp import transform as warp
+
+from ghost_sentry.core import geo
+from ghost_sentry.core.geo import GeoReferencer
+from ghost_sentry.core.models import Detection
+
+
+def _write_raster(path, crs, transform, size=100):
+    with rasterio.open(
+        path, "w", driver="GTiff", width=size, height=size, count=1, dtype="uint8",
+        crs=crs, transform=transform,
+    ) as dst:
+        dst.write(np.zeros((1, size, size), dtype=np.uint8))
+    return str(path)
+
+
+@pytest.fixture
+def wgs84_scene(tmp_path):
+    return _write_raster(tmp_path / "wgs84.tif", "EPSG:4326", from_origin(-118.5, 34.0, 1e-4, 1e-4))
+
+
+@pytest.fixture
+def utm_scene(tmp_path):
+    # Sentinel-2 style: UTM zone 11N, 10 m pixels, near LAX
+    return _write_raster(tmp_path / "utm.tif", "EPSG:32611", from_origin(368000, 3757000, 10, 10))
+
+
+class TestGeoReferencer:
+
+    def test_vectorized_matches_per_pixel_xy(self, wgs84_scene):
+        cols, rows = np.array([0, 10, 55, 99]), np.array([0, 20, 7, 99])
+
+        latlon = GeoReferencer().pixels_to_latlon(wgs84_scene, cols, rows)
+
+        with rasterio.open(wgs84_scene) as src:
+            for (lat, lon), col, row in zip(latlon, cols, rows):
+                x, y = xy(src.transform, row, col)
+                assert (lat, lon) == pytest.approx((y, x))
+
+    def test_projected_crs_reprojected_to_wgs84(self, utm_scene):
+        latlon = GeoReferencer().pixels_to_latlon(utm_scene, [50], [50])
+
+        lons, lats = warp("EPSG:32611", "EPSG:4326", [368505.0], [3756495.0])
+        assert latlon[0] == pytest.approx([lats[0], lons[0]])
+        assert 33 < latlon[0][0] < 35 and -119 < latlon[0][1] < -118
+
+    def test_scene_opened_once(self, wgs84_scene, monkeypatch):
+        opens = []
+        real_open = rasterio.open
+        monkeypatch.setattr(rasterio, "open", lambda *a, **k: opens.append(a) or real_open(*a, **k))
+        referencer = GeoReferencer()
+        detections = [Detection(label="car", confidence=0.9, bbox=(i, i, i + 4, i + 4)) for i in range(50)]
+
+        referencer.georeference(wgs84_scene, detections)
+        referencer.georeference(wgs84_scene, [Detection(label="car", confidence=0.9, bbox=(0, 0, 2, 2))])
+
+        assert len(opens) == 1
+        assert referencer.stats()["hits"] == 1
+        assert all(d.geo_location is not None for d in detections)
+
+    def test_rewritten_scene_is_reread(self, tmp_path, wgs84_scene):
+        referencer = GeoReferencer()
+        before = referencer.pixels_to_latlon(wgs84_scene, [0], [0])
+
+        _write_raster(tmp_path / "wgs84.tif", "EPSG:4326", from_origin(10.0, 50.0, 1e-4, 1e-4))
+        stat = os.stat(wgs84_scene)
+        os.utime(wgs84_scene, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        after = referencer.pixels_to_latlon(wgs84_scene, [0], [0])
+
+        assert before[0][1] == pytest.approx(-118.5, abs=1e-3)
+        assert after[0][1] == pytest.approx(10.0, abs=1e-3)
+
+    def test_lru_bounded(self, tmp_path):
+        referencer = GeoReferencer(max_entries=2)
+        for i in range(3):
+            path = _write_raster(tmp_path / f"{i}.tif", "EPSG:4326", from_origin(i, 0, 1e-4, 1e-4), size=8)
+            referencer.metadata(path)
+
+        assert referencer.stats()["entries"] == 2
+
+    def test_non_raster_falls_back_to_mock(self, tmp_path):
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(b"not an image")
+        detections = [Detection(label="car", confidence=0.9, bbox=(0, 0, 10, 10))]
+
+        assert GeoReferencer().pixels_to_latlon(str(path), [5], [5]) is None
+        GeoReferencer().georeference(str(path), detections)
+        assert detections[0].geo_location == pytest.approx(geo.MOCK_CENTER, abs=0.011)
+
+    def test_pixel_to_latlon_wrapper(self, wgs84_scene):
+        lat, lon = geo.pixel_to_latlon(wgs84_scene, 0, 0)
+
+        assert (lat, lon) == pytest.approx((34.0 - 0.5e-4, -118.5 + 0.5e-4))
@@ -0,0 +1,30 @@
+"""Import-time regression guard for the lightweight entry points."""
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["ultralytics", "torch", "rasterio", "httpx", "dotenv", "scipy"]
+
+
+def _heavy_modules_after_import(module: str, cwd) -> list[str]:
+    code = (
+        f"import json, sys; import {module}; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    # Run elsewhere: importing the API initialises ./ghost_sentry.db
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=cwd)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", [
+    "ghost_sentry.api",
+    "ghost_sentry.cli",
+    "ghost_sentry.console.app",
+    "ghost_sentry.core.detector",
+    "ghost_sentry.core.pipeline",
+])
+def test_entry_points_do_not_load_heavy_dependencies(module, tmp_path):
+    """Heavy engines must load on first use, not at import (see scripts/bench_imports.py)."""
+    assert _heavy_modules_after_import(module, tmp_path) == []
@@ -0,0 +1,130 @@
+"""Tests for the prod-mode Lattice client against the local stand-in server."""
+import time
+
+import httpx
+import pytest
+
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.adapter import LatticeConnectionError, LatticeConnector
+from ghost_sentry.lattice.client import LatticeClient
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.lattice.standin import LatticeStandIn
+
+
+@pytest.fixture
+def standin():
+    with LatticeStandIn() as server:
+        yield server
+
+
+def _client(url, **kwargs):
+    options = {"backoff_s": 0.001, "max_backoff_s": 0.0}
+    options.update(kwargs)
+    return LatticeClient(url, **options)
+
+
+def _track(entity_id, confidence=0.5):
+    detection = Detection(label="tank", confidence=confidence, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+    return TrackBuilder.from_detection(detection, entity_id=entity_id).model_dump()
+
+
+class TestLatticeClient:
+
+    def test_batches_share_one_request_and_keep_task_order(self, standin):
+        client = _client(standin.url, batch_size=100)
+        client._outbox.extend(("track", line) for line in [b'{"entityId":"a"}', b'{"entityId":"b"}'])
+        client._outbox.append(("task", b'{"target_entity_id":"a"}'))
+
+        assert client.publish("track", _track("a", 0.9)) == 4
+
+        assert standin.stats() == {"requests": 3, "track_updates": 3, "tracks": 2, "tasks": 1, "subscribers": 0}
+        assert standin.tracks["a"]["confidence"] == 0.9
+        assert client.stats()["requests"] == 3
+        client.close()
+
+    def test_throttling_is_retried(self, standin):
+        client = _client(standin.url)
+        standin.fail_next(1, status=429)
+        standin.fail_next(1, status=503)
+
+        assert client.publish_many("track", [_track("a"), _track("b")]) == 2
+        assert client.stats()["retried"] == 2
+        assert len(standin.tracks) == 2
+        client.close()
+
+    def test_retry_after_capped_at_max_backoff(self, standin):
+        client = _client(standin.url, max_backoff_s=0.05)
+        standin.retry_after = "3600"
+        standin.fail_next(1, status=429)
+
+        started = time.monotonic()
+        assert client.publish("track", _track("a")) == 1
+        assert time.monotonic() - started < 5
+        assert client.stats()["retried"] == 1
+        client.close()
+
+    def test_buffers_through_outage_and_reconnects(self, standin):
+        client = _client(standin.url, retries=1)
+        client.publish("track", _track("a"))
+        standin.stop()
+
+        assert client.publish("track", _track("b")) == 0
+        assert client.publish("track", _track("c")) == 0
+        assert client.stats()["connected"] is False
+        assert client.stats()["buffered"] == 2
+
+        standin.start()
+        assert client.drain() == 2
+        stats = client.stats()
+        assert stats["connected"] is True
+        assert stats["disconnects"] == 1
+        assert sorted(standin.tracks) == ["a", "b", "c"]
+        client.close()
+
+    def test_full_buffer_drops_oldest(self):
+        client = _client("http://127.0.0.1:9", retries=0, buffer_size=3, max_backoff_s=60)
+
+        for entity_id in "abcde":
+            client.publish("track", _track(entity_id))
+
+        assert client.stats()["dropped"] == 2
+        assert [line for _, line in client._outbox][0].startswith(b'{"entityId":"c"')
+        client._http.close()
+
+    def test_rejected_batch_is_not_retried(self):
+        with LatticeStandIn(token="secret") as standin:
+            client = _client(standin.url)
+            client.publish("track", _track("a"))
+
+            assert client.stats()["dropped"] == 1
+            assert client.stats()["retried"] == 0
+            assert client.stats()["connected"] is True
+
+            authorized = _client(standin.url, token="secret")
+            assert authorized.publish("track", _track("a")) == 1
+            client.close()
+            authorized.close()
+
+    def test_unknown_kind_rejected(self, standin):
+        with pytest.raises(ValueError):
+            _client(standin.url).publish("asset", {})
+
+
+class TestProdConnector:
+
+    def test_publishes_to_endpoint(self, standin, monkeypatch):
+        monkeypatch.setenv("LATTICE_ENDPOINT", standin.url)
+        connector = LatticeConnector(mode="prod")
+        detection = Detection(label="tank", confidence=0.8, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+
+        connector.publish_tracks([TrackBuilder.from_detection(detection, entity_id=str(i)) for i in range(3)])
+        connector.publish_task({"target_entity_id": "0", "type": "VERIFICATION_REQUEST"})
+        connector.close()
+
+        assert standin.stats() == {"requests": 2, "track_updates": 3, "tracks": 3, "tasks": 1, "subscribers": 0}
+        assert httpx.get(f"{standin.url}/v1/tracks").json()[0]["ontology"]["platform_type"] == "Tank"
+
+    def test_requires_http_endpoint(self, monkeypatch):
+        monkeypatch.setenv("LATTICE_ENDPOINT", "grpc://lattice.example.com:443")
+        with pytest.raises(LatticeConnectionError):
+            LatticeConnector(mode="prod")
@@ -0,0 +1,122 @@
+"""Tests for the ONNX Runtime detector backend (tiny synthetic model)."""
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+from onnx import TensorProto, helper
+
+from ghost_sentry.core.detector import ObjectDetector
+from ghost_sentry.core.onnx_backend import OnnxYOLO, decode, letterbox
+
+NAMES = {0: "person", 1: "car", 2: "airplane", 3: "bus", 4: "truck", 5: "boat"}
+
+
+def _head_output(rows, num_classes=len(NAMES), anchors=16):
+    """(4 + nc, anchors) raw head output; rows are (cx, cy, w, h, class_id, score)."""
+    output = np.zeros((4 + num_classes, anchors), dtype=np.float32)
+    for i, (cx, cy, w, h, cls, score) in enumerate(rows):
+        output[:4, i] = (cx, cy, w, h)
+        output[4 + cls, i] = score
+    return output
+
+
+def _write_constant_model(path, head, imgsz=64, dynamic=True):
+    """ONNX graph that ignores its pixels and returns ``head`` for every image in the batch."""
+    batch = "batch" if dynamic else 1
+    images = helper.make_tensor_value_info("images", TensorProto.FLOAT, [batch, 3, imgsz, imgsz])
+    output0 = helper.make_tensor_value_info("output0", TensorProto.FLOAT, [batch, *head.shape])
+    nodes = [
+        helper.make_node("Shape", ["images"], ["shape"]),
+        helper.make_node("Slice", ["shape", "zero", "one"], ["batch_dim"]),
+        helper.make_node("Concat", ["batch_dim", "head_dims"], ["out_shape"], axis=0),
+        helper.make_node("Expand", ["head"], ["output0"]),
+    ]
+    nodes[-1].input.append("out_shape")
+    initializers = [
+        helper.make_tensor("zero", TensorProto.INT64, [1], [0]),
+        helper.make_tensor("one", TensorProto.INT64, [1], [1]),
+        helper.make_tensor("head_dims", TensorProto.INT64, [2], list(head.shape)),
+        helper.make_tensor("head", TensorProto.FLOAT, [1, *head.shape], head.flatten().tolist()),
+    ]
+    graph = helper.make_graph(nodes, "constant_head", [images], [output0], initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8
+    helper.set_model_props(model, {"names": str(NAMES), "imgsz": str([imgsz, imgsz])})
+    onnx.save(model, str(path))
+    return str(path)
+
+
+class TestDecode:
+
+    def test_boxes_converted_and_filtered_by_confidence(self):
+        output = _head_output([(20, 20, 10, 10, 1, 0.9), (40, 40, 10, 10, 4, 0.1)])
+
+        boxes = decode(output, conf=0.25)
+
+        assert boxes.xyxy.tolist() == [[15, 15, 25, 25]]
+        assert boxes.cls.tolist() == [1]
+        assert boxes.conf.tolist() == pytest.approx([0.9])
+
+    def test_class_filter_and_nms(self):
+        output = _head_output([
+            (20, 20, 10, 10, 1, 0.9),
+            (21, 21, 10, 10, 1, 0.8),   # duplicate of the first
+            (21, 21, 10, 10, 4, 0.7),   # same place, other class: kept
+            (50, 50, 10, 10, 0, 0.95),  # person: filtered out
+        ])
+
+        boxes = decode(output, conf=0.25, classes=[1, 4], iou=0.5)
+
+        assert boxes.cls.tolist() == [1, 4]
+        assert boxes.conf.tolist() == pytest.approx([0.9, 0.7])
+
+    def test_letterbox_pads_to_square(self):
+        image, gain, pad = letterbox(np.zeros((50, 100, 3), dtype=np.uint8), size=64)
+
+        assert image.shape == (64, 64, 3)
+        assert gain == pytest.approx(0.64)
+        assert pad == (0, 16)
+        assert image[0, 0].tolist() == [114, 114, 114]
+
+
+class TestOnnxBackend:
+
+    @pytest.fixture
+    def model_path(self, tmp_path):
+        # Box centred at (32, 40) in the 64x64 letterboxed frame
+        head = _head_output([(32, 40, 16, 8, 4, 0.9), (10, 10, 4, 4, 0, 0.9)])
+        return _write_constant_model(tmp_path / "tiny.onnx", head)
+
+    def test_reads_names_and_size_from_metadata(self, model_path):
+        model = OnnxYOLO(model_path)
+
+        assert model.names == NAMES
+        assert model.imgsz == 64
+
+    def test_rejects_pytorch_weights(self):
+        with pytest.raises(ValueError, match=".onnx"):
+            OnnxYOLO("yolov8n.pt")
+
+    def test_detector_produces_detections_in_image_pixels(self, model_path):
+        detector = ObjectDetector(model_path, backend="onnx")
+        # 128x64 image: gain 0.5, letterboxed with 16px bands top and bottom
+        image = np.zeros((64, 128, 3), dtype=np.uint8)
+
+        results = detector.detect_batch([image, image, image], batch_size=2)
+
+        assert len(results) == 3
+        for detections in results:
+            assert [d.label for d in detections] == ["truck"]
+            assert detections[0].bbox == (48, 40, 80, 56)
+            assert detections[0].confidence == pytest.approx(0.9)
+
+    def test_fixed_batch_model_runs_one_image_at_a_time(self, tmp_path):
+        head = _head_output([(32, 32, 8, 8, 2, 0.5)])
+        path = _write_constant_model(tmp_path / "fixed.onnx", head, dynamic=False)
+
+        results = ObjectDetector(path, backend="onnx").detect_batch(
+            [np.zeros((64, 64, 3), dtype=np.uint8)] * 3
+        )
+
+        assert [[d.label for d in r] for r in results] == [["airplane"]] * 3
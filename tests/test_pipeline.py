@@ -0,0 +1,211 @@
+"""Tests for the staged ingestion pipeline."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ghost_sentry.core.detector import Detection
+from ghost_sentry.core.pipeline import Pipeline, Stage, SentryStage, geo_stage
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestPipeline:
+
+    def test_items_flow_through_stages_in_order(self):
+        results = []
+
+        async def scenario():
+            pipeline = Pipeline(
+                [Stage("double", lambda x: x * 2), Stage("inc", lambda x: x + 1)],
+                sink=results.append,
+            )
+            async with pipeline:
+                for i in range(5):
+                    await pipeline.submit(i)
+            return pipeline.stats()
+
+        stats = _run(scenario())
+
+        assert results == [1, 3, 5, 7, 9]
+        assert stats["submitted"] == 5
+        assert [s["processed"] for s in stats["stages"]] == [5, 5]
+
+    def test_none_drops_and_fan_out_splits(self):
+        results = []
+
+        async def scenario():
+            pipeline = Pipeline(
+                [
+                    Stage("filter", lambda x: x if x % 2 else None),
+                    Stage("split", lambda x: [x, x], fan_out=True),
+                ],
+                sink=results.append,
+            )
+            async with pipeline:
+                for i in range(4):
+                    await pipeline.submit(i)
+            return pipeline.stats()
+
+        stats = _run(scenario())
+
+        assert results == [1, 1, 3, 3]
+        assert stats["stages"][0]["dropped"] == 2
+
+    def test_thread_stage_runs_off_loop(self):
+        threads = set()
+
+        def work(x):
+            threads.add(threading.current_thread().name)
+            return x
+
+        async def scenario():
+            async with Pipeline([Stage("work", work, workers=2, executor="thread")]) as pipeline:
+                for i in range(4):
+                    await pipeline.submit(i)
+
+        _run(scenario())
+
+        assert threads
+        assert all(name.startswith("pipeline-work") for name in threads)
+
+    def test_backpressure_rejects_when_saturated(self):
+        release = threading.Event()
+
+        def slow(x):
+            release.wait(timeout=5)
+            return x
+
+        async def scenario():
+            pipeline = Pipeline([Stage("slow", slow, executor="thread", queue_size=2)])
+            await pipeline.start()
+            accepted = [pipeline.try_submit(i) for i in range(2)]
+            await asyncio.sleep(0.05)  # worker picks up the first item and blocks
+            accepted += [pipeline.try_submit(i) for i in range(2, 5)]
+            overloaded = pipeline.overloaded
+            stats = pipeline.stats()
+            release.set()
+            await pipeline.stop()
+            return accepted, overloaded, stats
+
+        accepted, overloaded, stats = _run(scenario())
+
+        assert accepted == [True, True, True, False, False]
+        assert overloaded is True
+        assert stats["rejected"] == 2
+        assert stats["stages"][0]["queue_depth"] == 2
+        assert stats["stages"][0]["saturated"] is True
+
+    def test_stage_errors_are_counted_not_fatal(self):
+        results = []
+
+        def flaky(x):
+            if x == 1:
+                raise ValueError("boom")
+            return x
+
+        async def scenario():
+            pipeline = Pipeline([Stage("flaky", flaky)], sink=results.append)
+            async with pipeline:
+                for i in range(3):
+                    await pipeline.submit(i)
+            return pipeline.stats()
+
+        stats = _run(scenario())
+
+        assert results == [0, 2]
+        assert stats["stages"][0]["errors"] == 1
+
+    def test_sink_errors_are_counted_not_fatal(self):
+        results = []
+
+        def sink(x):
+            if x == 1:
+                raise ValueError("boom")
+            results.append(x)
+
+        async def scenario():
+            pipeline = Pipeline([Stage("echo", lambda x: x)], sink=sink)
+            async with pipeline:
+                for i in range(3):
+                    await pipeline.submit(i)
+                await asyncio.wait_for(pipeline.join(), 5)
+            return pipeline.stats()
+
+        stats = _run(scenario())
+
+        assert results == [0, 2]
+        assert stats["stages"][0]["errors"] == 1
+
+    def test_stats_report_latency(self):
+        def sleepy(x):
+            time.sleep(0.01)
+            return x
+
+        async def scenario():
+            async with Pipeline([Stage("sleepy", sleepy, executor="thread")]) as pipeline:
+                await pipeline.submit(1)
+            return pipeline.stats()
+
+        stats = _run(scenario())
+
+        assert stats["stages"][0]["avg_latency_ms"] >= 10
+        assert stats["stages"][0]["max_latency_ms"] >= 10
+
+    def test_invalid_executor_rejected(self):
+        with pytest.raises(ValueError):
+            Stage("bad", lambda x: x, executor="gpu")
+
+
+class TestIngestionStages:
+
+    @pytest.fixture(autouse=True)
+    def setup_test_db(self, monkeypatch, tmp_path):
+        from ghost_sentry.core import db, sentry
+        from ghost_sentry.core.correlation import EntityMatcher
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_pipeline.db")
+        monkeypatch.setattr(sentry, "_matcher", EntityMatcher())
+        sentry._debounce.clear()
+        db.init_db()
+        yield
+
+    def test_geo_and_sentry_stages(self):
+        from ghost_sentry.lattice.adapter import LatticeConnector
+
+        detections = [Detection(label="airplane", confidence=0.92, bbox=(0, 0, 10, 10))]
+        sentry_stage = SentryStage(LatticeConnector())
+
+        async def scenario():
+            pipeline = Pipeline([
+                Stage("geo", geo_stage, executor="thread"),
+                Stage("sentry", sentry_stage, executor="thread"),
+            ])
+            async with pipeline:
+                await pipeline.submit(("not-a-raster.jpg", detections))
+
+        _run(scenario())
+
+        assert detections[0].geo_location is not None
+        assert sentry_stage.totals == {"tracks": 1, "tasks": 1}
+
+
+class TestIngestEndpoint:
+
+    def test_ingest_queues_on_the_event_loop(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)  # importing the API initialises ./ghost_sentry.db
+        from ghost_sentry import api
+        results = []
+
+        async def scenario():
+            async with Pipeline([Stage("echo", lambda x: x)], sink=results.append) as pipeline:
+                monkeypatch.setattr(api, "_pipeline", pipeline)
+                response = await api.ingest_image("a.jpg")
+                await pipeline.join()
+            return response
+
+        assert asyncio.iscoroutinefunction(api.ingest_image)
+        assert _run(scenario()) == {"status": "queued", "image_path": "a.jpg"}
+        assert results == ["a.jpg"]
@@ -0,0 +1,118 @@
+"""Tests for the coalescing batch publisher."""
+import threading
+
+import pytest
+
+from ghost_sentry.core import db, events
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.adapter import LatticeConnector
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.lattice.publisher import BatchPublisher
+
+
+class RecordingConnector:
+    """Stands in for LatticeConnector and records every call in order."""
+
+    mode = "dev"
+
+    def __init__(self):
+        self.calls = []
+        self.batched = threading.Event()
+
+    def publish_tracks(self, tracks):
+        self.calls.append(("tracks", [t.entityId for t in tracks], [t.confidence for t in tracks]))
+        self.batched.set()
+
+    def publish_task(self, task):
+        self.calls.append(("task", task["target_entity_id"]))
+
+
+def _track(entity_id, confidence=0.5):
+    detection = Detection(label="tank", confidence=confidence, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+    return TrackBuilder.from_detection(detection, entity_id=entity_id)
+
+
+class TestBatchPublisher:
+
+    def test_latest_update_per_entity_wins(self):
+        connector = RecordingConnector()
+        publisher = BatchPublisher(connector)
+
+        for confidence in (0.1, 0.2, 0.3):
+            publisher.publish_track(_track("a", confidence))
+        publisher.publish_track(_track("b"))
+
+        assert publisher.flush() == 2
+        assert connector.calls == [("tracks", ["a", "b"], [0.3, 0.5])]
+        stats = publisher.stats()
+        assert stats["submitted"] == 4
+        assert stats["coalesced"] == 2
+        assert stats["published"] == 2
+        assert stats["flushes"] == 1
+        assert publisher.flush() == 0
+
+    def test_size_threshold_wakes_flusher(self):
+        connector = RecordingConnector()
+        with BatchPublisher(connector, flush_interval_s=60, max_batch=3) as publisher:
+            for i in range(3):
+                publisher.publish_track(_track(str(i)))
+            assert connector.batched.wait(timeout=2)
+
+        assert connector.calls[0][1] == ["0", "1", "2"]
+
+    def test_interval_flush_and_close_drains(self):
+        connector = RecordingConnector()
+        publisher = BatchPublisher(connector, flush_interval_s=0.02).start()
+        publisher.publish_track(_track("a"))
+        assert connector.batched.wait(timeout=2)
+
+        publisher.publish_track(_track("b"))
+        publisher.close()
+
+        assert [ids for _, ids, _ in connector.calls] == [["a"], ["b"]]
+        assert publisher.stats()["max_flush_latency_ms"] > 0
+
+    def test_task_waits_for_pending_tracks(self):
+        connector = RecordingConnector()
+        publisher = BatchPublisher(connector, flush_interval_s=60)
+
+        publisher.publish_track(_track("a"))
+        publisher.publish_task({"target_entity_id": "a", "type": "VERIFICATION_REQUEST"})
+
+        assert connector.calls == [("tracks", ["a"], [0.5]), ("task", "a")]
+
+    def test_failed_flush_is_retried(self):
+        connector = RecordingConnector()
+        publish_tracks, connector.publish_tracks = connector.publish_tracks, lambda tracks: 1 / 0
+        publisher = BatchPublisher(connector)
+        publisher.publish_track(_track("a", 0.1))
+        publisher.publish_track(_track("b", 0.1))
+
+        assert publisher.flush() == 0
+        publisher.publish_track(_track("a", 0.9))
+        connector.publish_tracks = publish_tracks
+
+        assert publisher.flush() == 2
+        assert connector.calls == [("tracks", ["a", "b"], [0.9, 0.1])]
+        assert publisher.stats()["errors"] == 1
+
+    def test_rejects_empty_batches(self):
+        with pytest.raises(ValueError):
+            BatchPublisher(RecordingConnector(), max_batch=0)
+
+
+class TestBatchedDevPublish:
+
+    def test_one_transaction_and_ordered_events(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(db, "DB_PATH", tmp_path / "ghost_sentry.db")
+        monkeypatch.setattr(events, "_listeners", [])
+        received = []
+        events.subscribe(lambda event: received.append(event.entity_id))
+
+        with BatchPublisher(LatticeConnector(mode="dev"), flush_interval_s=60) as publisher:
+            for entity_id in ("x", "y", "x"):
+                publisher.publish_track(_track(entity_id))
+            assert publisher.flush() == 2
+
+        assert received == ["x", "y"]
+        assert sorted(t["entityId"] for t in db.get_tracks()) == ["x", "y"]
@@ -0,0 +1,306 @@
+"""Tests for the Sentinel Hub client against a local stand-in HTTP server."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ghost_sentry.core.satellite import (
+    FetchScheduler, SceneCache, SentinelClient, TOKEN_PATH, PROCESS_PATH, split_bbox,
+)
+
+
+class StandInSentinelHub(ThreadingHTTPServer):
+    """Token and Process API endpoints with call counters."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.token_calls = 0
+        self.process_calls = 0
+        self.connections = set()
+        self.expires_in = 3600
+        self.process_delay_s = 0.0
+        self.valid_tokens = set()
+        self.scene = b"II*\x00" + b"\x07" * 2048
+        self.fail_first = 0  # answer this many Process calls with 503 first
+        self.retry_after = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        server.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == TOKEN_PATH:
+            server.token_calls += 1
+            token = f"token-{server.token_calls}"
+            server.valid_tokens.add(token)
+            self._reply(200, json.dumps({"access_token": token, "expires_in": server.expires_in}).encode())
+        elif self.path == PROCESS_PATH:
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+            if token not in server.valid_tokens:
+                self._reply(401, b"{}")
+                return
+            with server._lock:
+                server.process_calls += 1
+                failing = server.fail_first > 0
+                server.fail_first -= failing
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            try:
+                time.sleep(server.process_delay_s)
+            finally:
+                with server._lock:
+                    server.in_flight -= 1
+            if failing:
+                self._reply(503, b"busy", headers={"Retry-After": server.retry_after} if server.retry_after else {})
+                return
+            request = json.loads(body)
+            # Different bboxes get different imagery
+            self._reply(200, server.scene + json.dumps(request["input"]["bounds"]["bbox"]).encode(), "image/tiff")
+        else:
+            self._reply(404, b"")
+
+    def _reply(self, status, payload, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+BBOX = [-118.45, 33.93, -118.39, 33.96]
+
+
+@pytest.fixture
+def hub():
+    with StandInSentinelHub() as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(hub, tmp_path):
+    def make(**kwargs):
+        kwargs.setdefault("cache_dir", str(tmp_path / "cache"))
+        return SentinelClient(client_id="id", client_secret="secret", base_url=hub.url, **kwargs)
+    return make
+
+
+class TestSentinelClient:
+
+    def test_token_reused_until_near_expiry(self, hub, make_client):
+        async def scenario():
+            async with make_client() as client:
+                assert await client.authenticate()
+                assert await client.authenticate()
+                hub.expires_in = 30  # inside the refresh margin
+                assert await client.authenticate(force=True)
+                assert await client.authenticate()
+
+        asyncio.run(scenario())
+
+        assert hub.token_calls == 3
+
+    def test_download_cached_and_reused(self, hub, make_client, tmp_path):
+        async def scenario():
+            async with make_client() as client:
+                first = await client.get_latest_image_path(BBOX, time_to="2026-10-01")
+                second = await client.get_latest_image_path(BBOX, time_to="2026-10-01")
+                return client, first, second
+
+        client, first, second = asyncio.run(scenario())
+
+        assert first == second
+        assert open(first, "rb").read().startswith(hub.scene)
+        assert hub.process_calls == 1
+        assert client.cache.stats()["hits"] == 1
+
+        # A fresh client (e.g. after a restart) still hits the on-disk cache
+        again = asyncio.run(make_client().get_latest_image_path(BBOX, time_to="2026-10-01"))
+        assert again == first
+        assert hub.process_calls == 1
+
+    def test_concurrent_requests_deduplicated(self, hub, make_client):
+        hub.process_delay_s = 0.2
+
+        async def scenario():
+            async with make_client() as client:
+                return await asyncio.gather(*[
+                    client.get_latest_image_path(BBOX, time_to="2026-10-01") for _ in range(5)
+                ])
+
+        paths = asyncio.run(scenario())
+
+        assert len(set(paths)) == 1
+        assert hub.process_calls == 1
+        assert hub.token_calls == 1
+
+    def test_connections_kept_alive(self, hub, make_client):
+        async def scenario():
+            async with make_client() as client:
+                for day in range(1, 6):
+                    await client.get_latest_image_path(BBOX, time_to=f"2026-10-0{day}")
+
+        asyncio.run(scenario())
+
+        assert hub.process_calls == 5
+        assert len(hub.connections) == 1
+
+    def test_revoked_token_refreshed_once(self, hub, make_client):
+        async def scenario():
+            async with make_client() as client:
+                await client.authenticate()
+                hub.valid_tokens.clear()
+                return await client.get_latest_image_path(BBOX, time_to="2026-10-01")
+
+        assert asyncio.run(scenario()) is not None
+        assert hub.token_calls == 2
+
+    def test_missing_credentials_is_mock_mode(self, hub, tmp_path, monkeypatch):
+        monkeypatch.delenv("SENTINEL_CLIENT_ID", raising=False)
+        monkeypatch.delenv("SENTINEL_CLIENT_SECRET", raising=False)
+        client = SentinelClient(base_url=hub.url, cache_dir=str(tmp_path))
+
+        assert asyncio.run(client.get_latest_image_path(BBOX)) is None
+        assert hub.process_calls == 0
+
+
+class TestSceneCache:
+
+    def test_identical_content_stored_once(self, tmp_path):
+        cache = SceneCache(str(tmp_path))
+
+        a = cache.put("request-a", b"same imagery")
+        b = cache.put("request-b", b"same imagery")
+
+        assert a == b
+        assert cache.stats()["scenes"] == 1
+
+    def test_size_bounded_lru_eviction(self, tmp_path):
+        cache = SceneCache(str(tmp_path), max_bytes=20)
+
+        cache.put("a", b"a" * 10)
+        cache.put("b", b"b" * 10)
+        cache.get("a")
+        cache.put("c", b"c" * 10)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+
+
+class TestFetchScheduler:
+
+    def test_split_bbox_covers_aoi_with_bounded_tiles(self):
+        tiles = split_bbox([0.0, 0.0, 0.5, 0.25], max_tile_deg=0.2)
+
+        assert len(tiles) == 3 * 2
+        assert all(t[2] - t[0] <= 0.2 and t[3] - t[1] <= 0.2 for t in tiles)
+        assert min(t[0] for t in tiles) == 0.0 and max(t[2] for t in tiles) == pytest.approx(0.5)
+        assert split_bbox(BBOX) == [BBOX]
+
+    def test_parallelism_bounded(self, hub, make_client):
+        hub.process_delay_s = 0.1
+        aois = {"port": [0.0, 0.0, 0.4, 0.4], "airfield": [1.0, 1.0, 1.2, 1.2]}
+
+        async def scenario():
+            async with make_client() as client:
+                scheduler = FetchScheduler(client, concurrency=2, max_tile_deg=0.2)
+                return [r async for r in scheduler.fetch(aois, time_to="2026-10-01")]
+
+        results = asyncio.run(scenario())
+
+        assert len(results) == 5
+        assert all(r.path for r in results)
+        assert sorted(r.aoi for r in results) == ["airfield"] + ["port"] * 4
+        assert hub.max_in_flight == 2
+
+    def test_transient_errors_retried(self, hub, make_client):
+        hub.fail_first = 2
+        hub.retry_after = 0
+
+        async def scenario():
+            async with make_client() as client:
+                scheduler = FetchScheduler(client, retries=3, backoff_s=0.01)
+                return [r async for r in scheduler.fetch([BBOX], time_to="2026-10-01")]
+
+        [result] = asyncio.run(scenario())
+
+        assert result.path is not None
+        assert result.attempts == 3
+        assert hub.process_calls == 3
+
+    def test_retry_after_capped_at_max_backoff(self, hub, make_client):
+        hub.fail_first = 1
+        hub.retry_after = "3600"
+
+        async def scenario():
+            async with make_client() as client:
+                scheduler = FetchScheduler(client, retries=1, backoff_s=0.01, max_backoff_s=0.05)
+                return [r async for r in scheduler.fetch([BBOX], time_to="2026-10-01")]
+
+        started = time.monotonic()
+        [result] = asyncio.run(scenario())
+
+        assert time.monotonic() - started < 5
+        assert result.path is not None
+        assert result.attempts == 2
+
+    def test_gives_up_after_retries(self, hub, make_client):
+        hub.fail_first = 10
+
+        async def scenario():
+            async with make_client() as client:
+                scheduler = FetchScheduler(client, retries=1, backoff_s=0.01)
+                return [r async for r in scheduler.fetch([BBOX], time_to="2026-10-01")]
+
+        [result] = asyncio.run(scenario())
+
+        assert result.path is None
+        assert result.error == "HTTP 503"
+        assert result.attempts == 2
+
+    def test_results_stream_before_batch_completes(self, hub, make_client):
+        hub.process_delay_s = 0.05
+        submitted = []
+
+        async def submit(path):
+            submitted.append((path, hub.process_calls))
+
+        async def scenario():
+            async with make_client() as client:
+                scheduler = FetchScheduler(client, concurrency=1, max_tile_deg=0.1)
+                return await scheduler.feed([[0.0, 0.0, 0.4, 0.1]], submit, time_to="2026-10-01")
+
+        counts = asyncio.run(scenario())
+
+        assert counts == {"tiles": 4, "fetched": 4, "failed": 0, "retries": 0}
+        # The first scene reached the pipeline before the remaining tiles were requested
+        assert submitted[0][1] < 4
@@ -0,0 +1,95 @@
+"""Tests for serialize-once track publishing."""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from ghost_sentry.core import db, events, serialization
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.adapter import LatticeConnector
+from ghost_sentry.lattice.entities import LatticeTrack, TrackBuilder
+
+
+@pytest.fixture(autouse=True)
+def scratch_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "ghost_sentry.db")
+    monkeypatch.setattr(events, "_listeners", [])
+
+
+def _track(entity_id="t1", label="tank"):
+    detection = Detection(label=label, confidence=0.75, bbox=(0, 0, 1, 1), geo_location=(33.0, -118.0))
+    return TrackBuilder.from_detection(detection, entity_id=entity_id)
+
+
+class TestDumps:
+
+    def test_matches_stdlib_json(self):
+        data = _track().model_dump()
+        data["description"] = "Détecté ✈"
+
+        assert json.loads(serialization.dumps(data)) == data
+
+    def test_numpy_scalars(self):
+        assert json.loads(serialization.dumps({"confidence": np.float32(0.5), "n": np.int64(3)})) == {
+            "confidence": 0.5, "n": 3
+        }
+
+    def test_numpy_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(serialization, "orjson", None)
+
+        data = {"confidence": np.float32(0.5), "n": np.int64(3), "bbox": np.array([1, 2])}
+
+        assert json.loads(serialization.dumps(data)) == {"confidence": 0.5, "n": 3, "bbox": [1, 2]}
+        with pytest.raises(TypeError):
+            serialization.dumps({"when": object()})
+
+
+class TestSerializeOnce:
+
+    def test_publish_track_dumps_once_and_shares_bytes(self, monkeypatch):
+        calls = []
+        model_dump = LatticeTrack.model_dump
+        monkeypatch.setattr(LatticeTrack, "model_dump", lambda self, **kw: calls.append(1) or model_dump(self, **kw))
+        received = []
+        events.subscribe(received.append)
+        connector = LatticeConnector(mode="dev")
+
+        connector.publish_track(_track())
+
+        assert len(calls) == 1
+        [event] = received
+        assert event.json_bytes() is event.raw
+        [text] = db.get_track_texts()
+        assert text == event.raw.decode()
+        assert json.loads(text)["entityId"] == "t1"
+
+    def test_batch_publish_shares_bytes(self):
+        received = []
+        events.subscribe(received.append)
+
+        LatticeConnector(mode="dev").publish_tracks([_track("a"), _track("b")])
+
+        assert sorted(db.get_track_texts()) == sorted(e.raw.decode() for e in received)
+
+    def test_events_without_raw_render_once(self):
+        event = events.TrackEvent(entity_id="x", data={"type": "task"})
+
+        first = event.json_bytes()
+
+        assert event.json_bytes() is first
+        assert json.loads(first) == {"type": "task"}
+
+    def test_websocket_clients_share_one_frame(self, monkeypatch, tmp_path):
+        monkeypatch.chdir(tmp_path)  # importing the API initialises ./ghost_sentry.db
+        from ghost_sentry import api
+        queues = [asyncio.Queue(), asyncio.Queue()]
+        monkeypatch.setattr(api, "_track_subscribers", queues)
+        data = _track().model_dump()
+        event = events.TrackEvent(entity_id="t1", data=data, raw=serialization.dumps(data))
+
+        asyncio.run(api.broadcast_track(event))
+
+        first, second = (q.get_nowait() for q in queues)
+        assert first is second
+        assert json.loads(first) == data
@@ -0,0 +1,140 @@
+"""Tests for watermark-based streaming fusion."""
+import asyncio
+
+import pytest
+
+from ghost_sentry.core.fusion import FusionEngine
+from ghost_sentry.core.models import Detection
+from ghost_sentry.core.stream_fusion import StreamingFusion
+
+HERE = (33.94, -118.40)
+ELSEWHERE = (33.99, -118.30)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _truck(location=HERE, confidence=0.6):
+    return Detection(label="truck", confidence=confidence, bbox=(0, 0, 10, 10), geo_location=location)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _fusion(clock, **kwargs):
+    kwargs.setdefault("window_s", 30)
+    kwargs.setdefault("max_delay_s", 10)
+    return StreamingFusion(FusionEngine(gate_m=50), clock=clock, **kwargs)
+
+
+class TestStreamingFusion:
+
+    def test_out_of_order_partner_is_joined(self, clock):
+        fusion = _fusion(clock)
+
+        assert fusion.push("optical", 100, [_truck(confidence=0.6)]) == []
+        # SAR for the same pass arrives later, with an earlier timestamp
+        assert fusion.push("sar", 90, [_truck(confidence=0.5)]) == []
+        assert fusion.push("optical", 200, []) == []
+        [fused] = fusion.push("sar", 200, [])
+
+        assert fused.sensor == "fused"
+        assert fused.time == 100
+        assert fused.detection.sources == ["optical", "sar"]
+        assert fused.detection.confidence == pytest.approx(1 - 0.4 * 0.5)
+        assert fusion.stats()["fused"] == 1
+
+    def test_not_joined_outside_time_window(self, clock):
+        fusion = _fusion(clock)
+        fusion.push("optical", 0, [_truck()])
+        fusion.push("sar", 100, [_truck()])
+
+        out = fusion.flush()
+
+        assert len(out) == 2
+        assert all(len(o.detection.sources) == 1 for o in out)
+
+    def test_emits_incrementally_as_watermark_passes(self, clock):
+        fusion = _fusion(clock)
+        emitted = []
+        for t in range(0, 200, 20):
+            emitted.append(len(fusion.push("optical", t, [_truck(ELSEWHERE)])))
+            emitted[-1] += len(fusion.push("sar", t, [_truck()]))
+
+        # Observations leave once the watermark (t - 10) is a window (30 s) past them
+        assert sum(emitted) > 0
+        assert fusion.stats()["pending"] <= 6
+        assert emitted[:2] == [0, 0]
+
+    def test_silent_feed_stops_blocking_after_idle_timeout(self, clock):
+        fusion = _fusion(clock, idle_timeout_s=60)
+
+        assert fusion.push("optical", 100, [_truck()]) == []
+        clock.now = 30
+        assert fusion.tick() == []
+        clock.now = 61
+        [out] = fusion.tick()
+
+        assert out.detection.sources == ["optical"]
+        assert fusion.stats()["feeds"]["sar"]["idle"]
+
+    def test_pending_bounded(self, clock):
+        fusion = _fusion(clock, max_pending=5)
+
+        for t in range(20):
+            fusion.push("optical", t, [_truck((33.9 + t * 0.01, -118.4))])
+
+        assert fusion.stats()["pending"] <= 5
+        assert fusion.stats()["forced"] == 15
+
+    def test_late_observation_counted_and_still_emitted(self, clock):
+        fusion = _fusion(clock)
+        fusion.push("optical", 1000, [])
+        fusion.push("sar", 1000, [])
+
+        out = fusion.push("sar", 500, [_truck()])
+
+        assert fusion.stats()["feeds"]["sar"]["late"] == 1
+        assert len(out) == 1
+
+    def test_min_confidence_applies_to_uncorroborated(self, clock):
+        fusion = _fusion(clock, min_confidence={"optical": 0.8})
+        fusion.push("optical", 0, [_truck(confidence=0.3), _truck(ELSEWHERE, confidence=0.3)])
+        fusion.push("sar", 5, [_truck(confidence=0.5)])
+
+        [out] = fusion.flush()
+
+        assert out.detection.sources == ["optical", "sar"]
+        assert fusion.stats()["dropped"] == 1
+
+    def test_run_consumes_async_feeds(self):
+        batches = []
+
+        async def feed(sensor_offset, location):
+            for t in range(0, 300, 30):
+                yield t + sensor_offset, [_truck(location)]
+                await asyncio.sleep(0)
+
+        async def scenario():
+            fusion = StreamingFusion(FusionEngine(gate_m=50), window_s=20, max_delay_s=5)
+            await fusion.run(
+                {"optical": feed(0, HERE), "sar": feed(3, HERE)},
+                batches.append,
+                tick_s=0.05,
+            )
+            return fusion
+
+        fusion = asyncio.run(scenario())
+
+        fused = [o for batch in batches for o in batch]
+        assert len(batches) > 1  # emitted as the streams progress, not only at the end
+        assert len(fused) == 10
+        assert all(o.detection.sources == ["optical", "sar"] for o in fused)
+        assert fusion.stats()["pending"] == 0
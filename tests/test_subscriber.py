@@ -0,0 +1,164 @@
+"""Tests for the Lattice entity subscription."""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ghost_sentry.core import db, events
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.core.models import Detection
+from ghost_sentry.lattice.entities import TrackBuilder
+from ghost_sentry.lattice.standin import LatticeStandIn
+from ghost_sentry.lattice.subscriber import LatticeSubscriber
+
+T0 = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def scratch_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "ghost_sentry.db")
+    monkeypatch.setattr(events, "_listeners", [])
+    db.init_db()
+
+
+def _mesh_track(entity_id, lat=33.0, lon=-118.0, at=T0, integration="mesh-node", label="boat"):
+    detection = Detection(label=label, confidence=0.7, bbox=(0, 0, 1, 1), geo_location=(lat, lon))
+    track = TrackBuilder.from_detection(detection, entity_id=entity_id).model_dump()
+    track["provenance"].update(integrationName=integration, sourceUpdateTime=at.isoformat())
+    return track
+
+
+def _lines(*tracks, snapshot=False):
+    return [json.dumps({"entity": t, **({"snapshot": True} if snapshot else {})}) for t in tracks]
+
+
+async def _until(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestDeltaApplication:
+
+    def test_newer_updates_applied_older_and_repeats_dropped(self):
+        matcher = EntityMatcher()
+        subscriber = LatticeSubscriber("http://unused", matcher=matcher)
+
+        assert subscriber.apply_lines(_lines(_mesh_track("a", lat=33.0, at=T0))) == 1
+        assert subscriber.apply_lines(_lines(
+            _mesh_track("a", lat=33.1, at=T0 - timedelta(seconds=5)),  # out of order
+            _mesh_track("a", lat=33.0, at=T0),                          # replay
+            _mesh_track("a", lat=33.2, at=T0 + timedelta(seconds=5)),
+            _mesh_track("a", lat=33.3, at=T0 + timedelta(seconds=9)),   # supersedes the previous
+        )) == 1
+
+        [entity] = matcher.get_active_entities()
+        assert entity.external_id == "lattice:a"
+        assert entity.location == (33.3, -118.0)
+        assert subscriber.stats()["duplicates"] == 3
+        [stored] = db.get_tracks()
+        assert stored["location"]["position"]["latitudeDegrees"] == 33.3
+
+    def test_updates_without_source_time_all_applied(self):
+        matcher = EntityMatcher()
+        subscriber = LatticeSubscriber("http://unused", matcher=matcher, store=False)
+
+        def unstamped(lat):
+            track = _mesh_track("e1", lat=lat)
+            track["provenance"]["sourceUpdateTime"] = None
+            track["createdTime"] = None
+            return track
+
+        applied = [subscriber.apply_lines(_lines(unstamped(33.0 + i * 0.1))) for i in range(3)]
+
+        assert applied == [1, 1, 1]
+        assert subscriber.stats()["duplicates"] == 0
+        [entity] = matcher.get_active_entities()
+        assert entity.location == (33.2, -118.0)
+
+    def test_versions_bounded_to_most_recent_entities(self):
+        subscriber = LatticeSubscriber("http://unused", matcher=EntityMatcher(), store=False, max_entities=100)
+
+        for start in range(0, 1000, 100):
+            subscriber.apply_lines(_lines(*[_mesh_track(f"e{i}", lat=30 + i * 0.01) for i in range(start, start + 100)]))
+        subscriber.apply_lines(_lines(_mesh_track("e950", lat=40.0, at=T0 + timedelta(seconds=1)), _mesh_track("e5")))
+
+        assert subscriber.stats()["entities"] == 100
+        assert "e950" in subscriber._versions and "e5" in subscriber._versions
+        assert "e900" not in subscriber._versions  # least recently updated went first
+        assert subscriber.stats()["duplicates"] == 0  # e5 was forgotten, so it applies again
+
+    def test_own_tracks_and_noise_skipped(self):
+        subscriber = LatticeSubscriber("http://unused", matcher=EntityMatcher())
+
+        applied = subscriber.apply_lines(
+            _lines(_mesh_track("mine", integration="ghost-sentry")) + ["{not json", "", '{"heartbeat": 1}']
+        )
+
+        assert applied == 0
+        assert subscriber.stats()["echoes"] == 1
+        assert subscriber.stats()["malformed"] == 1
+
+    def test_mesh_track_claims_entity_seen_in_imagery(self):
+        matcher = EntityMatcher()
+        seen = matcher.correlate("boat", (33.0, -118.0), 0.6, "optical")
+
+        LatticeSubscriber("http://unused", matcher=matcher, store=False).apply_lines(
+            _lines(_mesh_track("m1", lat=33.0002))
+        )
+
+        assert matcher.get_active_entities() == [seen]
+        assert seen.sources == ["optical", "lattice"]
+
+    def test_lag_measured_on_live_updates_only(self):
+        subscriber = LatticeSubscriber("http://unused", matcher=EntityMatcher(), store=False)
+        now = (T0 + timedelta(seconds=2)).timestamp()
+
+        subscriber.apply_lines(_lines(_mesh_track("old", at=T0 - timedelta(hours=1)), snapshot=True), now=now)
+        subscriber.apply_lines(_lines(_mesh_track("new", at=T0)), now=now)
+
+        assert subscriber.stats()["lag_ms"] == {"last": 2000.0, "avg": 2000.0, "max": 2000.0}
+
+    def test_snapshot_complete_after_its_batch_is_applied(self, monkeypatch):
+        subscriber = LatticeSubscriber("http://unused", matcher=EntityMatcher(), store=False)
+        applied_at_complete = []
+        monkeypatch.setattr(subscriber, "_snapshot_done", lambda: applied_at_complete.append(subscriber.applied))
+
+        subscriber.apply_lines(
+            _lines(_mesh_track("a"), _mesh_track("b", lat=34.0), snapshot=True) + ['{"snapshotComplete": true}']
+        )
+
+        assert applied_at_complete == [2]
+
+
+class TestSubscription:
+
+    def test_snapshot_then_live_updates_and_reconnect(self):
+        with LatticeStandIn() as standin:
+            standin.put_tracks([_mesh_track(f"s{i}", lat=30 + i * 0.01) for i in range(1200)])
+            subscriber = LatticeSubscriber(standin.url, matcher=EntityMatcher(), backoff_s=0.01)
+
+            async def scenario():
+                stop = asyncio.Event()
+                task = asyncio.ensure_future(subscriber.run(stop))
+                await _until(lambda: subscriber.snapshot_s is not None)
+                assert subscriber.applied == 1200
+
+                standin.put_tracks([_mesh_track("s0", lat=40.0, at=datetime.now(timezone.utc))])
+                await _until(lambda: subscriber.applied == 1201)
+
+                standin.stop()
+                standin.start()
+                await _until(lambda: subscriber.connections == 2 and subscriber.snapshot_s is not None)
+                stop.set()
+                return await task
+
+            stats = asyncio.run(scenario())
+
+        assert stats["snapshot_entities"] == 2400
+        assert stats["applied"] == 1201  # the replayed snapshot is all duplicates
+        assert stats["entities"] == 1200
+        assert stats["lag_ms"]["max"] < 5000
+        assert len(db.get_tracks()) == 1200
@@ -0,0 +1,138 @@
+"""Tests for the pre-inference cloud / no-change tile filter."""
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from ghost_sentry.core.detector import build_detector
+from ghost_sentry.core.tile_filter import (
+    TileFilter,
+    TileStore,
+    changed_cells,
+    obscured_fraction,
+    tile_signature,
+)
+from ghost_sentry.core.tiling import TiledDetector
+from tests.test_tiling import BrightBlobDetector
+
+# Three 400 px tiles across a 1100 x 400 scene (offsets 0, 350, 700)
+WIDTH, HEIGHT, TILE, OVERLAP = 1100, 400, 400, 50
+
+
+def _write_scene(path, squares=(), cloud=None, seed=0):
+    """Textured ground (so change is measurable), bright 'vehicles', optional white cloud block."""
+    ground = np.random.default_rng(seed).integers(300, 1500, (HEIGHT, WIDTH))
+    data = np.repeat(ground[None].astype(np.uint16), 3, axis=0)
+    for x, y, size in squares:
+        data[:, y:y + size, x:x + size] = 3000
+    if cloud is not None:
+        x1, x2 = cloud
+        data[:, :, x1:x2] = 3000
+    with rasterio.open(
+        path, "w", driver="GTiff", width=WIDTH, height=HEIGHT, count=3, dtype=np.uint16,
+        crs="EPSG:4326", transform=from_origin(-118.5, 34.0, 1e-5, 1e-5),
+    ) as dst:
+        dst.write(data)
+    return str(path)
+
+
+@pytest.fixture
+def tiled(tmp_path):
+    detector = BrightBlobDetector()
+    tile_filter = TileFilter(TileStore(str(tmp_path / "tiles.db")))
+    return TiledDetector(detector, tile_size=TILE, overlap=OVERLAP, tile_filter=tile_filter)
+
+
+def _inferred(tiled):
+    return sum(tiled.detector.batch_sizes)
+
+
+class TestMasks:
+
+    def test_obscured_fraction(self):
+        ground = np.random.default_rng(0).integers(20, 120, (64, 64, 3), dtype=np.uint8)
+        cloud = np.full((64, 64, 3), 240, dtype=np.uint8)
+        nodata = np.zeros((64, 64, 3), dtype=np.uint8)
+        red_roof = np.zeros((64, 64, 3), dtype=np.uint8)
+        red_roof[..., 2] = 255
+
+        assert obscured_fraction(ground) == 0.0
+        assert obscured_fraction(cloud) == 1.0
+        assert obscured_fraction(nodata) == 1.0
+        assert obscured_fraction(red_roof) == 0.0  # bright but coloured
+
+    def test_signature_ignores_illumination_but_sees_a_vehicle(self):
+        ground = np.random.default_rng(0).integers(40, 120, (640, 640, 3)).astype(np.uint8)
+        brighter = (ground + 20).astype(np.uint8)
+        with_truck = ground.copy()
+        with_truck[300:320, 300:320] = 250
+
+        base = tile_signature(ground)
+        assert base.shape == (32, 32)
+        assert changed_cells(base, tile_signature(brighter)) == 0
+        assert changed_cells(base, tile_signature(with_truck)) >= 1
+
+
+class TestTileFilter:
+
+    def test_unchanged_pass_skips_inference_and_reuses_detections(self, tmp_path, tiled):
+        first = tiled.detect(_write_scene(tmp_path / "t0.tif", squares=[(100, 100, 20)]))
+        again = tiled.detect(_write_scene(tmp_path / "t1.tif", squares=[(100, 100, 20)]))
+
+        assert _inferred(tiled) == 3
+        assert [d.bbox for d in again] == [d.bbox for d in first] == [(100, 100, 120, 120)]
+        stats = tiled.tile_filter.stats()
+        assert stats["skipped_unchanged"] == 3
+        assert stats["skip_rate"] == 0.5
+        assert tiled.tiles_skipped == 3
+
+    def test_only_changed_tiles_are_inferred(self, tmp_path, tiled):
+        tiled.detect(_write_scene(tmp_path / "t0.tif"))
+        # A new vehicle in the last tile only (x 700..1100)
+        detections = tiled.detect(_write_scene(tmp_path / "t1.tif", squares=[(900, 200, 20)]))
+
+        assert _inferred(tiled) == 3 + 1
+        assert [d.bbox for d in detections] == [(900, 200, 920, 220)]
+
+    def test_clouded_tile_skipped_and_keeps_last_detections(self, tmp_path, tiled):
+        tiled.detect(_write_scene(tmp_path / "t0.tif", squares=[(900, 200, 20)]))
+        detections = tiled.detect(_write_scene(tmp_path / "t1.tif", seed=1, cloud=(700, 1100)))
+
+        assert tiled.tile_filter.stats()["skipped_cloud"] == 1
+        assert _inferred(tiled) == 3 + 2  # the two clear tiles have new ground texture
+        assert (900, 200, 920, 220) in [d.bbox for d in detections]
+
+    def test_cloud_never_replaces_the_reference(self, tmp_path, tiled):
+        tiled.detect(_write_scene(tmp_path / "t0.tif"))
+        tiled.detect(_write_scene(tmp_path / "t1.tif", cloud=(0, WIDTH)))
+        tiled.detect(_write_scene(tmp_path / "t2.tif"))
+
+        assert _inferred(tiled) == 3
+        assert tiled.tile_filter.stats()["skipped_cloud"] == 3
+
+    def test_reuse_can_be_disabled(self, tmp_path):
+        tiled = TiledDetector(
+            BrightBlobDetector(), tile_size=TILE, overlap=OVERLAP,
+            tile_filter=TileFilter(TileStore(str(tmp_path / "tiles.db")), reuse_detections=False),
+        )
+        tiled.detect(_write_scene(tmp_path / "t0.tif", squares=[(100, 100, 20)]))
+
+        assert tiled.detect(_write_scene(tmp_path / "t1.tif", squares=[(100, 100, 20)])) == []
+
+    def test_store_persists_across_restarts(self, tmp_path):
+        store_path = str(tmp_path / "tiles.db")
+        signature = np.arange(16, dtype=np.uint8).reshape(4, 4)
+        store = TileStore(store_path)
+        store.put("k", signature, [])
+        store.close()
+
+        reopened = TileStore(store_path)
+        stored, detections = reopened.get("k")
+
+        assert len(reopened) == 1
+        assert np.array_equal(stored, signature)
+        assert detections == []
+
+    def test_tile_store_requires_tiling(self, tmp_path):
+        with pytest.raises(ValueError):
+            build_detector(tile_store=str(tmp_path / "tiles.db"))
@@ -0,0 +1,130 @@
+"""Tests for tiled inference and box utilities."""
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from ghost_sentry.core.boxes import batched_nms, nms
+from ghost_sentry.core.detector import Detection
+from ghost_sentry.core.tiling import TiledDetector, tile_grid, to_bgr8
+
+
+class BrightBlobDetector:
+    """Reports one 'truck' around the bright pixels of each tile, if any."""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def detect_batch(self, sources, batch_size=8):
+        self.batch_sizes.append(len(sources))
+        results = []
+        for image in sources:
+            ys, xs = np.nonzero(image[..., 0] > 200)
+            if len(xs) == 0:
+                results.append([])
+                continue
+            # Boxes cut by a tile edge score lower, like a partially visible object
+            area = (xs.max() - xs.min() + 1) * (ys.max() - ys.min() + 1)
+            results.append([Detection(
+                label="truck",
+                confidence=min(0.99, area / 400),
+                bbox=(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1),
+            )])
+        return results
+
+
+def _write_scene(path, width, height, squares, dtype=np.uint16, value=3000):
+    data = np.zeros((3, height, width), dtype=dtype)
+    for x, y, size in squares:
+        data[:, y:y + size, x:x + size] = value
+    with rasterio.open(
+        path, "w", driver="GTiff", width=width, height=height, count=3, dtype=dtype,
+        crs="EPSG:4326", transform=from_origin(-118.5, 34.0, 1e-5, 1e-5),
+    ) as dst:
+        dst.write(data)
+
+
+class TestTileGrid:
+
+    def test_tiles_cover_scene_with_overlap(self):
+        tiles = tile_grid(1000, 700, tile_size=400, overlap=50)
+
+        cols = sorted({t.col_off for t in tiles})
+        rows = sorted({t.row_off for t in tiles})
+        assert cols == [0, 350, 600]
+        assert rows == [0, 300]
+        assert all(t.width == 400 and t.height == 400 for t in tiles)
+
+    def test_small_scene_is_single_tile(self):
+        tiles = tile_grid(300, 200, tile_size=640)
+
+        assert len(tiles) == 1
+        assert (tiles[0].width, tiles[0].height) == (300, 200)
+
+    def test_overlap_must_be_smaller_than_tile(self):
+        with pytest.raises(ValueError):
+            tile_grid(1000, 1000, tile_size=100, overlap=100)
+
+
+class TestNMS:
+
+    def test_suppresses_overlapping_boxes(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]])
+        scores = np.array([0.9, 0.8, 0.7])
+
+        assert nms(boxes, scores, 0.5).tolist() == [0, 2]
+
+    def test_ios_merges_contained_partial_box(self):
+        boxes = np.array([[0, 0, 20, 20], [0, 0, 6, 20]])
+        scores = np.array([0.9, 0.5])
+
+        assert nms(boxes, scores, 0.5, metric="iou").tolist() == [0, 1]
+        assert nms(boxes, scores, 0.5, metric="ios").tolist() == [0]
+
+    def test_batched_nms_keeps_other_classes(self):
+        boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 10]])
+
+        assert sorted(batched_nms(boxes, np.array([0.9, 0.8]), np.array([0, 1])).tolist()) == [0, 1]
+
+
+class TestTiledDetector:
+
+    def test_to_bgr8_scales_reflectance(self):
+        bands = np.zeros((3, 2, 2), dtype=np.uint16)
+        bands[0] = 3000  # red
+
+        image = to_bgr8(bands)
+
+        assert image.shape == (2, 2, 3)
+        assert image.dtype == np.uint8
+        assert image[0, 0].tolist() == [0, 0, 255]
+
+    def test_boxes_shifted_to_scene_coordinates(self, tmp_path):
+        path = tmp_path / "scene.tif"
+        _write_scene(path, 1000, 700, squares=[(700, 500, 20)])
+
+        detections = TiledDetector(BrightBlobDetector(), tile_size=400, overlap=50).detect(str(path))
+
+        assert len(detections) == 1
+        assert detections[0].bbox == (700, 500, 720, 520)
+
+    def test_duplicates_across_seam_are_merged(self, tmp_path):
+        path = tmp_path / "scene.tif"
+        # Straddles the x=400 edge of the first tile; fully inside the second (350..750)
+        _write_scene(path, 1000, 400, squares=[(390, 100, 20)])
+
+        detections = TiledDetector(BrightBlobDetector(), tile_size=400, overlap=50).detect(str(path))
+
+        assert len(detections) == 1
+        assert detections[0].bbox == (390, 100, 410, 120)
+
+    def test_tiles_are_batched(self, tmp_path):
+        path = tmp_path / "scene.tif"
+        _write_scene(path, 1000, 700, squares=[])
+        detector = BrightBlobDetector()
+
+        tiled = TiledDetector(detector, tile_size=400, overlap=50, batch_size=4)
+        assert tiled.detect(str(path)) == []
+
+        assert detector.batch_sizes == [4, 2]
+        assert tiled.tiles_processed == 6
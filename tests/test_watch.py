@@ -0,0 +1,149 @@
+"""Tests for watch-folder ingestion."""
+import asyncio
+
+import pytest
+
+from ghost_sentry.core.pipeline import Pipeline, Stage
+from ghost_sentry.core.watch import Checkpoint, FolderWatcher
+
+
+def _write(path, data=b"pixels"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return str(path)
+
+
+async def _watch_until(watcher, submit, condition, timeout=5.0):
+    task = asyncio.create_task(watcher.run(submit))
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.02)
+    watcher.stop()
+    await task
+
+
+class TestCheckpoint:
+
+    def test_survives_reload(self, tmp_path):
+        scene = _write(tmp_path / "scene.jpg")
+        Checkpoint(str(tmp_path / "ckpt.jsonl")).mark(scene)
+
+        reloaded = Checkpoint(str(tmp_path / "ckpt.jsonl"))
+
+        assert reloaded.is_done(scene)
+        assert len(reloaded) == 1
+
+    def test_replaced_file_is_not_done(self, tmp_path):
+        scene = _write(tmp_path / "scene.jpg")
+        checkpoint = Checkpoint(str(tmp_path / "ckpt.jsonl"))
+        checkpoint.mark(scene)
+
+        _write(tmp_path / "scene.jpg", b"a newer, larger capture")
+
+        assert not checkpoint.is_done(scene)
+
+
+class TestFolderWatcher:
+
+    @pytest.fixture
+    def watched(self, tmp_path):
+        return tmp_path / "incoming"
+
+    def _watcher(self, watched, tmp_path, **kwargs):
+        watched.mkdir(exist_ok=True)
+        checkpoint = Checkpoint(str(tmp_path / "ckpt.jsonl"))
+        kwargs.setdefault("use_inotify", False)
+        return FolderWatcher(str(watched), checkpoint, poll_interval=0.02, settle_s=0.05, **kwargs)
+
+    def test_backlog_and_new_files_submitted_once(self, watched, tmp_path):
+        backlog = _write(watched / "old.tif")
+        _write(watched / "notes.txt")
+        watcher = self._watcher(watched, tmp_path)
+        submitted = []
+
+        async def scenario():
+            async def submit(path):
+                submitted.append(path)
+                if len(submitted) == 1:
+                    _write(watched / "sub" / "new.jpg")
+
+            await _watch_until(watcher, submit, lambda: len(submitted) >= 2)
+
+        asyncio.run(scenario())
+
+        assert submitted == [backlog, str(watched / "sub" / "new.jpg")]
+
+    def test_checkpointed_files_leave_in_flight_set(self, watched, tmp_path):
+        scenes = [_write(watched / f"{i}.jpg") for i in range(3)]
+        watcher = self._watcher(watched, tmp_path)
+        submitted = []
+
+        async def scenario():
+            async def submit(path):
+                submitted.append(path)
+                if path != scenes[2]:
+                    watcher.checkpoint.mark(path)  # scenes[2] is still in flight
+
+            await _watch_until(watcher, submit, lambda: len(submitted) >= 3)
+
+        asyncio.run(scenario())
+
+        assert watcher._ready() == []  # the next pass forgets what the checkpoint now holds
+        assert submitted == scenes
+        assert list(watcher._submitted) == [scenes[2]]
+
+    def test_waits_for_file_to_stop_growing(self, watched, tmp_path):
+        watcher = self._watcher(watched, tmp_path)
+        watcher.settle_s = 60
+        scene = _write(watched / "scene.tif", b"part")
+        watcher.observe(scene)
+
+        _write(watched / "scene.tif", b"partial download")
+        assert watcher._ready() == []
+
+        watcher.settle_s = 0
+        assert watcher._ready() == [scene]
+        assert watcher._ready() == []
+
+    def test_checkpointed_files_skipped_after_restart(self, watched, tmp_path):
+        scenes = [_write(watched / f"{i}.jpg", bytes([i])) for i in range(3)]
+        processed = []
+
+        async def run_once():
+            watcher = self._watcher(watched, tmp_path)
+            pipeline = Pipeline(
+                [Stage("detect", lambda path: {"image_path": path}, executor="thread")],
+                sink=watcher.checkpoint.record,
+            )
+            async with pipeline:
+                async def submit(path):
+                    processed.append(path)
+                    await pipeline.submit(path)
+                await _watch_until(watcher, submit, lambda: len(watcher.checkpoint) == 3, timeout=1.0)
+
+        asyncio.run(run_once())
+        asyncio.run(run_once())
+
+        assert sorted(processed) == sorted(scenes)
+
+    def test_inotify_backend(self, watched, tmp_path):
+        pytest.importorskip("watchfiles")
+        watcher = self._watcher(watched, tmp_path, use_inotify=True)
+        watcher.poll_interval = 60  # only inotify can surface the file in time
+        submitted = []
+
+        async def scenario():
+            async def submit(path):
+                submitted.append(path)
+
+            async def write_later():
+                await asyncio.sleep(0.2)
+                _write(watched / "landed.png")
+
+            writer = asyncio.create_task(write_later())
+            await _watch_until(watcher, submit, lambda: submitted, timeout=10.0)
+            await writer
+
+        asyncio.run(scenario())
+
+        assert submitted == [str(watched / "landed.png")]
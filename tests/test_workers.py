@@ -0,0 +1,52 @@
+"""Tests for multi-process ingestion workers."""
+import pytest
+
+from ghost_sentry.core import db, sentry, track_state
+from ghost_sentry.core.correlation import EntityMatcher
+from ghost_sentry.core.detector import Detection
+from ghost_sentry.core.workers import IngestWorkerPool, iter_image_paths
+from ghost_sentry.lattice.adapter import LatticeConnector
+
+
+class FakeDetector:
+    """Stands in for ObjectDetector inside worker processes."""
+
+    def detect(self, image_path: str) -> list[Detection]:
+        if "broken" in image_path:
+            raise IOError("unreadable image")
+        index = int(image_path.rsplit("_", 1)[-1].split(".")[0])
+        return [Detection(label="truck", confidence=0.9, bbox=(0, 0, 10, 10), geo_location=(34.0 + index, -117.0))]
+
+
+@pytest.fixture(autouse=True)
+def setup_test_db(monkeypatch, tmp_path):
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "test_workers.db")
+    monkeypatch.setattr(sentry, "_matcher", EntityMatcher())
+    sentry._debounce.clear()
+    track_state.clear_cache()
+    db.init_db()
+    yield
+
+
+def test_iter_image_paths_expands_directories(tmp_path):
+    (tmp_path / "a.jpg").touch()
+    (tmp_path / "b.TIF").touch()
+    (tmp_path / "notes.txt").touch()
+
+    paths = list(iter_image_paths([str(tmp_path), "single.png"]))
+
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["a.jpg", "b.TIF", "single.png"]
+
+
+def test_pool_aggregates_detections_from_workers():
+    pool = IngestWorkerPool(2, detector_factory=FakeDetector, torch_threads=None)
+    paths = [f"scene_{i}.jpg" for i in range(6)] + ["broken_6.jpg"]
+
+    stats = pool.run(paths, LatticeConnector())
+
+    assert stats.images == 7
+    assert stats.failed == 1
+    assert "unreadable image" in stats.errors[0]
+    assert stats.detections == 6
+    assert stats.tracks == 6
+    assert len(db.get_tracks()) == 6